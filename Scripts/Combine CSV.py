@@ -3,13 +3,34 @@ Consolidate Split Crop CSV Files
 =================================
 Combines crop CSV files that are split by year ranges into single consolidated files.
 For example: Paddy-2015-2019.csv + Paddy-2019-2022.csv + Paddy-2022-2025.csv → Paddy.csv
+
+Split files are streamed in chunks and deduplicated with a sorted array of
+64-bit row hashes, so memory grows with the number of distinct rows (8 bytes
+each) rather than with the crop's full frame. Output is written chunk by
+chunk to a temporary file that replaces the target once complete.
+
+A manifest in the output directory records each crop's input files
+(size/mtime, confirmed by content hash) and row counts; crops whose inputs
+are unchanged are skipped and reported from the manifest. Inputs that could
+not be read are left out of the recorded signature (and listed under
+failed_files), so the crop is rebuilt on the next run.
+
+Usage:
+    python "Scripts/Combine CSV.py"                 # incremental
+    python "Scripts/Combine CSV.py" --force         # rewrite every crop
+    python "Scripts/Combine CSV.py" --chunksize 50000
 """
 
-import pandas as pd
+import json
 import glob
+import argparse
 from pathlib import Path
 from collections import defaultdict
-import os
+
+import numpy as np
+import pandas as pd
+
+from file_hash import file_sha256
 
 # ============================================================================
 # 1. SETUP
@@ -17,152 +38,293 @@ import os
 data_path = Path(r'c:\Users\tanis\Documents\Project 2\Project---2\Data\3_Cleaned CSVs')
 output_path = Path(r'c:\Users\tanis\Documents\Project 2\Project---2\Data\3_Cleaned CSVs\Consolidated')
 
-# Create output directory if it doesn't exist
-output_path.mkdir(parents=True, exist_ok=True)
+year_patterns = ['-2015-2019', '-2019-2022', '-2022-2025', '-2024-2025', '-2025', '-2024', '-2022', '-2019', '-2015']
+MANIFEST_NAME = '_consolidate_manifest.json'
+MANIFEST_VERSION = 1
+CHUNK_SIZE = 100_000
 
-print("="*80)
-print("CONSOLIDATING SPLIT CROP CSV FILES")
-print("="*80)
-print(f"\nInput directory: {data_path}")
-print(f"Output directory: {output_path}")
 
 # ============================================================================
-# 2. IDENTIFY SPLIT FILES
+# 2. MANIFEST HELPERS
 # ============================================================================
-print("\n" + "="*80)
-print("STEP 1: IDENTIFYING SPLIT CROP FILES")
-print("="*80)
+def load_manifest(out_dir: Path) -> dict:
+    """Return the consolidation manifest, or an empty one on first run."""
+    manifest_path = Path(out_dir) / MANIFEST_NAME
+    if not manifest_path.exists():
+        return {'format_version': MANIFEST_VERSION, 'crops': {}}
+    manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+    if manifest.get('format_version') != MANIFEST_VERSION:
+        return {'format_version': MANIFEST_VERSION, 'crops': {}}
+    return manifest
 
-# Get all CSV files
-all_csv_files = glob.glob(str(data_path / '*.csv'))
-print(f"\nTotal CSV files found: {len(all_csv_files)}")
 
-# Extract base crop names and group by them
-crop_groups = defaultdict(list)
-year_patterns = ['-2015-2019', '-2019-2022', '-2022-2025', '-2024-2025', '-2025', '-2024', '-2022', '-2019', '-2015']
+def save_manifest(manifest: dict, out_dir: Path) -> None:
+    manifest_path = Path(out_dir) / MANIFEST_NAME
+    tmp_path = manifest_path.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding='utf-8')
+    tmp_path.replace(manifest_path)
+
+
+def input_signature(file_list: list, previous: dict | None = None) -> dict:
+    """
+    {file name: {size, mtime_ns, sha256}} for a crop's inputs. The hash is
+    reused from previous when size and mtime match, so unchanged files are
+    not re-read.
+    """
+    previous = previous or {}
+    signature = {}
+    for csv_file in sorted(file_list):
+        csv_file = Path(csv_file)
+        stat = csv_file.stat()
+        info = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        entry = previous.get(csv_file.name)
+        if entry and entry.get('size') == info['size'] and entry.get('mtime_ns') == info['mtime_ns']:
+            info['sha256'] = entry.get('sha256')
+        else:
+            info['sha256'] = file_sha256(csv_file)
+        signature[csv_file.name] = info
+    return signature
+
+
+def inputs_unchanged(signature: dict, entry: dict | None, output_file: Path) -> bool:
+    """True when the crop's inputs hash the same as last run and its output still exists."""
+    if entry is None or entry.get('failed_files') or not output_file.exists():
+        return False
+    previous = entry.get('inputs', {})
+    return set(signature) == set(previous) and all(
+        signature[name]['sha256'] == previous[name].get('sha256') for name in signature
+    )
 
-for csv_file in all_csv_files:
-    filename = Path(csv_file).stem
-    
-    # Find the base crop name
-    base_crop = filename
-    for year_pattern in year_patterns:
-        if year_pattern in filename:
-            base_crop = filename.replace(year_pattern, '')
-            break
-    
-    crop_groups[base_crop].append(csv_file)
-
-# Find crops that have multiple files (split crops)
-split_crops = {crop: files for crop, files in crop_groups.items() if len(files) > 1}
-single_crops = {crop: files for crop, files in crop_groups.items() if len(files) == 1}
-
-print(f"\n📊 FILE CLASSIFICATION:")
-print(f"   • Split crops (multiple files): {len(split_crops)}")
-print(f"   • Single crops (one file): {len(single_crops)}")
-
-print(f"\n🔀 SPLIT CROPS TO CONSOLIDATE:")
-for crop_name in sorted(split_crops.keys()):
-    files = split_crops[crop_name]
-    print(f"\n   {crop_name}:")
-    for f in sorted(files):
-        filename = Path(f).name
-        print(f"      • {filename}")
 
 # ============================================================================
-# 3. CONSOLIDATE SPLIT FILES
+# 3. STREAMING CONSOLIDATION
 # ============================================================================
-print("\n" + "="*80)
-print("STEP 2: CONSOLIDATING SPLIT FILES")
-print("="*80)
-
-consolidated_files = {}
-
-for crop_name, file_list in sorted(split_crops.items()):
-    print(f"\n🔗 Consolidating: {crop_name}")
-    
-    # Load and combine all files for this crop
-    dfs = []
-    total_records_before = 0
-    
+def group_crop_files(input_dir: Path) -> dict:
+    """{base crop name: [csv files]} with year-range suffixes stripped."""
+    crop_groups = defaultdict(list)
+    for csv_file in glob.glob(str(Path(input_dir) / '*.csv')):
+        filename = Path(csv_file).stem
+
+        # Find the base crop name
+        base_crop = filename
+        for year_pattern in year_patterns:
+            if year_pattern in filename:
+                base_crop = filename.replace(year_pattern, '')
+                break
+
+        crop_groups[base_crop].append(csv_file)
+    return crop_groups
+
+
+def stream_consolidate(file_list: list, output_file: Path, dedup: bool = True,
+                       chunksize: int = CHUNK_SIZE, log=print) -> dict:
+    """
+    Stream the input files into output_file, dropping repeated rows.
+
+    Cells are read as text, so rows are compared (and written) exactly as they
+    appear in the files. Columns follow the union of the input headers in
+    order of appearance, like pd.concat.
+
+    Returns:
+        Dict with rows_in, rows_out, per-file row counts and the files that
+        could not be read (logged and skipped, like the original loader).
+
+    Raises:
+        ValueError: none of the input files could be read.
+    """
+    columns = []
+    readable = []
+    failed = []
     for csv_file in sorted(file_list):
         try:
-            df = pd.read_csv(csv_file)
-            dfs.append(df)
-            total_records_before += len(df)
-            filename = Path(csv_file).name
-            print(f"   ✓ Loaded {filename}: {len(df):,} records")
+            header = pd.read_csv(csv_file, nrows=0).columns
         except Exception as e:
-            print(f"   ✗ Error loading {csv_file}: {str(e)}")
-    
-    # Combine all dataframes
-    combined_df = pd.concat(dfs, ignore_index=True)
-    print(f"   → Total before deduplication: {len(combined_df):,} records")
-    
-    # Remove duplicates (keep first occurrence)
-    combined_df_deduplicated = combined_df.drop_duplicates()
-    print(f"   → Total after deduplication: {len(combined_df_deduplicated):,} records")
-    
-    # Save consolidated file
-    output_file = output_path / f"{crop_name}.csv"
-    combined_df_deduplicated.to_csv(output_file, index=False)
-    print(f"   ✅ Saved: {output_file.name}")
-    
-    consolidated_files[crop_name] = {
-        'input_files': len(file_list),
-        'total_records': len(combined_df_deduplicated),
-        'duplicates_removed': len(combined_df) - len(combined_df_deduplicated),
-        'output_file': output_file
-    }
-
-# ============================================================================
-# 4. COPY SINGLE CROP FILES
-# ============================================================================
-print("\n" + "="*80)
-print("STEP 3: COPYING SINGLE CROP FILES (NO CONSOLIDATION NEEDED)")
-print("="*80)
+            log(f"   ✗ Error loading {csv_file}: {str(e)}")
+            failed.append(Path(csv_file).name)
+            continue
+        readable.append(csv_file)
+        for col in header:
+            if col not in columns:
+                columns.append(col)
+    if not readable:
+        raise ValueError(f"no readable input files for {output_file.name}")
 
-for crop_name, file_list in sorted(single_crops.items()):
-    csv_file = file_list[0]
+    seen = np.empty(0, dtype=np.uint64)
+    rows_in = 0
+    rows_out = 0
+    file_rows = {}
+    tmp_file = output_file.with_name(output_file.name + '.tmp')
+    completed = False
     try:
-        df = pd.read_csv(csv_file)
-        output_file = output_path / Path(csv_file).name
-        df.to_csv(output_file, index=False)
-        print(f"   ✓ Copied {Path(csv_file).name}: {len(df):,} records")
-    except Exception as e:
-        print(f"   ✗ Error copying {csv_file}: {str(e)}")
+        with open(tmp_file, 'w', encoding='utf-8', newline='') as handle:
+            pd.DataFrame(columns=columns).to_csv(handle, index=False)
+            for csv_file in readable:
+                # A file that fails part-way is rolled back to where it started
+                start_pos, start_seen, start_rows_out = handle.tell(), seen, rows_out
+                n_file = 0
+                try:
+                    reader = pd.read_csv(csv_file, dtype=str, keep_default_na=False, chunksize=chunksize)
+                    for chunk in reader:
+                        chunk = chunk.reindex(columns=columns, fill_value='')
+                        n_file += len(chunk)
+                        if dedup:
+                            hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+                            # First occurrence within the chunk, then drop rows already written
+                            _, first_idx = np.unique(hashes, return_index=True)
+                            first_idx.sort()
+                            new_mask = np.ones(len(first_idx), dtype=bool)
+                            if len(seen):
+                                pos = np.searchsorted(seen, hashes[first_idx])
+                                pos[pos == len(seen)] = 0
+                                new_mask = seen[pos] != hashes[first_idx]
+                            keep_idx = first_idx[new_mask]
+                            seen = np.union1d(seen, hashes[keep_idx])
+                            chunk = chunk.iloc[keep_idx]
+                        chunk.to_csv(handle, index=False, header=False)
+                        rows_out += len(chunk)
+                except Exception as e:
+                    log(f"   ✗ Error loading {csv_file}: {str(e)}")
+                    failed.append(Path(csv_file).name)
+                    handle.seek(start_pos)
+                    handle.truncate()
+                    seen, rows_out = start_seen, start_rows_out
+                    continue
+                rows_in += n_file
+                file_rows[Path(csv_file).name] = n_file
+                log(f"   ✓ Streamed {Path(csv_file).name}: {n_file:,} records")
+        tmp_file.replace(output_file)
+        completed = True
+    finally:
+        if not completed:
+            tmp_file.unlink(missing_ok=True)
+    return {'rows_in': rows_in, 'rows_out': rows_out, 'file_rows': file_rows, 'failed_files': failed}
+
+
+def consolidate_directory(input_dir: Path, out_dir: Path, force: bool = False,
+                          chunksize: int = CHUNK_SIZE, log=print) -> dict:
+    """
+    Consolidate split crops and copy single-file crops into out_dir, skipping
+    crops whose inputs are unchanged since the last run.
+
+    Returns:
+        {crop name: manifest entry} with inputs, output, rows_in, rows_out,
+        split (bool), failed_files (inputs that could not be read) and
+        skipped (bool, True when reused from the manifest).
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(out_dir)
+    crop_groups = group_crop_files(input_dir)
+    report = {}
+
+    for crop_name, file_list in sorted(crop_groups.items()):
+        split = len(file_list) > 1
+        # Split crops are written as <crop>.csv; single files keep their name
+        output_file = out_dir / (f"{crop_name}.csv" if split else Path(file_list[0]).name)
+        entry = manifest['crops'].get(crop_name)
+        signature = input_signature(file_list, entry.get('inputs') if entry else None)
+
+        if not force and inputs_unchanged(signature, entry, output_file):
+            log(f"\n⏭  {crop_name}: inputs unchanged, skipped")
+            report[crop_name] = {**entry, 'skipped': True}
+            continue
+
+        log(f"\n{'🔗 Consolidating' if split else '📄 Copying'}: {crop_name}")
+        try:
+            counts = stream_consolidate(file_list, output_file, dedup=split, chunksize=chunksize, log=log)
+        except Exception as e:
+            log(f"   ✗ Error consolidating {crop_name}: {str(e)}")
+            continue
+        if split:
+            log(f"   → Total before deduplication: {counts['rows_in']:,} records")
+            log(f"   → Total after deduplication: {counts['rows_out']:,} records")
+        log(f"   ✅ Saved: {output_file.name}")
+        failed = counts['failed_files']
+        if failed:
+            log(f"   ⚠ {len(failed)} input(s) not read, crop will be rebuilt next run: {', '.join(failed)}")
+
+        # Unread inputs stay out of the signature, so inputs_unchanged() cannot match them
+        entry = {
+            'inputs': {name: info for name, info in signature.items() if name not in failed},
+            'output': output_file.name,
+            'rows_in': counts['rows_in'],
+            'rows_out': counts['rows_out'],
+            'split': split,
+            'failed_files': failed,
+        }
+        manifest['crops'][crop_name] = entry
+        save_manifest(manifest, out_dir)
+        report[crop_name] = {**entry, 'skipped': False}
+
+    # Forget crops whose inputs were removed
+    for crop_name in set(manifest['crops']) - set(crop_groups):
+        del manifest['crops'][crop_name]
+    save_manifest(manifest, out_dir)
+    return report
+
 
 # ============================================================================
-# 5. SUMMARY REPORT
+# 4. MAIN
 # ============================================================================
-print("\n" + "="*80)
-print("SUMMARY REPORT")
-print("="*80)
-
-print(f"\n✅ CONSOLIDATION COMPLETE!")
-print(f"\n📊 RESULTS:")
-print(f"   • Split crops consolidated: {len(consolidated_files)}")
-print(f"   • Single crops copied: {len(single_crops)}")
-print(f"   • Total crops in output: {len(consolidated_files) + len(single_crops)}")
-
-print(f"\n📈 CONSOLIDATION DETAILS:")
-for crop_name in sorted(consolidated_files.keys()):
-    info = consolidated_files[crop_name]
-    print(f"\n   {crop_name}:")
-    print(f"      • Input files: {info['input_files']}")
-    print(f"      • Total records: {info['total_records']:,}")
-    print(f"      • Duplicates removed: {info['duplicates_removed']:,}")
-    print(f"      • Output: {info['output_file'].name}")
-
-print(f"\n💾 OUTPUT LOCATION:")
-print(f"   {output_path}")
-
-print(f"\n📁 OUTPUT FILES:")
-output_files = sorted(output_path.glob('*.csv'))
-for i, file in enumerate(output_files, 1):
-    df = pd.read_csv(file)
-    print(f"   {i:2d}. {file.name:30s} - {len(df):,} records")
-
-print("\n" + "="*80)
-print("✨ ALL CONSOLIDATED FILES READY TO USE!")
-print("="*80 + "\n")
+def main():
+    parser = argparse.ArgumentParser(description="Consolidate split crop CSV files")
+    parser.add_argument('--input', type=Path, default=data_path, help="Directory of cleaned crop CSVs")
+    parser.add_argument('--output', type=Path, default=output_path, help="Consolidated output directory")
+    parser.add_argument('--force', action='store_true', help="Rewrite every crop, even if unchanged")
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE, help="Rows per streamed chunk")
+    args = parser.parse_args()
+
+    print("="*80)
+    print("CONSOLIDATING SPLIT CROP CSV FILES")
+    print("="*80)
+    print(f"\nInput directory: {args.input}")
+    print(f"Output directory: {args.output}")
+
+    report = consolidate_directory(args.input, args.output, force=args.force, chunksize=args.chunksize)
+    consolidated = {name: info for name, info in report.items() if info['split']}
+    singles = {name: info for name, info in report.items() if not info['split']}
+    skipped = [name for name, info in report.items() if info['skipped']]
+    failed = {name: info['failed_files'] for name, info in report.items() if info.get('failed_files')}
+
+    print("\n" + "="*80)
+    print("SUMMARY REPORT")
+    print("="*80)
+
+    print(f"\n✅ CONSOLIDATION COMPLETE!")
+    print(f"\n📊 RESULTS:")
+    print(f"   • Split crops consolidated: {len(consolidated)}")
+    print(f"   • Single crops copied: {len(singles)}")
+    print(f"   • Unchanged crops skipped: {len(skipped)}")
+    print(f"   • Total crops in output: {len(report)}")
+    if failed:
+        print(f"   • Crops with unreadable inputs: {len(failed)}")
+
+    print(f"\n📈 CONSOLIDATION DETAILS:")
+    for crop_name in sorted(consolidated):
+        info = consolidated[crop_name]
+        print(f"\n   {crop_name}:")
+        print(f"      • Input files: {len(info['inputs'])}")
+        print(f"      • Total records: {info['rows_out']:,}")
+        print(f"      • Duplicates removed: {info['rows_in'] - info['rows_out']:,}")
+        print(f"      • Output: {info['output']}")
+
+    if failed:
+        print(f"\n⚠ UNREADABLE INPUTS (crop rebuilt on the next run):")
+        for crop_name in sorted(failed):
+            print(f"   {crop_name}: {', '.join(failed[crop_name])}")
+
+    print(f"\n💾 OUTPUT LOCATION:")
+    print(f"   {args.output}")
+
+    # Counts come from the streaming pass (or the manifest), not from re-reading outputs
+    print(f"\n📁 OUTPUT FILES:")
+    for i, info in enumerate(sorted(report.values(), key=lambda item: item['output']), 1):
+        print(f"   {i:2d}. {info['output']:30s} - {info['rows_out']:,} records")
+
+    print("\n" + "="*80)
+    print("✨ ALL CONSOLIDATED FILES READY TO USE!")
+    print("="*80 + "\n")
+
+
+if __name__ == "__main__":
+    main()
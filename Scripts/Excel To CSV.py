@@ -1,10 +1,51 @@
+"""
+XLSX → CSV Converter
+====================
+Converts every sheet of an XLSX workbook to CSV, for a single file or a whole
+folder (e.g. Data/Soil Data ( District Wise)/Excel Format → CSV Format).
+
+Folder conversion is batch-oriented:
+    - all sheets of a workbook are read in one pass, with the calamine
+      (Rust) reader when python-calamine is installed, otherwise pandas'
+      default openpyxl reader,
+    - workbooks are converted in a process pool,
+    - a manifest (_xlsx_manifest.json in the output folder) records each
+      workbook's size / mtime / SHA-256 and the CSVs it produced, so
+      unchanged workbooks whose CSVs still exist are skipped.
+
+Usage:
+    python "Scripts/Excel To CSV.py"                        # interactive prompts
+    python "Scripts/Excel To CSV.py" --soil-data            # Excel Format → CSV Format, unattended
+    python "Scripts/Excel To CSV.py" --folder <dir> --output <dir> --workers 4
+    python "Scripts/Excel To CSV.py" --file <book.xlsx>
+    python "Scripts/Excel To CSV.py" --soil-data --force    # reconvert every workbook
+"""
+
 import os
+import json
 import glob
+import argparse
 import pandas as pd
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from file_hash import file_sha256
+
+try:
+    import python_calamine  # noqa: F401  (enables pandas' engine="calamine")
+    XLSX_ENGINE = "calamine"
+except ImportError:
+    XLSX_ENGINE = None      # pandas default (openpyxl)
 
+BASE_DIR = Path(__file__).resolve().parent.parent
+SOIL_EXCEL_DIR = BASE_DIR / "Data" / "Soil Data ( District Wise)" / "Excel Format"
+SOIL_CSV_DIR = BASE_DIR / "Data" / "Soil Data ( District Wise)" / "CSV Format"
+MANIFEST_NAME = "_xlsx_manifest.json"
+MANIFEST_VERSION = 1
 
-def convert_xlsx_to_csv(xlsx_path: str, output_dir: str = None, encoding: str = "utf-8") -> list[str]:
+
+def convert_xlsx_to_csv(xlsx_path: str, output_dir: str = None, encoding: str = "utf-8",
+                        engine: str | None = XLSX_ENGINE, log=print) -> list[str]:
     """
     Convert a single XLSX file (all sheets) to CSV file(s).
 
@@ -12,78 +53,174 @@ def convert_xlsx_to_csv(xlsx_path: str, output_dir: str = None, encoding: str =
         xlsx_path   : Path to the .xlsx file.
         output_dir  : Directory to save CSV(s). Defaults to the same folder as the XLSX.
         encoding    : CSV encoding (default utf-8).
+        engine      : pandas Excel engine (default: calamine when installed).
+        log         : Called with one line per sheet written.
 
     Returns:
         List of paths to the generated CSV files.
     """
-    xlsx_path = str(Path(xlsx_path).resolve())
+    xlsx_path = Path(xlsx_path).resolve()
     if not xlsx_path.exists():
         raise FileNotFoundError(f"File not found: {xlsx_path}")
 
     output_dir = Path(output_dir).resolve() if output_dir else xlsx_path.parent
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    xl = pd.ExcelFile(xlsx_path)
-    sheet_names = xl.sheet_names
+    # Every sheet in one pass over the workbook
+    sheets = pd.read_excel(xlsx_path, sheet_name=None, engine=engine)
     generated = []
 
-    for sheet in sheet_names:
-        df = xl.parse(sheet)
-
+    for sheet, df in sheets.items():
         # Build output filename
-        if len(sheet_names) == 1:
+        if len(sheets) == 1:
             csv_name = f"{xlsx_path.stem}.csv"
         else:
             safe_sheet = sheet.replace("/", "-").replace("\\", "-").replace(":", "-")
             csv_name = f"{xlsx_path.stem}_{safe_sheet}.csv"
 
-        csv_path = Path(output_dir) / csv_name
-        df.to_csv(csv_path, index=False, encoding=encoding)
+        csv_path = output_dir / csv_name
+        tmp_path = csv_path.with_name(csv_path.name + ".tmp")
+        df.to_csv(tmp_path, index=False, encoding=encoding)
+        tmp_path.replace(csv_path)
         generated.append(str(csv_path))
-        print(f"  ✔  {xlsx_path.name}  →  Sheet '{sheet}'  →  {csv_path}")
+        log(f"  ✔  {xlsx_path.name}  →  Sheet '{sheet}'  →  {csv_path}")
 
     return generated
 
 
-def convert_folder(folder_path: str, output_dir: str = None,
-                   recursive: bool = False, encoding: str = "utf-8") -> list[str]:
+# ──────────────────────────────────────────────────────────────────────────────
+# Manifest
+# ──────────────────────────────────────────────────────────────────────────────
+def load_manifest(manifest_dir: Path) -> dict:
+    """Return the conversion manifest, or an empty one on first run."""
+    manifest_path = Path(manifest_dir) / MANIFEST_NAME
+    if not manifest_path.exists():
+        return {"format_version": MANIFEST_VERSION, "workbooks": {}}
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    if manifest.get("format_version") != MANIFEST_VERSION:
+        return {"format_version": MANIFEST_VERSION, "workbooks": {}}
+    return manifest
+
+
+def save_manifest(manifest: dict, manifest_dir: Path) -> None:
+    manifest_path = Path(manifest_dir) / MANIFEST_NAME
+    tmp_path = manifest_path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    tmp_path.replace(manifest_path)
+
+
+def workbook_signature(xlsx_file: Path, previous: dict | None = None) -> dict:
+    """{size, mtime_ns, sha256}; the hash is reused when size and mtime match previous."""
+    stat = xlsx_file.stat()
+    info = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if previous and previous.get("size") == info["size"] and previous.get("mtime_ns") == info["mtime_ns"]:
+        info["sha256"] = previous.get("sha256")
+    else:
+        info["sha256"] = file_sha256(xlsx_file)
+    return info
+
+
+def workbook_unchanged(signature: dict, entry: dict | None, encoding: str) -> bool:
+    """True when the workbook hashes the same as last run and all of its CSVs still exist."""
+    if entry is None or entry.get("sha256") != signature["sha256"] or entry.get("encoding") != encoding:
+        return False
+    return bool(entry.get("outputs")) and all(Path(path).exists() for path in entry["outputs"])
+
+
+def _convert_job(xlsx_file: str, output_dir: str | None, encoding: str) -> tuple[list[str], list[str]]:
+    """Worker entry point: convert one workbook, returning (generated CSVs, log lines)."""
+    log_lines = []
+    generated = convert_xlsx_to_csv(xlsx_file, output_dir=output_dir, encoding=encoding, log=log_lines.append)
+    return generated, log_lines
+
+
+def convert_folder(folder_path: str, output_dir: str = None, recursive: bool = False,
+                   encoding: str = "utf-8", workers: int | None = None, force: bool = False) -> list[str]:
     """
-    Convert all XLSX files inside a folder to CSV.
+    Convert all XLSX files inside a folder to CSV, skipping workbooks that
+    are unchanged since the last run.
 
     Args:
         folder_path : Path to the folder containing XLSX files.
         output_dir  : Directory to save CSVs. Defaults to same folder as each XLSX.
         recursive   : If True, search sub-folders as well.
         encoding    : CSV encoding (default utf-8).
+        workers     : Conversion processes (default: CPU count; 1 = in-process).
+        force       : Reconvert every workbook, even if unchanged.
 
     Returns:
-        List of all generated CSV file paths.
+        List of all generated CSV file paths (including those of skipped workbooks).
     """
     folder_path = Path(folder_path).resolve()
     pattern = str(folder_path / ("**/*.xlsx" if recursive else "*.xlsx"))
-    xlsx_files = glob.glob(pattern, recursive=recursive)
+    # Skip Excel lock files (~$Book.xlsx) left by open workbooks
+    xlsx_files = sorted(Path(f) for f in glob.glob(pattern, recursive=recursive) if not Path(f).name.startswith("~$"))
 
     if not xlsx_files:
         print(f"No XLSX files found in: {folder_path}")
         return []
 
+    manifest_dir = Path(output_dir).resolve() if output_dir else folder_path
+    manifest_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(manifest_dir)
+    workbooks = manifest["workbooks"]
+
     all_generated = []
+    todo = {}
     for xlsx_file in xlsx_files:
-        # If a global output_dir is given use it, otherwise put CSV next to the XLSX
-        dest = output_dir if output_dir else None
-        try:
-            generated = convert_xlsx_to_csv(xlsx_file, output_dir=dest, encoding=encoding)
-            all_generated.extend(generated)
-        except Exception as exc:
-            print(f"  ✘  Failed to convert {xlsx_file}: {exc}")
+        key = xlsx_file.relative_to(folder_path).as_posix()
+        signature = workbook_signature(xlsx_file, workbooks.get(key))
+        if not force and workbook_unchanged(signature, workbooks.get(key), encoding):
+            print(f"  ⏭  {key}: unchanged, skipped")
+            all_generated.extend(workbooks[key]["outputs"])
+            continue
+        todo[key] = (xlsx_file, signature)
 
+    def record(key, generated):
+        workbooks[key] = {**todo[key][1], "encoding": encoding, "outputs": generated}
+        save_manifest(manifest, manifest_dir)
+        all_generated.extend(generated)
+
+    # If a global output_dir is given use it, otherwise put CSV next to the XLSX
+    dest = str(output_dir) if output_dir else None
+    n_workers = min(workers or os.cpu_count() or 1, len(todo))
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = {pool.submit(_convert_job, str(xlsx_file), dest, encoding): key
+                       for key, (xlsx_file, _) in todo.items()}
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    generated, log_lines = future.result()
+                except Exception as exc:
+                    print(f"  ✘  Failed to convert {todo[key][0]}: {exc}")
+                    continue
+                for line in log_lines:
+                    print(line)
+                record(key, generated)
+    else:
+        for key, (xlsx_file, _) in todo.items():
+            try:
+                generated = convert_xlsx_to_csv(xlsx_file, output_dir=dest, encoding=encoding)
+            except Exception as exc:
+                print(f"  ✘  Failed to convert {xlsx_file}: {exc}")
+                continue
+            record(key, generated)
+
+    # Forget workbooks that were removed from the folder
+    current = {xlsx_file.relative_to(folder_path).as_posix() for xlsx_file in xlsx_files}
+    for key in set(workbooks) - current:
+        del workbooks[key]
+    save_manifest(manifest, manifest_dir)
+    print(f"\n  Converted: {len(todo)}  |  Unchanged: {len(xlsx_files) - len(todo)}"
+          f"  |  Reader: {XLSX_ENGINE or 'openpyxl'}")
     return all_generated
 
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Interactive CLI
 # ──────────────────────────────────────────────────────────────────────────────
-def main():
+def interactive():
     print("=" * 60)
     print("        XLSX  →  CSV  Converter")
     print("=" * 60)
@@ -116,10 +253,8 @@ def main():
 
     elif mode == "3":
         # Automatically target the project's Excel Format folder
-        project_root = Path(__file__).resolve().parent
-        data_folder = project_root / "Data" / "Soil Data ( District Wise)" / "Excel Format"
-        print(f"Targeting: {data_folder}\n")
-        results = convert_folder(str(data_folder), output_dir=output_dir,
+        print(f"Targeting: {SOIL_EXCEL_DIR}\n")
+        results = convert_folder(str(SOIL_EXCEL_DIR), output_dir=output_dir,
                                  recursive=False, encoding=encoding)
         print(f"\nTotal files created: {len(results)}")
 
@@ -130,5 +265,35 @@ def main():
     print("\nDone! ✔")
 
 
+def main():
+    parser = argparse.ArgumentParser(description="Convert XLSX workbooks (all sheets) to CSV")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--file", help="Convert a single XLSX file")
+    source.add_argument("--folder", help="Convert every XLSX file in a folder")
+    source.add_argument("--soil-data", action="store_true",
+                        help="Convert the soil Excel Format folder into CSV Format")
+    parser.add_argument("--output", default=None,
+                        help="Output directory (default: next to each XLSX; CSV Format for --soil-data)")
+    parser.add_argument("--encoding", default="utf-8", help="CSV encoding")
+    parser.add_argument("--recursive", action="store_true", help="Include sub-folders (--folder)")
+    parser.add_argument("--workers", type=int, default=None, help="Conversion processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Reconvert workbooks even if unchanged")
+    args = parser.parse_args()
+
+    if not (args.file or args.folder or args.soil_data):
+        interactive()
+        return
+
+    if args.file:
+        convert_xlsx_to_csv(args.file, output_dir=args.output, encoding=args.encoding)
+        return
+
+    folder = SOIL_EXCEL_DIR if args.soil_data else args.folder
+    output_dir = args.output or (str(SOIL_CSV_DIR) if args.soil_data else None)
+    results = convert_folder(str(folder), output_dir=output_dir, recursive=args.recursive,
+                             encoding=args.encoding, workers=args.workers, force=args.force)
+    print(f"\nTotal files: {len(results)}")
+
+
 if __name__ == "__main__":
     main()
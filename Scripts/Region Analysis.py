@@ -3,16 +3,45 @@ Comprehensive Data Analysis Script for Thanjavur Region
 =========================================================
 Analyzes soil data, crop prices, and provides detailed visualizations
 and statistics for the Thanjavur district in Tamil Nadu.
+
+Crop prices are read from the columnar market store (market_store.py, rebuilt
+only for crops whose CSV changed): just the columns used here, filtered on
+district while scanning, with Price Date already typed.
+
+--all-districts runs DistrictAnalysis instead: every soil CSV and the market
+rows of every soil district are loaded once, and the soil, crop-price and
+summary sections are computed as grouped passes into one table per section,
+keyed by district.
+
+Usage:
+    python "Scripts/Region Analysis.py"                   # Thanjavur report + figures
+    python "Scripts/Region Analysis.py" --preview         # low-dpi figures in preview/
+    python "Scripts/Region Analysis.py" --all-districts   # district_*.csv tables
+    python "Scripts/Region Analysis.py" --all-districts --figures
+
+Figures are rendered as one stage: the data behind each chart is hashed
+(_figure_manifest.json), unchanged figures are skipped and the rest are drawn
+in worker processes on the non-interactive Agg backend.
 """
 
+import os
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')   # files only; also what the rendering workers use
 import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
+import argparse
 import warnings
 warnings.filterwarnings('ignore')
 
+from market_store import build_market_store, read_market, read_market_dict
+
 # Set style for visualizations
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (14, 8)
@@ -20,8 +49,284 @@ plt.rcParams['font.size'] = 10
 
 # Define paths
 BASE_PATH = Path('.')
-SOIL_DATA_PATH = BASE_PATH / 'Data' / 'Soil Data ( District Wise)' / 'CSV Format' / 'THANJAVUR.csv'
+SOIL_DATA_DIR = BASE_PATH / 'Data' / 'Soil Data ( District Wise)' / 'CSV Format'
+SOIL_DATA_PATH = SOIL_DATA_DIR / 'THANJAVUR.csv'
 CROP_DATA_PATH = BASE_PATH / 'Data' / '3_Cleaned CSVs'
+MARKET_STORE_PATH = BASE_PATH / 'Data' / '4_Market Store'
+
+PRICE_COLUMNS = ['Min Price (Rs./Quintal)', 'Max Price (Rs./Quintal)', 'Modal Price (Rs./Quintal)']
+CROP_COLUMNS = ['District Name', 'Variety', *PRICE_COLUMNS, 'Price Date']
+
+# Soil district (title case) -> District Name used in the market data, where they differ
+MARKET_DISTRICT_NAMES = {
+    'Kanniyakumari': 'Nagercoil (Kannyiakumari)',
+    'Tiruchirappalli': 'Thiruchirappalli',
+    'Tirunelveli': 'Thirunelveli',
+    'Tiruvannamalai': 'Thiruvannamalai',
+}
+
+SOIL_STATUS_COLUMNS = [
+    'n_High', 'n_Medium', 'n_Low', 'p_High', 'p_Medium', 'p_Low', 'k_High', 'k_Medium', 'k_Low',
+    'pH_Alkaline', 'pH_Neutral', 'pH_Acidic', 'OC_High', 'OC_Medium', 'OC_Low',
+    'Fe_Sufficient', 'Zn_Sufficient', 'Cu_Sufficient', 'B_Sufficient', 'Mn_Sufficient',
+    'EC_NonSaline', 'EC_Saline',
+]
+# Status columns that split one block's samples; some district files store
+# sample counts instead of percentages, so each group is rescaled to 100
+SOIL_STATUS_GROUPS = [
+    ['n_High', 'n_Medium', 'n_Low'], ['p_High', 'p_Medium', 'p_Low'], ['k_High', 'k_Medium', 'k_Low'],
+    ['OC_High', 'OC_Medium', 'OC_Low'], ['pH_Alkaline', 'pH_Acidic', 'pH_Neutral'],
+    ['EC_NonSaline', 'EC_Saline'], ['S_Sufficient', 'S_Deficient'],
+    *[[f'{name}_Sufficient', f'{name}_Deficient'] for name in ['Fe', 'Zn', 'Cu', 'B', 'Mn']],
+]
+
+
+def soil_status_percent(soil):
+    """Copy of soil with every status group expressed as percent of the block's samples"""
+    soil = soil.copy()
+    for group in SOIL_STATUS_GROUPS:
+        if not all(col in soil.columns for col in group):
+            continue
+        values = soil[group].apply(pd.to_numeric, errors='coerce')
+        total = values.sum(axis=1).replace(0, np.nan)
+        soil[group] = values.div(total, axis=0) * 100
+    return soil
+
+
+# ============================================================================
+# FIGURE RENDERING
+# ============================================================================
+# Each figure is a (filename, renderer, data) job. data holds only the plain
+# numbers and labels the chart draws, so its hash says whether the figure
+# can change; unchanged figures are skipped and the rest render in worker
+# processes on the Agg backend.
+FIGURE_DPI = 300
+PREVIEW_DPI = 60
+FIGURE_STYLE_VERSION = 1     # bump when a renderer's look changes
+FIGURE_MANIFEST_NAME = '_figure_manifest.json'
+
+MACRONUTRIENTS = [
+    ('N (Nitrogen)', ['n_High', 'n_Medium', 'n_Low']),
+    ('P (Phosphorus)', ['p_High', 'p_Medium', 'p_Low']),
+    ('K (Potassium)', ['k_High', 'k_Medium', 'k_Low']),
+]
+MICRONUTRIENTS = ['Fe', 'Zn', 'Cu', 'B', 'Mn']
+
+
+def _save_figure(fig, path, dpi, preview):
+    fig.tight_layout()
+    # bbox_inches='tight' costs a second draw; previews skip it
+    fig.savefig(path, dpi=dpi, bbox_inches=None if preview else 'tight')
+    plt.close(fig)
+
+
+def plot_macronutrients(data, path, dpi, preview=False):
+    fig, axes = plt.subplots(1, 3, figsize=(16, 5))
+    fig.suptitle(f"Macronutrients Distribution - {data['region']}", fontsize=14, fontweight='bold')
+    colors = ['#2ecc71', '#f39c12', '#e74c3c']
+    for idx, (nutrient_name, values) in enumerate(data['nutrients']):
+        axes[idx].pie(values, labels=['High', 'Medium', 'Low'], autopct='%1.1f%%',
+                     colors=colors, startangle=90)
+        axes[idx].set_title(nutrient_name, fontweight='bold')
+    _save_figure(fig, path, dpi, preview)
+
+
+def plot_ph_distribution(data, path, dpi, preview=False):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ph_values = data['values']
+    bars = ax.bar(['Acidic', 'Neutral', 'Alkaline'], ph_values,
+                  color=['#3498db', '#2ecc71', '#e67e22'], edgecolor='black', linewidth=1.5)
+    ax.set_ylabel('Percentage (%)', fontsize=12, fontweight='bold')
+    ax.set_title(f"Soil pH Classification - {data['region']}", fontsize=14, fontweight='bold')
+    ax.set_ylim(0, max(ph_values) * 1.1)
+    
+    # Add value labels on bars
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+               f'{height:.1f}%', ha='center', va='bottom', fontweight='bold')
+    _save_figure(fig, path, dpi, preview)
+
+
+def plot_micronutrients(data, path, dpi, preview=False):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    bars = ax.bar(MICRONUTRIENTS, data['sufficient'], color='#9b59b6', edgecolor='black', linewidth=1.5)
+    ax.set_ylabel('Sufficient (%)', fontsize=12, fontweight='bold')
+    ax.set_xlabel('Micronutrient', fontsize=12, fontweight='bold')
+    ax.set_title(f"Micronutrient Sufficiency Status - {data['region']}", fontsize=14, fontweight='bold')
+    ax.set_ylim(0, 100)
+    ax.axhline(y=50, color='r', linestyle='--', alpha=0.5, label='50% threshold')
+    
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+               f'{height:.1f}%', ha='center', va='bottom', fontweight='bold')
+    
+    ax.legend()
+    _save_figure(fig, path, dpi, preview)
+
+
+def plot_block_quality(data, path, dpi, preview=False):
+    fig, ax = plt.subplots(figsize=(14, 7))
+    bars = ax.barh(data['blocks'], data['scores'], color='#1abc9c', edgecolor='black', linewidth=1.5)
+    ax.set_xlabel('Soil Quality Score', fontsize=12, fontweight='bold')
+    ax.set_title(f"Soil Quality Index by Block - {data['region']}", fontsize=14, fontweight='bold')
+    
+    for bar, val in zip(bars, data['scores']):
+        ax.text(val, bar.get_y() + bar.get_height()/2., f'{val:.1f}',
+               ha='left', va='center', fontweight='bold', fontsize=9)
+    _save_figure(fig, path, dpi, preview)
+
+
+def plot_crop_prices(data, path, dpi, preview=False):
+    fig, ax = plt.subplots(figsize=(14, 8))
+    colors_grad = plt.cm.viridis(np.linspace(0, 1, len(data['crops'])))
+    bars = ax.barh(data['crops'], data['prices'], color=colors_grad, edgecolor='black')
+    ax.set_xlabel('Average Modal Price (Rs./Quintal)', fontsize=12, fontweight='bold')
+    ax.set_title(f"Average Crop Prices - {data['region']}", fontsize=14, fontweight='bold')
+    
+    for bar, val in zip(bars, data['prices']):
+        ax.text(val, bar.get_y() + bar.get_height()/2., f'₹{val:.0f}',
+               ha='left', va='center', fontweight='bold', fontsize=9)
+    _save_figure(fig, path, dpi, preview)
+
+
+def plot_crop_records(data, path, dpi, preview=False):
+    fig, ax = plt.subplots(figsize=(12, 8))
+    bars = ax.barh(data['crops'], data['counts'], color='#e74c3c', edgecolor='black', linewidth=1.5)
+    ax.set_xlabel('Number of Records', fontsize=12, fontweight='bold')
+    ax.set_title(f"Data Records by Crop - {data['region']}", fontsize=14, fontweight='bold')
+    
+    for bar, val in zip(bars, data['counts']):
+        ax.text(val, bar.get_y() + bar.get_height()/2., f'{int(val)}',
+               ha='left', va='center', fontweight='bold', fontsize=10)
+    _save_figure(fig, path, dpi, preview)
+
+
+def soil_figure_jobs(df, region='Thanjavur Region', subdir=''):
+    """Figure jobs 1-4 (soil) for one region's soil rows"""
+    block_quality = df.assign(Soil_Quality_Score=(
+        df['n_Medium'] + df['n_High'] + df['p_Medium'] + df['p_High'] + df['k_Medium'] + df['k_High']
+    ) / 6).sort_values('Soil_Quality_Score', ascending=True)
+    return [
+        (f'{subdir}soil_macronutrients.png', plot_macronutrients, {
+            'region': region,
+            'nutrients': [[name, [float(df[col].sum()) for col in cols]] for name, cols in MACRONUTRIENTS],
+        }),
+        (f'{subdir}soil_pH_distribution.png', plot_ph_distribution, {
+            'region': region,
+            'values': [float(df[col].sum()) for col in ['pH_Acidic', 'pH_Neutral', 'pH_Alkaline']],
+        }),
+        (f'{subdir}soil_micronutrients.png', plot_micronutrients, {
+            'region': region,
+            'sufficient': [float(df[f'{name}_Sufficient'].sum()) for name in MICRONUTRIENTS],
+        }),
+        (f'{subdir}soil_block_comparison.png', plot_block_quality, {
+            'region': region,
+            'blocks': block_quality['Block'].astype(str).tolist(),
+            'scores': block_quality['Soil_Quality_Score'].astype(float).tolist(),
+        }),
+    ]
+
+
+def crop_figure_jobs(crop_df, region='Thanjavur Region', subdir=''):
+    """Figure jobs 5-6 (crop prices) from a frame with Crop, Avg_Modal_Price and Count"""
+    if crop_df.empty:
+        return []
+    by_price = crop_df.sort_values('Avg_Modal_Price', ascending=False)
+    by_count = by_price.sort_values('Count', ascending=True)
+    return [
+        (f'{subdir}crop_prices_comparison.png', plot_crop_prices, {
+            'region': region,
+            'crops': by_price['Crop'].tolist(),
+            'prices': by_price['Avg_Modal_Price'].astype(float).tolist(),
+        }),
+        (f'{subdir}crop_records_count.png', plot_crop_records, {
+            'region': region,
+            'crops': by_count['Crop'].tolist(),
+            'counts': by_count['Count'].astype(int).tolist(),
+        }),
+    ]
+
+
+def figure_digest(renderer, data, dpi, preview):
+    payload = json.dumps([renderer.__name__, FIGURE_STYLE_VERSION, dpi, preview, data],
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def render_figures(jobs, output_dir=Path('.'), preview=False, workers=None, force=False):
+    """
+    Render figure jobs into output_dir (previews go to output_dir/preview at
+    PREVIEW_DPI), skipping figures whose data hash matches the last render.
+    
+    A figure that fails to render is logged and left out of the manifest; the
+    manifest is saved even if rendering stops early, so finished figures are
+    not redrawn next time.
+    
+    Returns:
+        Dict with the rendered, skipped and failed filenames.
+    """
+    output_dir = Path(output_dir) / 'preview' if preview else Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    dpi = PREVIEW_DPI if preview else FIGURE_DPI
+    manifest_path = output_dir / FIGURE_MANIFEST_NAME
+    manifest = json.loads(manifest_path.read_text(encoding='utf-8')) if manifest_path.exists() else {}
+    
+    todo, skipped = [], []
+    for filename, renderer, data in jobs:
+        path = output_dir / filename
+        digest = figure_digest(renderer, data, dpi, preview)
+        if not force and manifest.get(filename) == digest and path.exists():
+            skipped.append(filename)
+            continue
+        path.parent.mkdir(parents=True, exist_ok=True)
+        todo.append((filename, renderer, data, path, digest))
+    
+    rendered, failed = [], []
+    
+    def done(filename, digest):
+        manifest[filename] = digest
+        rendered.append(filename)
+        print(f"✓ Saved: {filename}")
+    
+    def fail(filename, error):
+        manifest.pop(filename, None)
+        failed.append(filename)
+        print(f"✗ Error rendering {filename}: {error}")
+    
+    n_workers = min(workers or os.cpu_count() or 1, len(todo))
+    try:
+        if n_workers > 1:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                futures = {pool.submit(renderer, data, str(path), dpi, preview): (filename, digest)
+                           for filename, renderer, data, path, digest in todo}
+                for future in as_completed(futures):
+                    filename, digest = futures[future]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        fail(filename, e)
+                    else:
+                        done(filename, digest)
+        else:
+            for filename, renderer, data, path, digest in todo:
+                try:
+                    renderer(data, str(path), dpi, preview)
+                except Exception as e:
+                    fail(filename, e)
+                else:
+                    done(filename, digest)
+    finally:
+        tmp_path = manifest_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding='utf-8')
+        tmp_path.replace(manifest_path)
+    
+    if skipped:
+        print(f"⏭  {len(skipped)} unchanged figure(s) skipped")
+    if failed:
+        print(f"⚠ {len(failed)} figure(s) failed to render")
+    return {'rendered': rendered, 'skipped': skipped, 'failed': failed}
 
 
 class ThanjavurAnalysis:
@@ -55,30 +360,19 @@ class ThanjavurAnalysis:
         print("LOADING CROP PRICE DATA")
         print("=" * 80)
         
-        csv_files = list(CROP_DATA_PATH.glob('*.csv'))
-        
-        if not csv_files:
+        if not any(CROP_DATA_PATH.glob('*.csv')):
             print("✗ No CSV files found in crop data directory")
             return
         
-        thanjavur_records = 0
+        # Only the Thanjavur rows of the needed columns are materialised
+        build_market_store(CROP_DATA_PATH, MARKET_STORE_PATH, verbose=False)
+        self.crop_data = read_market_dict(columns=CROP_COLUMNS, district_match='thanjavur',
+                                          store_dir=MARKET_STORE_PATH)
         
-        for csv_file in csv_files:
-            try:
-                df = pd.read_csv(csv_file)
-                
-                # Filter for Thanjavur region only
-                if 'District Name' in df.columns:
-                    thanjavur_df = df[df['District Name'].str.contains('Thanjavur|THANJAVUR', 
-                                                                        case=False, na=False)]
-                    
-                    if len(thanjavur_df) > 0:
-                        self.crop_data[csv_file.stem] = thanjavur_df
-                        thanjavur_records += len(thanjavur_df)
-                        print(f"✓ {csv_file.stem}: {len(thanjavur_df)} records")
-            
-            except Exception as e:
-                print(f"✗ Error loading {csv_file.stem}: {str(e)}")
+        thanjavur_records = 0
+        for crop_name, thanjavur_df in self.crop_data.items():
+            thanjavur_records += len(thanjavur_df)
+            print(f"✓ {crop_name}: {len(thanjavur_df)} records")
         
         print(f"\nTotal Thanjavur crop price records: {thanjavur_records}")
         return len(self.crop_data) > 0
@@ -188,14 +482,10 @@ class ThanjavurAnalysis:
                 print(f"   Avg Max Price: ₹{avg_max:.2f}/Quintal")
                 print(f"   Avg Modal Price: ₹{avg_modal:.2f}/Quintal")
                 
-                # Convert Price Date to datetime and find date range
-                if 'Price Date' in df.columns:
-                    try:
-                        df['Price Date'] = pd.to_datetime(df['Price Date'])
-                        date_range = f"{df['Price Date'].min().date()} to {df['Price Date'].max().date()}"
-                        print(f"   Date Range: {date_range}")
-                    except:
-                        pass
+                # Price Date is already a datetime column in the store
+                if 'Price Date' in df.columns and df['Price Date'].notna().any():
+                    date_range = f"{df['Price Date'].min().date()} to {df['Price Date'].max().date()}"
+                    print(f"   Date Range: {date_range}")
                 
                 if 'Variety' in df.columns:
                     varieties = df['Variety'].nunique()
@@ -213,127 +503,10 @@ class ThanjavurAnalysis:
         
         return crop_analysis
     
-    def generate_soil_visualizations(self):
-        """Create soil data visualizations"""
-        if self.soil_data is None:
-            print("No soil data for visualizations")
-            return
-        
-        print("\n" + "=" * 80)
-        print("GENERATING SOIL DATA VISUALIZATIONS")
-        print("=" * 80)
-        
-        df = self.soil_data
-        
-        # Figure 1: Macronutrients Distribution
-        fig, axes = plt.subplots(1, 3, figsize=(16, 5))
-        fig.suptitle('Macronutrients Distribution - Thanjavur Region', fontsize=14, fontweight='bold')
-        
-        nutrients = [
-            ('N (Nitrogen)', ['n_High', 'n_Medium', 'n_Low']),
-            ('P (Phosphorus)', ['p_High', 'p_Medium', 'p_Low']),
-            ('K (Potassium)', ['k_High', 'k_Medium', 'k_Low'])
-        ]
-        
-        colors = ['#2ecc71', '#f39c12', '#e74c3c']
-        
-        for idx, (nutrient_name, cols) in enumerate(nutrients):
-            values = [df[cols[0]].sum(), df[cols[1]].sum(), df[cols[2]].sum()]
-            axes[idx].pie(values, labels=['High', 'Medium', 'Low'], autopct='%1.1f%%',
-                         colors=colors, startangle=90)
-            axes[idx].set_title(nutrient_name, fontweight='bold')
-        
-        plt.tight_layout()
-        plt.savefig('soil_macronutrients.png', dpi=300, bbox_inches='tight')
-        print("✓ Saved: soil_macronutrients.png")
-        plt.close()
-        
-        # Figure 2: pH Distribution
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ph_values = [df['pH_Acidic'].sum(), df['pH_Neutral'].sum(), df['pH_Alkaline'].sum()]
-        bars = ax.bar(['Acidic', 'Neutral', 'Alkaline'], ph_values, 
-                      color=['#3498db', '#2ecc71', '#e67e22'], edgecolor='black', linewidth=1.5)
-        ax.set_ylabel('Percentage (%)', fontsize=12, fontweight='bold')
-        ax.set_title('Soil pH Classification - Thanjavur Region', fontsize=14, fontweight='bold')
-        ax.set_ylim(0, max(ph_values) * 1.1)
-        
-        # Add value labels on bars
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{height:.1f}%', ha='center', va='bottom', fontweight='bold')
-        
-        plt.tight_layout()
-        plt.savefig('soil_pH_distribution.png', dpi=300, bbox_inches='tight')
-        print("✓ Saved: soil_pH_distribution.png")
-        plt.close()
-        
-        # Figure 3: Micronutrients Sufficiency
-        fig, ax = plt.subplots(figsize=(12, 6))
-        micronutrients = ['Fe', 'Zn', 'Cu', 'B', 'Mn']
-        sufficient = [
-            df['Fe_Sufficient'].sum(),
-            df['Zn_Sufficient'].sum(),
-            df['Cu_Sufficient'].sum(),
-            df['B_Sufficient'].sum(),
-            df['Mn_Sufficient'].sum()
-        ]
-        
-        bars = ax.bar(micronutrients, sufficient, color='#9b59b6', edgecolor='black', linewidth=1.5)
-        ax.set_ylabel('Sufficient (%)', fontsize=12, fontweight='bold')
-        ax.set_xlabel('Micronutrient', fontsize=12, fontweight='bold')
-        ax.set_title('Micronutrient Sufficiency Status - Thanjavur Region', fontsize=14, fontweight='bold')
-        ax.set_ylim(0, 100)
-        ax.axhline(y=50, color='r', linestyle='--', alpha=0.5, label='50% threshold')
-        
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{height:.1f}%', ha='center', va='bottom', fontweight='bold')
-        
-        ax.legend()
-        plt.tight_layout()
-        plt.savefig('soil_micronutrients.png', dpi=300, bbox_inches='tight')
-        print("✓ Saved: soil_micronutrients.png")
-        plt.close()
-        
-        # Figure 4: Block-wise Soil Quality Comparison
-        fig, ax = plt.subplots(figsize=(14, 7))
-        
-        # Calculate soil quality score for each block
-        block_quality = df.copy()
-        block_quality['Soil_Quality_Score'] = (
-            block_quality['n_Medium'] + block_quality['n_High'] +
-            block_quality['p_Medium'] + block_quality['p_High'] +
-            block_quality['k_Medium'] + block_quality['k_High']
-        ) / 6
-        
-        block_quality_sorted = block_quality.sort_values('Soil_Quality_Score', ascending=True)
-        
-        bars = ax.barh(block_quality_sorted['Block'], block_quality_sorted['Soil_Quality_Score'],
-                       color='#1abc9c', edgecolor='black', linewidth=1.5)
-        ax.set_xlabel('Soil Quality Score', fontsize=12, fontweight='bold')
-        ax.set_title('Soil Quality Index by Block - Thanjavur Region', fontsize=14, fontweight='bold')
-        
-        for idx, (bar, val) in enumerate(zip(bars, block_quality_sorted['Soil_Quality_Score'])):
-            ax.text(val, bar.get_y() + bar.get_height()/2., f'{val:.1f}',
-                   ha='left', va='center', fontweight='bold', fontsize=9)
-        
-        plt.tight_layout()
-        plt.savefig('soil_block_comparison.png', dpi=300, bbox_inches='tight')
-        print("✓ Saved: soil_block_comparison.png")
-        plt.close()
-    
-    def generate_crop_price_visualizations(self):
-        """Create crop price visualizations"""
-        if not self.crop_data:
-            print("No crop data for visualizations")
-            return
-        
-        print("\n" + "=" * 80)
-        print("GENERATING CROP PRICE VISUALIZATIONS")
-        print("=" * 80)
-        
+    def soil_figure_jobs(self):
+        return soil_figure_jobs(self.soil_data) if self.soil_data is not None else []
+    
+    def crop_figure_jobs(self):
         # Combine all crop data
         all_crops = []
         
@@ -350,42 +523,37 @@ class ThanjavurAnalysis:
                     'Count': len(df)
                 })
         
-        if all_crops:
-            crop_df = pd.DataFrame(all_crops).sort_values('Avg_Modal_Price', ascending=False)
-            
-            # Figure 5: Crop Price Comparison
-            fig, ax = plt.subplots(figsize=(14, 8))
-            colors_grad = plt.cm.viridis(np.linspace(0, 1, len(crop_df)))
-            bars = ax.barh(crop_df['Crop'], crop_df['Avg_Modal_Price'], color=colors_grad, edgecolor='black')
-            ax.set_xlabel('Average Modal Price (Rs./Quintal)', fontsize=12, fontweight='bold')
-            ax.set_title('Average Crop Prices - Thanjavur Region', fontsize=14, fontweight='bold')
-            
-            for bar, val in zip(bars, crop_df['Avg_Modal_Price']):
-                ax.text(val, bar.get_y() + bar.get_height()/2., f'₹{val:.0f}',
-                       ha='left', va='center', fontweight='bold', fontsize=9)
-            
-            plt.tight_layout()
-            plt.savefig('crop_prices_comparison.png', dpi=300, bbox_inches='tight')
-            print("✓ Saved: crop_prices_comparison.png")
-            plt.close()
-        
-        # Figure 6: Records count by crop
-        if all_crops:
-            crop_df_sorted = crop_df.sort_values('Count', ascending=True)
-            fig, ax = plt.subplots(figsize=(12, 8))
-            bars = ax.barh(crop_df_sorted['Crop'], crop_df_sorted['Count'], 
-                          color='#e74c3c', edgecolor='black', linewidth=1.5)
-            ax.set_xlabel('Number of Records', fontsize=12, fontweight='bold')
-            ax.set_title('Data Records by Crop - Thanjavur Region', fontsize=14, fontweight='bold')
-            
-            for bar, val in zip(bars, crop_df_sorted['Count']):
-                ax.text(val, bar.get_y() + bar.get_height()/2., f'{int(val)}',
-                       ha='left', va='center', fontweight='bold', fontsize=10)
-            
-            plt.tight_layout()
-            plt.savefig('crop_records_count.png', dpi=300, bbox_inches='tight')
-            print("✓ Saved: crop_records_count.png")
-            plt.close()
+        return crop_figure_jobs(pd.DataFrame(all_crops, columns=['Crop', 'Avg_Modal_Price', 'Count']))
+    
+    def generate_soil_visualizations(self, preview=False, workers=None, force=False):
+        """Create soil data visualizations"""
+        if self.soil_data is None:
+            print("No soil data for visualizations")
+            return
+        
+        print("\n" + "=" * 80)
+        print("GENERATING SOIL DATA VISUALIZATIONS")
+        print("=" * 80)
+        return render_figures(self.soil_figure_jobs(), preview=preview, workers=workers, force=force)
+    
+    def generate_crop_price_visualizations(self, preview=False, workers=None, force=False):
+        """Create crop price visualizations"""
+        if not self.crop_data:
+            print("No crop data for visualizations")
+            return
+        
+        print("\n" + "=" * 80)
+        print("GENERATING CROP PRICE VISUALIZATIONS")
+        print("=" * 80)
+        return render_figures(self.crop_figure_jobs(), preview=preview, workers=workers, force=force)
+    
+    def generate_visualizations(self, preview=False, workers=None, force=False):
+        """Soil and crop price figures in one rendering stage (one worker pool)"""
+        print("\n" + "=" * 80)
+        print("GENERATING VISUALIZATIONS")
+        print("=" * 80)
+        return render_figures(self.soil_figure_jobs() + self.crop_figure_jobs(),
+                              preview=preview, workers=workers, force=force)
     
     def generate_summary_report(self):
         """Generate comprehensive summary report"""
@@ -450,8 +618,178 @@ class ThanjavurAnalysis:
         print("=" * 80)
 
 
+class DistrictAnalysis:
+    """Statewide variant: every soil district analysed in grouped passes, one table per section"""
+    
+    def __init__(self, districts=None):
+        self.districts = districts
+        self.soil_data = None
+        self.price_data = None
+    
+    def load_soil_data(self):
+        """Load every district's soil CSV into one frame keyed by title-case District"""
+        print("=" * 80)
+        print("LOADING SOIL DATA FOR ALL DISTRICTS")
+        print("=" * 80)
+        
+        frames = [pd.read_csv(csv_file) for csv_file in sorted(SOIL_DATA_DIR.glob('*.csv'))]
+        if not frames:
+            print(f"✗ Error: No soil CSV files found in {SOIL_DATA_DIR}")
+            return False
+        
+        # Files mix percentages and raw sample counts; normalise before any grouping
+        soil = soil_status_percent(pd.concat(frames, ignore_index=True))
+        soil['District'] = soil['District'].str.strip().str.title()
+        if self.districts is not None:
+            soil = soil[soil['District'].isin(self.districts)]
+        self.soil_data = soil.reset_index(drop=True)
+        print(f"✓ Soil data loaded: {len(soil)} records, {soil['District'].nunique()} districts")
+        return True
+    
+    def load_crop_price_data(self):
+        """One market-store read covering every soil district, labelled with the soil district name"""
+        print("\n" + "=" * 80)
+        print("LOADING CROP PRICE DATA FOR ALL DISTRICTS")
+        print("=" * 80)
+        
+        if self.soil_data is None:
+            print("✗ Load soil data first (it defines the districts)")
+            return False
+        
+        to_market = {district: MARKET_DISTRICT_NAMES.get(district, district)
+                     for district in self.soil_data['District'].unique()}
+        build_market_store(CROP_DATA_PATH, MARKET_STORE_PATH, verbose=False)
+        prices = read_market(columns=['crop', *CROP_COLUMNS], districts=list(to_market.values()),
+                             store_dir=MARKET_STORE_PATH)
+        to_soil = {market: district for district, market in to_market.items()}
+        prices['District'] = prices['District Name'].astype(str).map(to_soil)
+        self.price_data = prices
+        print(f"✓ {len(prices)} price records across {prices['District'].nunique()} districts "
+              f"and {prices['crop'].nunique()} crops")
+        return True
+    
+    def analyze_soil_data(self):
+        """Per-district soil status (the figures analyze_soil_data prints), one grouped pass
+
+        Status columns are block-averaged percentages: summing per-block
+        percentages would scale with the number of blocks.
+        """
+        soil = self.soil_data
+        status_cols = [col for col in SOIL_STATUS_COLUMNS if col in soil.columns]
+        grouped = soil.groupby('District', sort=True)
+        table = grouped[status_cols].mean().round(2)
+        table.insert(0, 'Blocks', grouped['Block'].nunique())
+        table.insert(0, 'Records', grouped.size())
+        return table.reset_index()
+    
+    def analyze_crop_prices(self):
+        """Per (district, crop) price statistics (the figures analyze_crop_prices prints), one grouped pass"""
+        grouped = self.price_data.groupby(['District', 'crop'], sort=True, observed=True)
+        table = grouped.agg(
+            Records=('Modal Price (Rs./Quintal)', 'size'),
+            Avg_Min_Price=('Min Price (Rs./Quintal)', 'mean'),
+            Avg_Max_Price=('Max Price (Rs./Quintal)', 'mean'),
+            Avg_Modal_Price=('Modal Price (Rs./Quintal)', 'mean'),
+            First_Date=('Price Date', 'min'),
+            Last_Date=('Price Date', 'max'),
+            Varieties=('Variety', 'nunique'),
+        )
+        return table.reset_index().rename(columns={'crop': 'Crop'})
+    
+    def generate_summary_report(self, soil_table=None, crop_table=None):
+        """Per-district executive summary (the figures generate_summary_report prints)"""
+        soil_table = self.analyze_soil_data() if soil_table is None else soil_table
+        crop_table = self.analyze_crop_prices() if crop_table is None else crop_table
+        
+        deficits = self.soil_data.groupby('District', sort=True)[['n_Low', 'p_Low', 'k_Low', 'pH_Neutral', 'pH_Alkaline']].mean()
+        report = pd.DataFrame({
+            'Blocks': soil_table.set_index('District')['Blocks'],
+            'Soil_Records': soil_table.set_index('District')['Records'],
+            'N_Deficit_Pct': deficits['n_Low'].round(1),
+            'P_Deficit_Pct': deficits['p_Low'].round(1),
+            'K_Deficit_Pct': deficits['k_Low'].round(1),
+            'pH_Profile': np.select([deficits['pH_Neutral'] > 50, deficits['pH_Alkaline'] > 50],
+                                    ['Neutral', 'Alkaline'], 'Acidic'),
+        })
+        
+        by_district = crop_table.groupby('District', sort=True)
+        ranked = crop_table.dropna(subset=['Avg_Modal_Price'])
+        highest = ranked.loc[ranked.groupby('District')['Avg_Modal_Price'].idxmax()].set_index('District')
+        lowest = ranked.loc[ranked.groupby('District')['Avg_Modal_Price'].idxmin()].set_index('District')
+        report['Crops_With_Prices'] = by_district.size()
+        report['Price_Records'] = by_district['Records'].sum()
+        report['Highest_Priced_Crop'] = highest['Crop']
+        report['Highest_Avg_Modal_Price'] = highest['Avg_Modal_Price'].round(2)
+        report['Lowest_Priced_Crop'] = lowest['Crop']
+        report['Lowest_Avg_Modal_Price'] = lowest['Avg_Modal_Price'].round(2)
+        report[['Crops_With_Prices', 'Price_Records']] = report[['Crops_With_Prices', 'Price_Records']].fillna(0).astype(int)
+        return report.rename_axis('District').reset_index()
+    
+    def figure_jobs(self, crop_table):
+        """Per-district copies of the six Thanjavur figures, one subfolder per district"""
+        jobs = []
+        crops = crop_table.assign(Crop=crop_table['Crop'].str.replace('_', ' ').str.title())
+        crops = crops.rename(columns={'Records': 'Count'})
+        for district, soil in self.soil_data.groupby('District', sort=True):
+            region = f'{district} District'
+            jobs += soil_figure_jobs(soil, region=region, subdir=f'{district}/')
+            jobs += crop_figure_jobs(crops[crops['District'] == district], region=region, subdir=f'{district}/')
+        return jobs
+    
+    def run(self, output_dir=Path('.'), figures=False, preview=False, workers=None, force=False):
+        """Load once, build the three tables and save them as district_*.csv (figures under figures/)"""
+        if not self.load_soil_data():
+            return None
+        self.load_crop_price_data()
+        
+        soil_table = self.analyze_soil_data()
+        crop_table = self.analyze_crop_prices()
+        report = self.generate_summary_report(soil_table, crop_table)
+        tables = {
+            'district_soil_summary.csv': soil_table,
+            'district_crop_prices.csv': crop_table,
+            'district_summary_report.csv': report,
+        }
+        
+        print("\n" + "=" * 80)
+        print("DISTRICT SUMMARY REPORT")
+        print("=" * 80)
+        print(report.to_string(index=False))
+        
+        print()
+        for filename, table in tables.items():
+            table.to_csv(Path(output_dir) / filename, index=False)
+            print(f"✓ Saved: {filename} ({len(table)} rows)")
+        
+        if figures:
+            print("\n" + "=" * 80)
+            print("GENERATING DISTRICT VISUALIZATIONS")
+            print("=" * 80)
+            render_figures(self.figure_jobs(crop_table), Path(output_dir) / 'figures',
+                           preview=preview, workers=workers, force=force)
+        return tables
+
+
 def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description="Soil and crop-price analysis by region")
+    parser.add_argument('--all-districts', action='store_true',
+                        help="Analyse every soil district in grouped passes and save district_*.csv tables")
+    parser.add_argument('--districts', nargs='+', default=None,
+                        help="With --all-districts, limit to these soil districts (e.g. Thanjavur Thiruvarur)")
+    parser.add_argument('--figures', action='store_true',
+                        help="With --all-districts, also render each district's figures under figures/")
+    parser.add_argument('--preview', action='store_true',
+                        help=f"Quick {PREVIEW_DPI}-dpi figures in preview/ instead of {FIGURE_DPI}-dpi output")
+    parser.add_argument('--workers', type=int, default=None, help="Figure rendering processes (default: CPU count)")
+    parser.add_argument('--force-figures', action='store_true', help="Re-render figures even if their data is unchanged")
+    args = parser.parse_args()
+    render_options = {'preview': args.preview, 'workers': args.workers, 'force': args.force_figures}
+    
+    if args.all_districts:
+        DistrictAnalysis(districts=args.districts).run(figures=args.figures, **render_options)
+        return
+    
     analyzer = ThanjavurAnalysis()
     
     # Load data
@@ -462,9 +800,8 @@ def main():
     analyzer.analyze_soil_data()
     analyzer.analyze_crop_prices()
     
-    # Generate visualizations
-    analyzer.generate_soil_visualizations()
-    analyzer.generate_crop_price_visualizations()
+    # Generate visualizations (unchanged figures are skipped, the rest render in parallel)
+    analyzer.generate_visualizations(**render_options)
     
     # Summary report
     analyzer.generate_summary_report()
@@ -4,11 +4,31 @@ Remove Fragmented Crop CSV Files and Replace with Consolidated Versions
 Deletes split/fragmented crop files and replaces them with consolidated versions.
 For example: Removes Paddy-2015-2019.csv, Paddy-2019-2022.csv, Paddy-2022-2025.csv
             and replaces with single Paddy.csv
+
+The new directory is assembled next to the original as a staging tree of
+hardlinks (copy fallback when linking is not possible), checked (a hardlink
+must be the same file as its source, a copy must match the source's SHA-256),
+and committed with one directory swap.
+No file data is rewritten, and readers of 3_Cleaned CSVs see either the old
+directory or the new one, never a mix of fragments and consolidated files.
+
+    3_Cleaned CSVs.staging/    new tree being assembled (+ _swap_manifest.json)
+    3_Cleaned CSVs.previous/   old tree after the swap (removed unless --keep-backup)
+
+Usage:
+    python "Scripts/ReplaceWithConsolidated.py"
+    python "Scripts/ReplaceWithConsolidated.py" --keep-backup
 """
 
+import os
+import sys
+import json
 import shutil
+import ctypes
+import argparse
 from pathlib import Path
-import os
+
+from file_hash import file_sha256
 
 # ============================================================================
 # 1. SETUP
@@ -16,124 +36,235 @@ import os
 original_path = Path(r'c:\Users\tanis\Documents\Project 2\Project---2\Data\3_Cleaned CSVs')
 consolidated_path = Path(r'c:\Users\tanis\Documents\Project 2\Project---2\Data\3_Cleaned CSVs\Consolidated')
 
-print("="*80)
-print("REPLACING FRAGMENTED FILES WITH CONSOLIDATED VERSIONS")
-print("="*80)
+year_patterns = ['-2015-2019', '-2019-2022', '-2022-2025', '-2024-2025', '-2025', '-2024', '-2022', '-2019', '-2015']
+SWAP_MANIFEST_NAME = '_swap_manifest.json'
+RENAME_EXCHANGE = 2
+AT_FDCWD = -100
+
+
+def is_fragmented(filename: str) -> bool:
+    return any(year_pattern in filename for year_pattern in year_patterns)
+
 
 # ============================================================================
-# 2. IDENTIFY FRAGMENTED FILES
+# 2. STAGING
 # ============================================================================
-print("\nSTEP 1: IDENTIFYING FRAGMENTED FILES TO REMOVE")
-print("-" * 80)
+def link_or_copy(source: Path, destination: Path) -> str:
+    """Hardlink source to destination, copying when linking fails; returns the method used."""
+    try:
+        os.link(source, destination)
+        return 'hardlink'
+    except OSError:
+        shutil.copy2(source, destination)
+        return 'copy'
 
-year_patterns = ['-2015-2019', '-2019-2022', '-2022-2025', '-2024-2025', '-2025', '-2024', '-2022', '-2019', '-2015']
-fragmented_files = []
 
-# Find all fragmented files in original directory
-for csv_file in original_path.glob('*.csv'):
-    filename = csv_file.name
-    for year_pattern in year_patterns:
-        if year_pattern in filename:
-            fragmented_files.append(csv_file)
-            break
+def mirror_tree(source_dir: Path, staging_dir: Path, skip=lambda path: False) -> int:
+    """Recreate source_dir under staging_dir with hardlinked files; returns files linked."""
+    linked = 0
+    for root, dirs, files in os.walk(source_dir):
+        root = Path(root)
+        target_root = staging_dir / root.relative_to(source_dir)
+        target_root.mkdir(parents=True, exist_ok=True)
+        for name in files:
+            if not skip(root / name):
+                link_or_copy(root / name, target_root / name)
+                linked += 1
+    return linked
 
-print(f"\n✓ Found {len(fragmented_files)} fragmented files to remove:")
-for f in sorted(fragmented_files):
-    print(f"   • {f.name}")
 
-# ============================================================================
-# 3. COPY CONSOLIDATED FILES TO ORIGINAL LOCATION
-# ============================================================================
-print("\n" + "="*80)
-print("STEP 2: COPYING CONSOLIDATED FILES")
-print("-" * 80)
+def stage_replacement(original_dir: Path, consolidated_dir: Path, staging_dir: Path) -> dict:
+    """
+    Build the post-swap tree in staging_dir and verify it.
 
-consolidated_files = list(consolidated_path.glob('*.csv'))
-print(f"\n✓ Found {len(consolidated_files)} consolidated files to copy:")
+    Top-level fragments are left out, every consolidated CSV is placed at the
+    top level, and everything else (including subdirectories such as
+    Consolidated/) is mirrored as-is.
 
-copied_count = 0
-for consolidated_file in sorted(consolidated_files):
-    try:
-        destination = original_path / consolidated_file.name
-        shutil.copy2(consolidated_file, destination)
-        print(f"   ✓ {consolidated_file.name}")
-        copied_count += 1
-    except Exception as e:
-        print(f"   ✗ Error copying {consolidated_file.name}: {str(e)}")
+    Returns:
+        The swap manifest: removed fragments and, per placed file, its source
+        (absolute path), sha256, method and check ('same file' for hardlinks,
+        'sha256' for copies).
+    """
+    if staging_dir.exists():
+        # Left over from an interrupted run; it was never visible to readers
+        shutil.rmtree(staging_dir)
+
+    fragmented_files = sorted(f for f in original_dir.glob('*.csv') if is_fragmented(f.name))
+    consolidated_files = sorted(consolidated_dir.glob('*.csv'))
+    replaced_names = {f.name for f in consolidated_files}
+
+    mirror_tree(
+        original_dir, staging_dir,
+        skip=lambda path: path.parent == original_dir and (path in fragmented_files or path.name in replaced_names),
+    )
+
+    placed = {}
+    for consolidated_file in consolidated_files:
+        destination = staging_dir / consolidated_file.name
+        method = link_or_copy(consolidated_file, destination)
+        expected = file_sha256(consolidated_file)
+        # A hardlink is checked to be the same file; a copy is re-hashed
+        if method == 'hardlink':
+            check = 'same file'
+            if not os.path.samefile(consolidated_file, destination):
+                raise RuntimeError(f"Staged {consolidated_file.name} is not linked to its source")
+        else:
+            check = 'sha256'
+            if file_sha256(destination) != expected:
+                raise RuntimeError(f"Checksum mismatch for staged {consolidated_file.name}")
+        placed[consolidated_file.name] = {
+            # --consolidated may live outside the original directory's parent
+            'source': str(consolidated_file.resolve()),
+            'sha256': expected,
+            'method': method,
+            'check': check,
+        }
+
+    manifest = {'removed': [f.name for f in fragmented_files], 'placed': placed}
+    (staging_dir / SWAP_MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding='utf-8')
+    return manifest
 
-print(f"\n✅ Copied {copied_count} consolidated files to {original_path.name}")
 
 # ============================================================================
-# 4. DELETE FRAGMENTED FILES
+# 3. COMMIT
 # ============================================================================
-print("\n" + "="*80)
-print("STEP 3: DELETING FRAGMENTED FILES")
-print("-" * 80)
+def _exchange_dirs(path_a: Path, path_b: Path) -> bool:
+    """Atomically swap two directories with renameat2(RENAME_EXCHANGE); False if unsupported."""
+    if not sys.platform.startswith('linux'):
+        return False
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        renameat2 = libc.renameat2
+    except (OSError, AttributeError):
+        return False
+    renameat2.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint]
+    result = renameat2(AT_FDCWD, os.fsencode(path_a), AT_FDCWD, os.fsencode(path_b), RENAME_EXCHANGE)
+    return result == 0
+
 
-deleted_count = 0
-for fragmented_file in sorted(fragmented_files):
+def recover_interrupted_swap(original_dir: Path, backup_dir: Path) -> None:
+    """Restore the original directory if a previous run stopped between its two renames."""
+    if not original_dir.exists() and backup_dir.exists():
+        os.replace(backup_dir, original_dir)
+
+
+def commit_swap(original_dir: Path, staging_dir: Path, backup_dir: Path) -> str:
+    """
+    Make staging_dir the new original_dir; the old tree ends up in backup_dir.
+
+    Uses an atomic exchange where the OS supports it, otherwise two renames
+    (the directory is briefly absent, never partially updated).
+    """
+    if backup_dir.exists():
+        shutil.rmtree(backup_dir)
+    if _exchange_dirs(staging_dir, original_dir):
+        os.replace(staging_dir, backup_dir)
+        return 'exchange'
+    os.replace(original_dir, backup_dir)
     try:
-        os.remove(fragmented_file)
-        print(f"   ✓ Deleted {fragmented_file.name}")
-        deleted_count += 1
-    except Exception as e:
-        print(f"   ✗ Error deleting {fragmented_file.name}: {str(e)}")
+        os.replace(staging_dir, original_dir)
+    except OSError:
+        os.replace(backup_dir, original_dir)
+        raise
+    return 'rename'
 
-print(f"\n✅ Deleted {deleted_count} fragmented files")
 
 # ============================================================================
-# 5. SUMMARY AND VERIFICATION
+# 4. MAIN
 # ============================================================================
-print("\n" + "="*80)
-print("STEP 4: VERIFICATION")
-print("-" * 80)
-
-remaining_files = list(original_path.glob('*.csv'))
-print(f"\n📊 FINAL SUMMARY:")
-print(f"   • Fragmented files removed: {deleted_count}")
-print(f"   • Consolidated files copied: {copied_count}")
-print(f"   • Total CSV files remaining: {len(remaining_files)}")
-
-# Verify no fragmented files remain
-fragmented_remaining = []
-for csv_file in remaining_files:
-    filename = csv_file.name
-    for year_pattern in year_patterns:
-        if year_pattern in filename:
-            fragmented_remaining.append(csv_file)
-            break
-
-if fragmented_remaining:
-    print(f"\n⚠️  WARNING: {len(fragmented_remaining)} fragmented files still exist:")
-    for f in fragmented_remaining:
-        print(f"      • {f.name}")
-else:
-    print(f"\n✅ VERIFICATION PASSED: No fragmented files remaining!")
+def main():
+    parser = argparse.ArgumentParser(description="Replace fragmented crop CSVs with consolidated versions")
+    parser.add_argument('--original', type=Path, default=original_path, help="Cleaned crop CSV directory")
+    parser.add_argument('--consolidated', type=Path, default=consolidated_path,
+                        help="Directory written by Combine CSV.py")
+    parser.add_argument('--keep-backup', action='store_true', help="Keep the previous tree after the swap")
+    args = parser.parse_args()
 
-# ============================================================================
-# 6. LIST FINAL FILES
-# ============================================================================
-print("\n" + "="*80)
-print("FINAL CSV FILES IN ORIGINAL DIRECTORY")
-print("="*80)
+    original_dir = args.original.resolve()
+    consolidated_dir = args.consolidated.resolve()
+    staging_dir = original_dir.with_name(original_dir.name + '.staging')
+    backup_dir = original_dir.with_name(original_dir.name + '.previous')
 
-final_files = sorted(original_path.glob('*.csv'))
-print(f"\nTotal: {len(final_files)} files\n")
+    print("="*80)
+    print("REPLACING FRAGMENTED FILES WITH CONSOLIDATED VERSIONS")
+    print("="*80)
 
-for i, file in enumerate(final_files, 1):
-    size_mb = file.stat().st_size / (1024 * 1024)
-    print(f"{i:2d}. {file.name:30s} - {size_mb:8.2f} MB")
+    recover_interrupted_swap(original_dir, backup_dir)
 
-# ============================================================================
-# 7. CHECK CONSOLIDATED DIRECTORY
-# ============================================================================
-print("\n" + "="*80)
-print("CONSOLIDATED DIRECTORY (BACKUP)")
-print("="*80)
-print(f"\n📁 Location: {consolidated_path}")
-print(f"✅ All consolidated files are backed up in this directory")
-print(f"   Total files: {len(list(consolidated_path.glob('*.csv')))}")
-
-print("\n" + "="*80)
-print("✨ CLEANUP COMPLETE! Your CSV files are now consolidated.")
-print("="*80 + "\n")
+    print("\nSTEP 1: STAGING NEW DIRECTORY")
+    print("-" * 80)
+    manifest = stage_replacement(original_dir, consolidated_dir, staging_dir)
+
+    print(f"\n✓ Found {len(manifest['removed'])} fragmented files to remove:")
+    for name in manifest['removed']:
+        print(f"   • {name}")
+
+    print(f"\n✓ Staged {len(manifest['placed'])} consolidated files:")
+    for name, info in sorted(manifest['placed'].items()):
+        verified = 'link verified' if info['check'] == 'same file' else 'checksum verified'
+        print(f"   ✓ {name} ({info['method']}, {verified})")
+
+    print("\n" + "="*80)
+    print("STEP 2: COMMITTING SWAP")
+    print("-" * 80)
+    method = commit_swap(original_dir, staging_dir, backup_dir)
+    print(f"\n✅ Swapped {original_dir.name} in one step ({method})")
+    if args.keep_backup:
+        print(f"   Previous tree kept at {backup_dir}")
+    else:
+        shutil.rmtree(backup_dir)
+
+    # ========================================================================
+    # 5. SUMMARY AND VERIFICATION
+    # ========================================================================
+    print("\n" + "="*80)
+    print("STEP 3: VERIFICATION")
+    print("-" * 80)
+
+    remaining_files = list(original_dir.glob('*.csv'))
+    print(f"\n📊 FINAL SUMMARY:")
+    print(f"   • Fragmented files removed: {len(manifest['removed'])}")
+    print(f"   • Consolidated files placed: {len(manifest['placed'])}")
+    print(f"   • Total CSV files remaining: {len(remaining_files)}")
+
+    # Verify no fragmented files remain
+    fragmented_remaining = [f for f in remaining_files if is_fragmented(f.name)]
+    if fragmented_remaining:
+        print(f"\n⚠️  WARNING: {len(fragmented_remaining)} fragmented files still exist:")
+        for f in fragmented_remaining:
+            print(f"      • {f.name}")
+    else:
+        print(f"\n✅ VERIFICATION PASSED: No fragmented files remaining!")
+
+    # ========================================================================
+    # 6. LIST FINAL FILES
+    # ========================================================================
+    print("\n" + "="*80)
+    print("FINAL CSV FILES IN ORIGINAL DIRECTORY")
+    print("="*80)
+
+    final_files = sorted(remaining_files)
+    print(f"\nTotal: {len(final_files)} files\n")
+
+    for i, file in enumerate(final_files, 1):
+        size_mb = file.stat().st_size / (1024 * 1024)
+        print(f"{i:2d}. {file.name:30s} - {size_mb:8.2f} MB")
+
+    # ========================================================================
+    # 7. CHECK CONSOLIDATED DIRECTORY
+    # ========================================================================
+    print("\n" + "="*80)
+    print("CONSOLIDATED DIRECTORY (BACKUP)")
+    print("="*80)
+    print(f"\n📁 Location: {consolidated_dir}")
+    print(f"✅ All consolidated files are backed up in this directory")
+    print(f"   Total files: {len(list(consolidated_dir.glob('*.csv')))}")
+
+    print("\n" + "="*80)
+    print("✨ CLEANUP COMPLETE! Your CSV files are now consolidated.")
+    print("="*80 + "\n")
+
+
+if __name__ == "__main__":
+    main()
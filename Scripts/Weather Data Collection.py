@@ -7,24 +7,70 @@
   - Geocodes each block (Tamil Nadu, India) using Nominatim (OSM).
   - Fetches comprehensive agriculture-relevant weather data from Open-Meteo.
   - Saves a consolidated CSV:  Data/Weather Data (District Wise)/weather_data_all_blocks.csv
-  - A 15-second sleep is added between every API call to avoid rate-limiting.
+  - Geocodes are cached in SQLite (geocode_cache.py), including "no result"
+    answers, so re-runs only send unknown blocks to Nominatim.
+  - Daily history is kept in one columnar store (weather_store.py: Parquet
+    partitioned by district, float32 variables); each finished block
+    appends only its newly fetched days. The store is seeded from the
+    legacy per-block Raw Daily CSVs on first use.
+  - --incremental reads what each block's stored history already covers and
+    requests only the missing dates; the summary is recomputed from the
+    merged history over the START_DATE → END_DATE window.
+  - Every finished block is checkpointed to collection_checkpoint.jsonl, so
+    an interrupted run resumes where it stopped (--restart ignores it).
+  - --batch-size N groups up to N geocoded blocks that need the same date
+    range into one Open-Meteo request (comma-separated coordinates, daily and
+    hourly variables together) and splits the response back per block.
+  - Per crop-season columns (kharif, rabi, kuruvai, samba, thaladi) are
+    added to the summary from the weather store by weather_summary.py,
+    which can also regenerate the whole summary CSV without any API calls.
+  - Hourly soil readings are reduced to daily mean / max / min with one
+    grouped aggregation; --benchmark-soil YEARS times it against the old
+    per-date loop on synthetic data and checks the outputs match.
+  - Default mode is an asyncio collector: one pooled HTTP session, a
+    token-bucket rate limit per host (Nominatim and Open-Meteo differ),
+    bounded concurrency across blocks and jittered exponential backoff on
+    429 / 5xx.  --serial keeps the original one-block-at-a-time loop with a
+    15-second sleep between API calls.
+  - API base URLs can be pointed at the local stub server
+    (weather_stub_server.py, with injectable 429 / 503 and a rate limit):
+        python "weather_stub_server.py" --port 8080 --every-429 7 --rate 5
+        python "Weather Data Collection.py" --geocode-url http://127.0.0.1:8080/search \
+                                            --weather-url http://127.0.0.1:8080/v1/archive
 =============================================================================
 """
 
 import os
+import json
 import time
 import glob
+import random
+import asyncio
+import argparse
 import requests
 import pandas as pd
 from pathlib import Path
+from urllib.parse import urlsplit
 from datetime import datetime, timedelta
 
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from geocode_cache import GeocodeCache, GEOCODE_CACHE_PATH, MISS
+from weather_summary import SEASONS, load_store_daily, summarise_blocks
+from weather_store import append_daily, compact_store, ensure_store, read_weather
+
 # ── Paths ──────────────────────────────────────────────────────────────────────
-BASE_DIR     = Path(__file__).resolve().parent
+BASE_DIR     = Path(__file__).resolve().parent.parent
 SOIL_CSV_DIR = BASE_DIR / "Data" / "Soil Data ( District Wise)" / "CSV Format"
 WEATHER_DIR  = BASE_DIR / "Data" / "Weather Data (District Wise)"
 WEATHER_DIR.mkdir(parents=True, exist_ok=True)
 OUTPUT_CSV   = WEATHER_DIR / "weather_data_all_blocks.csv"
+RAW_DAILY_DIR   = WEATHER_DIR / "Raw Daily"         # legacy per-block CSVs, imported once
+STORE_DIR       = WEATHER_DIR / "Weather Store"
+CHECKPOINT_FILE = WEATHER_DIR / "collection_checkpoint.jsonl"
 
 # ── Date range (last 1 year — Open-Meteo free historical API) ─────────────────
 END_DATE   = datetime.today().strftime("%Y-%m-%d")
@@ -67,7 +113,29 @@ HOURLY_SOIL_VARIABLES = [
     "soil_moisture_0_to_7cm",        # Soil moisture 0-7 cm (m³/m³)
 ]
 
-SLEEP_BETWEEN_CALLS = 15  # seconds
+SLEEP_BETWEEN_CALLS = 15  # seconds (serial mode)
+
+# Incremental mode: more gaps than this in a block's history are fetched as
+# one range (first to last missing day) instead of one request per gap
+MAX_GAP_REQUESTS = 3
+
+# ── Async collector ────────────────────────────────────────────────────────────
+# Token-bucket limits per host: (requests per second, burst size).
+# Nominatim's usage policy allows 1 request/s; Open-Meteo's free tier allows
+# 600/min but 5,000/hour, so the sustained rate stays under 1.4/s.
+HOST_RATE_LIMITS = {
+    "nominatim.openstreetmap.org": (1.0, 1),
+    "archive-api.open-meteo.com":  (1.2, 5),
+}
+DEFAULT_RATE_LIMIT = (1.0, 1)     # hosts not listed above (e.g. a stub server)
+MAX_CONCURRENT_BLOCKS = 8
+MAX_RETRIES      = 5
+BACKOFF_BASE     = 2.0    # seconds; doubles per attempt, full jitter
+BACKOFF_CAP      = 60.0
+RETRY_STATUSES   = {429, 500, 502, 503, 504}
+
+# Batched mode: locations per Open-Meteo request (keeps the URL well under 8 KB)
+WEATHER_BATCH_SIZE = 50
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -99,20 +167,42 @@ def load_all_blocks() -> pd.DataFrame:
 
 
 # ══════════════════════════════════════════════════════════════════════════════
-def geocode_block(block: str, district: str, state: str = "Tamil Nadu",
-                  country: str = "India", retries: int = 3) -> tuple[float, float] | None:
-    """
-    Return (latitude, longitude) for a block using Nominatim.
-    Tries progressively broader queries if precise match fails.
-    """
-    queries = [
+def geocode_queries(block: str, district: str, state: str = "Tamil Nadu",
+                    country: str = "India") -> list[str]:
+    """Nominatim queries for a block, most precise first."""
+    return [
         f"{block}, {district}, {state}, {country}",
         f"{block}, {district}, {state}",
         f"{block}, {state}, {country}",
         f"{district}, {state}, {country}",
     ]
 
-    for query in queries:
+
+def cached_coords(cache: GeocodeCache | None, block: str, district: str,
+                  state: str = "Tamil Nadu", country: str = "India"):
+    """(lat, lon) or None from the cache, or MISS when the network is needed."""
+    if cache is None:
+        return MISS
+    hit = cache.get(block, district, state, country)
+    if hit is MISS or hit is None:
+        return hit
+    return hit["lat"], hit["lon"]
+
+
+def geocode_block(block: str, district: str, state: str = "Tamil Nadu",
+                  country: str = "India", retries: int = 3,
+                  cache: GeocodeCache | None = None) -> tuple[float, float] | None:
+    """
+    Return (latitude, longitude) for a block using Nominatim.
+    Tries progressively broader queries if precise match fails.
+    With a cache, known blocks (and known misses) skip the network.
+    """
+    cached = cached_coords(cache, block, district, state, country)
+    if cached is not MISS:
+        return cached
+
+    had_error = False
+    for level, query in enumerate(geocode_queries(block, district, state, country)):
         for attempt in range(retries):
             try:
                 resp = requests.get(
@@ -126,15 +216,114 @@ def geocode_block(block: str, district: str, state: str = "Tamil Nadu",
                 if data:
                     lat = float(data[0]["lat"])
                     lon = float(data[0]["lon"])
+                    if cache is not None:
+                        cache.put(block, district, (lat, lon), level=level, query=query,
+                                  state=state, country=country)
                     return lat, lon
                 break   # empty result — try next query string
             except requests.RequestException as exc:
                 print(f"    Geocode attempt {attempt+1} failed for '{query}': {exc}")
+                if attempt == retries - 1:
+                    had_error = True
                 time.sleep(5)
 
+    # Only a clean "no result" from every query is cached; errors are retried next run
+    if cache is not None and not had_error:
+        cache.put(block, district, None, state=state, country=country)
     return None  # could not geocode
 
 
+# ══════════════════════════════════════════════════════════════════════════════
+def weather_params(lat: float, lon: float, start: str, end: str, **variables) -> dict:
+    """Open-Meteo archive query for one location; variables: daily= / hourly= lists."""
+    params = {
+        "latitude":   lat,
+        "longitude":  lon,
+        "start_date": start,
+        "end_date":   end,
+    }
+    for kind, names in variables.items():
+        params[kind] = ",".join(names)
+    params["timezone"] = "Asia/Kolkata"
+    return params
+
+
+def batch_params(coords: list[tuple[float, float]], start: str, end: str) -> dict:
+    """One archive query for many locations, asking for daily and hourly soil variables together."""
+    params = weather_params(0.0, 0.0, start, end, daily=DAILY_VARIABLES, hourly=HOURLY_SOIL_VARIABLES)
+    params["latitude"]  = ",".join(f"{lat:.4f}" for lat, _ in coords)
+    params["longitude"] = ",".join(f"{lon:.4f}" for _, lon in coords)
+    return params
+
+
+def split_locations(data, n_locations: int) -> list[dict]:
+    """Per-location payloads of a multi-location response (a list, or one object for one location)."""
+    locations = data if isinstance(data, list) else [data]
+    if len(locations) != n_locations:
+        raise ValueError(f"Expected {n_locations} locations in the response, got {len(locations)}")
+    return locations
+
+
+def daily_frame(data: dict) -> pd.DataFrame | None:
+    """Open-Meteo response → one row per day, or None if it holds no daily data."""
+    daily = data.get("daily", {})
+    if not daily or "time" not in daily:
+        return None
+
+    df = pd.DataFrame(daily)
+    df.rename(columns={"time": "date"}, inplace=True)
+    return df
+
+
+def soil_daily_frame(data: dict, variables: list[str] = HOURLY_SOIL_VARIABLES) -> pd.DataFrame | None:
+    """
+    Open-Meteo hourly soil response → daily mean / max / min, or None.
+    One grouped aggregation over every variable (NaN hours are skipped,
+    all-NaN days give NaN), rounded to 4 decimals like the original loop.
+    """
+    hourly = data.get("hourly", {})
+    if not hourly or "time" not in hourly:
+        return None
+
+    df_h = pd.DataFrame(hourly)
+    # ISO "YYYY-MM-DDTHH:MM" timestamps: the day is the first 10 characters
+    dates = df_h["time"].astype(str).str[:10]
+    cols = [col for col in variables if col in df_h.columns]
+    if not cols:
+        return pd.DataFrame({"date": dates.drop_duplicates().sort_values().to_numpy()})
+
+    stats = df_h[cols].astype("float64").groupby(dates.to_numpy(), sort=True).agg(["mean", "max", "min"])
+    stats.columns = [f"{col}_{stat}" for col, stat in stats.columns]
+    stats = stats.round(4)
+    stats.insert(0, "date", stats.index)
+    return stats.reset_index(drop=True)
+
+
+def soil_daily_frame_loop(data: dict) -> pd.DataFrame | None:
+    """Original per-date loop, kept for the --benchmark-soil parity check."""
+    hourly = data.get("hourly", {})
+    if not hourly or "time" not in hourly:
+        return None
+
+    df_h = pd.DataFrame(hourly)
+    df_h["time"] = pd.to_datetime(df_h["time"])
+    df_h["date"] = df_h["time"].dt.strftime("%Y-%m-%d")
+
+    # Resample to daily stats
+    daily_rows = []
+    for date, grp in df_h.groupby("date"):
+        row = {"date": date}
+        for col in HOURLY_SOIL_VARIABLES:
+            if col in grp.columns:
+                series = grp[col].dropna()
+                row[f"{col}_mean"] = round(series.mean(), 4) if len(series) else None
+                row[f"{col}_max"]  = round(series.max(),  4) if len(series) else None
+                row[f"{col}_min"]  = round(series.min(),  4) if len(series) else None
+        daily_rows.append(row)
+
+    return pd.DataFrame(daily_rows)
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 def fetch_weather(lat: float, lon: float,
                   start: str = START_DATE, end: str = END_DATE) -> pd.DataFrame | None:
@@ -142,27 +331,12 @@ def fetch_weather(lat: float, lon: float,
     Fetch daily weather data from Open-Meteo Historical Archive API.
     Returns a DataFrame with one row per day, or None on failure.
     """
-    params = {
-        "latitude":  lat,
-        "longitude": lon,
-        "start_date": start,
-        "end_date":   end,
-        "daily":      ",".join(DAILY_VARIABLES),
-        "timezone":   "Asia/Kolkata",
-    }
+    params = weather_params(lat, lon, start, end, daily=DAILY_VARIABLES)
 
     try:
         resp = requests.get(OPEN_METEO_URL, params=params, timeout=30)
         resp.raise_for_status()
-        data = resp.json()
-
-        daily = data.get("daily", {})
-        if not daily or "time" not in daily:
-            return None
-
-        df = pd.DataFrame(daily)
-        df.rename(columns={"time": "date"}, inplace=True)
-        return df
+        return daily_frame(resp.json())
 
     except requests.RequestException as exc:
         print(f"    Open-Meteo fetch failed: {exc}")
@@ -177,41 +351,12 @@ def fetch_soil_hourly(lat: float, lon: float,
     then resample to daily mean / max / min.
     Returns a DataFrame indexed by date, or None on failure.
     """
-    params = {
-        "latitude":   lat,
-        "longitude":  lon,
-        "start_date": start,
-        "end_date":   end,
-        "hourly":     ",".join(HOURLY_SOIL_VARIABLES),
-        "timezone":   "Asia/Kolkata",
-    }
+    params = weather_params(lat, lon, start, end, hourly=HOURLY_SOIL_VARIABLES)
 
     try:
         resp = requests.get(OPEN_METEO_URL, params=params, timeout=30)
         resp.raise_for_status()
-        data = resp.json()
-
-        hourly = data.get("hourly", {})
-        if not hourly or "time" not in hourly:
-            return None
-
-        df_h = pd.DataFrame(hourly)
-        df_h["time"] = pd.to_datetime(df_h["time"])
-        df_h["date"] = df_h["time"].dt.strftime("%Y-%m-%d")
-
-        # Resample to daily stats
-        daily_rows = []
-        for date, grp in df_h.groupby("date"):
-            row = {"date": date}
-            for col in HOURLY_SOIL_VARIABLES:
-                if col in grp.columns:
-                    series = grp[col].dropna()
-                    row[f"{col}_mean"] = round(series.mean(), 4) if len(series) else None
-                    row[f"{col}_max"]  = round(series.max(),  4) if len(series) else None
-                    row[f"{col}_min"]  = round(series.min(),  4) if len(series) else None
-            daily_rows.append(row)
-
-        return pd.DataFrame(daily_rows)
+        return soil_daily_frame(resp.json())
 
     except requests.RequestException as exc:
         print(f"    Soil hourly fetch failed: {exc}")
@@ -277,17 +422,152 @@ def summarise_weather(df: pd.DataFrame) -> dict:
 
 
 # ══════════════════════════════════════════════════════════════════════════════
-def main():
-    print("=" * 70)
-    print("   Agriculture Weather Data Extractor  —  Open-Meteo API")
-    print(f"   Period: {START_DATE}  →  {END_DATE}")
-    print(f"   Sleep between API calls: {SLEEP_BETWEEN_CALLS}s")
-    print("=" * 70)
+def load_raw_history(district: str, block: str) -> pd.DataFrame | None:
+    """The block's stored daily history (ISO date strings), or None if it has not been collected."""
+    history = read_weather(districts=[district], blocks=[block], store_dir=STORE_DIR)
+    if len(history) == 0:
+        return None
+    history = history.astype({"district": str, "block": str}).assign(date=history["date"].dt.strftime("%Y-%m-%d"))
+    # float32 → the shortest decimal that round-trips (the value the API returned), so
+    # thresholds such as rainy days (> 0.1 mm) behave as they did on the CSVs
+    for col in history.select_dtypes("float32").columns:
+        history[col] = history[col].to_numpy().astype(str).astype("float64")
+    return history
 
-    # 1. Load all blocks
-    blocks_df = load_all_blocks()
 
+def missing_ranges(history: pd.DataFrame | None, start: str = START_DATE,
+                   end: str = END_DATE) -> list[tuple[str, str]]:
+    """
+    Date ranges in start → end that history does not cover. A day counts as
+    covered when it has any non-null daily weather value (the archive returns
+    nulls for days it has not published yet, so those are asked for again).
+    """
+    window = pd.date_range(start, end, freq="D")
+    if history is None or "date" not in history.columns:
+        return [(start, end)]
+
+    value_cols = [c for c in DAILY_VARIABLES if c in history.columns]
+    covered = pd.to_datetime(history.loc[history[value_cols].notna().any(axis=1), "date"]) if value_cols else []
+    missing = window.difference(pd.DatetimeIndex(covered))
+    if len(missing) == 0:
+        return []
+
+    # Split into runs of consecutive days
+    run_ids = (pd.Series(missing).diff() != pd.Timedelta(days=1)).cumsum()
+    runs = [(grp.iloc[0], grp.iloc[-1]) for _, grp in pd.Series(missing).groupby(run_ids.values)]
+    if len(runs) > MAX_GAP_REQUESTS:
+        runs = [(runs[0][0], runs[-1][1])]
+    return [(a.strftime("%Y-%m-%d"), b.strftime("%Y-%m-%d")) for a, b in runs]
+
+
+def merge_history(history: pd.DataFrame | None, fresh: pd.DataFrame | None) -> pd.DataFrame | None:
+    """Append freshly fetched days to the history; fetched rows win on repeated dates."""
+    if fresh is None or len(fresh) == 0:
+        return history
+    if history is None:
+        return fresh
+    merged = pd.concat([history, fresh], ignore_index=True)
+    merged = merged.drop_duplicates(subset="date", keep="last")
+    return merged.sort_values("date").reset_index(drop=True)
+
+
+def window_rows(df: pd.DataFrame, start: str = START_DATE, end: str = END_DATE) -> pd.DataFrame:
+    dates = df["date"].astype(str)
+    return df[(dates >= start) & (dates <= end)]
+
+
+def finish_block(district: str, block: str, lat: float, lon: float,
+                 weather_df: pd.DataFrame | None, soil_df: pd.DataFrame | None,
+                 history: pd.DataFrame | None = None) -> dict:
+    """
+    Merge soil data into the fetched days, fold them into the block's history,
+    append the new days to the weather store and return the summary record
+    for the window.
+    """
+    if weather_df is not None:
+        if soil_df is not None:
+            weather_df = weather_df.merge(soil_df, on="date", how="left")
+            print(f"  ✔  [{block}] Soil data merged.")
+        else:
+            print(f"  ⚠  [{block}] Soil data unavailable — continuing without it.")
+        weather_df.insert(0, "block",    block)
+        weather_df.insert(0, "district", district)
+
+    merged = merge_history(history, weather_df)
+    summary = summarise_weather(window_rows(merged))
+
+    # Only the fetched days are written; repeated dates supersede older batches
+    if weather_df is not None:
+        append_daily(weather_df, STORE_DIR)
+        print(f"  ✔  [{block}] Daily data appended to the weather store ({len(weather_df)} new day(s))")
+    else:
+        print(f"  ✔  [{block}] Stored daily data already covers the window.")
+
+    return {
+        "district":  district,
+        "block":     block,
+        "latitude":  lat,
+        "longitude": lon,
+        "data_start": START_DATE,
+        "data_end":   END_DATE,
+        "status":    "success",
+        **summary,
+    }
+
+
+def failed_record(district: str, block: str, status: str,
+                  lat: float | None = None, lon: float | None = None) -> dict:
+    return {
+        "district": district, "block": block,
+        "latitude": lat, "longitude": lon,
+        "status": status,
+    }
+
+
+def load_checkpoint(path: Path = CHECKPOINT_FILE, start: str = START_DATE,
+                    end: str = END_DATE) -> dict:
+    """{(district, block): record} checkpointed by an earlier run over the same window."""
+    done = {}
+    if not path.exists():
+        return done
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue    # torn last line from an interrupted write
+            if entry.get("window") == [start, end]:
+                record = entry["record"]
+                done[(record["district"], record["block"])] = record
+    return done
+
+
+def append_checkpoint(record: dict, path: Path = CHECKPOINT_FILE,
+                      start: str = START_DATE, end: str = END_DATE) -> None:
+    line = json.dumps({"window": [start, end], "record": record},
+                      default=lambda v: v.item() if hasattr(v, "item") else str(v))
+    with open(path, "a", encoding="utf-8") as handle:
+        handle.write(line + "\n")
+        handle.flush()
+        os.fsync(handle.fileno())
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+def concat_frames(frames: list) -> pd.DataFrame | None:
+    frames = [f for f in frames if f is not None and len(f)]
+    return pd.concat(frames, ignore_index=True) if frames else None
+
+
+def collect_serial(blocks_df: pd.DataFrame, cache: GeocodeCache | None = None,
+                   incremental: bool = False, on_record=None) -> list[dict]:
+    """
+    Original loop: one block at a time with a fixed sleep before each Open-Meteo call.
+    incremental fetches only the dates missing from each block's history in the
+    weather store (load_raw_history); on_record(record) is called as each block
+    finishes (checkpointing).
+    """
     results = []
+    on_record = on_record or (lambda record: None)
     total = len(blocks_df)
 
     for idx, row in blocks_df.iterrows():
@@ -297,78 +577,492 @@ def main():
 
         # ── Step 1: Geocode ────────────────────────────────────────────────
         print(f"  → Geocoding …")
-        coords = geocode_block(block, district)
-        time.sleep(1)   # be polite to Nominatim
+        from_cache = cache is not None and cache.contains(block, district)
+        coords = geocode_block(block, district, cache=cache)
+        if not from_cache:
+            time.sleep(1)   # be polite to Nominatim
 
         if coords is None:
             print(f"  ✘  Could not geocode '{block}' — skipping.")
-            results.append({
-                "district": district, "block": block,
-                "latitude": None, "longitude": None,
-                "status": "geocode_failed"
-            })
+            results.append(failed_record(district, block, "geocode_failed"))
+            on_record(results[-1])
             continue
 
         lat, lon = coords
         print(f"  ✔  Coordinates: {lat:.4f}, {lon:.4f}")
 
-        # ── Step 2: Wait before Open-Meteo call ───────────────────────────
-        print(f"  → Waiting {SLEEP_BETWEEN_CALLS}s before weather fetch …")
-        time.sleep(SLEEP_BETWEEN_CALLS)
+        history = load_raw_history(district, block) if incremental else None
+        ranges = missing_ranges(history)
+        weather_parts, soil_parts = [], []
+        for start, end in ranges:
+            # ── Step 2: Wait before Open-Meteo call ───────────────────────
+            print(f"  → Waiting {SLEEP_BETWEEN_CALLS}s before weather fetch …")
+            time.sleep(SLEEP_BETWEEN_CALLS)
+
+            # ── Step 3: Fetch daily weather ────────────────────────────────
+            print(f"  → Fetching daily weather data from Open-Meteo ({start} → {end}) …")
+            weather_parts.append(fetch_weather(lat, lon, start, end))
+            if weather_parts[-1] is None:
+                break
 
-        # ── Step 3: Fetch daily weather ────────────────────────────────────
-        print(f"  → Fetching daily weather data from Open-Meteo …")
-        weather_df = fetch_weather(lat, lon)
+            # ── Step 3b: Wait then fetch hourly soil data ──────────────────
+            print(f"  → Waiting {SLEEP_BETWEEN_CALLS}s before soil fetch …")
+            time.sleep(SLEEP_BETWEEN_CALLS)
 
-        if weather_df is None:
+            print(f"  → Fetching hourly soil data from Open-Meteo …")
+            soil_parts.append(fetch_soil_hourly(lat, lon, start, end))
+
+        if any(part is None for part in weather_parts):
             print(f"  ✘  Weather fetch failed for '{block}'.")
-            results.append({
-                "district": district, "block": block,
-                "latitude": lat, "longitude": lon,
-                "status": "weather_failed"
-            })
+            results.append(failed_record(district, block, "weather_failed", lat, lon))
+            on_record(results[-1])
             continue
 
-        # ── Step 3b: Wait then fetch hourly soil data ──────────────────────
-        print(f"  → Waiting {SLEEP_BETWEEN_CALLS}s before soil fetch …")
-        time.sleep(SLEEP_BETWEEN_CALLS)
+        # ── Step 4: Summarise ──────────────────────────────────────────────
+        soil_df = None if any(part is None for part in soil_parts) else concat_frames(soil_parts)
+        results.append(finish_block(district, block, lat, lon, concat_frames(weather_parts), soil_df, history))
+        on_record(results[-1])
+        print(f"  ✔  Summary computed.")
 
-        print(f"  → Fetching hourly soil data from Open-Meteo …")
-        soil_df = fetch_soil_hourly(lat, lon)
-        if soil_df is not None:
-            weather_df = weather_df.merge(soil_df, on="date", how="left")
-            print(f"  ✔  Soil data merged.")
-        else:
-            print(f"  ⚠  Soil data unavailable — continuing without it.")
+    return results
 
-        # ── Step 4: Summarise ──────────────────────────────────────────────
-        summary = summarise_weather(weather_df)
 
-        # Save per-block raw daily CSV as well
-        raw_dir = WEATHER_DIR / "Raw Daily"
-        raw_dir.mkdir(parents=True, exist_ok=True)
-        raw_csv = raw_dir / f"{district}_{block}_daily.csv"
-        weather_df.insert(0, "block",    block)
-        weather_df.insert(0, "district", district)
-        weather_df.to_csv(raw_csv, index=False, encoding="utf-8")
-        print(f"  ✔  Raw daily data saved → {raw_csv.name}")
-
-        record = {
-            "district":  district,
-            "block":     block,
-            "latitude":  lat,
-            "longitude": lon,
-            "data_start": START_DATE,
-            "data_end":   END_DATE,
-            "status":    "success",
-            **summary,
-        }
-        results.append(record)
-        print(f"  ✔  Summary computed.")
+# ══════════════════════════════════════════════════════════════════════════════
+class TokenBucket:
+    """
+    Async token bucket: refills at `rate` tokens per second up to `capacity`.
+    acquire() waits until a token is available, so callers sharing a bucket
+    never exceed the host's request rate however many tasks are running.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate     = rate
+        self.capacity = capacity
+        self.tokens   = float(capacity)
+        self.updated  = time.monotonic()
+        self.lock     = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HttpError(Exception):
+    """Non-retryable HTTP status, or retries exhausted."""
+
+    def __init__(self, status: int | None, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class RateLimitedClient:
+    """
+    Pooled aiohttp session with a token bucket per host and jittered
+    exponential backoff on 429 / 5xx / connection errors.
+
+        async with RateLimitedClient() as client:
+            data = await client.get_json(OPEN_METEO_URL, params)
+    """
+
+    def __init__(self, rate_limits: dict | None = None, max_connections: int = MAX_CONCURRENT_BLOCKS,
+                 max_retries: int = MAX_RETRIES, backoff_base: float = BACKOFF_BASE,
+                 backoff_cap: float = BACKOFF_CAP, timeout: float = 30):
+        if aiohttp is None:
+            raise ImportError("aiohttp is required for the async collector (pip install aiohttp) — or use --serial")
+        self.rate_limits     = {**HOST_RATE_LIMITS, **(rate_limits or {})}
+        self.max_connections = max_connections
+        self.max_retries     = max_retries
+        self.backoff_base    = backoff_base
+        self.backoff_cap     = backoff_cap
+        self.timeout         = timeout
+        self.buckets         = {}
+        self.session         = None
+        self.request_count   = 0
+
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_connections),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = urlsplit(url).netloc
+        if host not in self.buckets:
+            rate, capacity = self.rate_limits.get(host, DEFAULT_RATE_LIMIT)
+            self.buckets[host] = TokenBucket(rate, capacity)
+        return self.buckets[host]
+
+    def backoff(self, attempt: int, retry_after: str | None = None) -> float:
+        if retry_after is not None:
+            try:
+                return min(self.backoff_cap, float(retry_after))
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    async def get_json(self, url: str, params: dict, headers: dict | None = None):
+        """GET url and return the decoded JSON body; raises HttpError when it cannot."""
+        bucket = self.bucket(url)
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire()
+            self.request_count += 1
+            retry_after = None
+            try:
+                async with self.session.get(url, params=params, headers=headers) as resp:
+                    if resp.status < 400:
+                        return await resp.json(content_type=None)
+                    if resp.status not in RETRY_STATUSES:
+                        raise HttpError(resp.status, f"HTTP {resp.status} for {url}")
+                    retry_after = resp.headers.get("Retry-After")
+                    last_error = HttpError(resp.status, f"HTTP {resp.status} for {url}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                last_error = HttpError(None, f"{type(exc).__name__}: {exc}")
+            if attempt < self.max_retries:
+                await asyncio.sleep(self.backoff(attempt, retry_after))
+        raise last_error
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+async def geocode_block_async(client: RateLimitedClient, block: str, district: str,
+                              state: str = "Tamil Nadu", country: str = "India",
+                              geocode_url: str = GEOCODE_URL,
+                              cache: GeocodeCache | None = None) -> tuple[float, float] | None:
+    """Async geocode_block(); retries are handled by the client."""
+    cached = cached_coords(cache, block, district, state, country)
+    if cached is not MISS:
+        return cached
+
+    had_error = False
+    for level, query in enumerate(geocode_queries(block, district, state, country)):
+        try:
+            data = await client.get_json(
+                geocode_url,
+                params={"q": query, "format": "json", "limit": 1},
+                headers=GEOCODE_HEADERS,
+            )
+        except HttpError as exc:
+            print(f"    Geocode failed for '{query}': {exc}")
+            had_error = True
+            continue
+        if data:
+            lat, lon = float(data[0]["lat"]), float(data[0]["lon"])
+            if cache is not None:
+                cache.put(block, district, (lat, lon), level=level, query=query, state=state, country=country)
+            return lat, lon
+
+    if cache is not None and not had_error:
+        cache.put(block, district, None, state=state, country=country)
+    return None
+
+
+async def fetch_weather_async(client: RateLimitedClient, lat: float, lon: float,
+                              start: str = START_DATE, end: str = END_DATE,
+                              weather_url: str = OPEN_METEO_URL) -> pd.DataFrame | None:
+    try:
+        data = await client.get_json(weather_url, weather_params(lat, lon, start, end, daily=DAILY_VARIABLES))
+    except HttpError as exc:
+        print(f"    Open-Meteo fetch failed: {exc}")
+        return None
+    return daily_frame(data)
+
+
+async def fetch_soil_hourly_async(client: RateLimitedClient, lat: float, lon: float,
+                                  start: str = START_DATE, end: str = END_DATE,
+                                  weather_url: str = OPEN_METEO_URL) -> pd.DataFrame | None:
+    try:
+        data = await client.get_json(weather_url, weather_params(lat, lon, start, end, hourly=HOURLY_SOIL_VARIABLES))
+    except HttpError as exc:
+        print(f"    Soil hourly fetch failed: {exc}")
+        return None
+    return soil_daily_frame(data)
+
+
+async def collect_block_async(client: RateLimitedClient, district: str, block: str,
+                              geocode_url: str = GEOCODE_URL, weather_url: str = OPEN_METEO_URL,
+                              cache: GeocodeCache | None = None, incremental: bool = False) -> dict:
+    coords = await geocode_block_async(client, block, district, geocode_url=geocode_url, cache=cache)
+    if coords is None:
+        print(f"  ✘  Could not geocode '{block}' ({district}) — skipping.")
+        return failed_record(district, block, "geocode_failed")
+
+    lat, lon = coords
+    print(f"  ✔  [{block}] Coordinates: {lat:.4f}, {lon:.4f}")
+
+    history = load_raw_history(district, block) if incremental else None
+    ranges = missing_ranges(history)
+
+    # Daily weather and hourly soil (for every missing range) are independent requests
+    parts = await asyncio.gather(*(
+        request
+        for start, end in ranges
+        for request in (
+            fetch_weather_async(client, lat, lon, start, end, weather_url=weather_url),
+            fetch_soil_hourly_async(client, lat, lon, start, end, weather_url=weather_url),
+        )
+    ))
+    weather_parts, soil_parts = parts[0::2], parts[1::2]
+    if any(part is None for part in weather_parts):
+        print(f"  ✘  Weather fetch failed for '{block}'.")
+        return failed_record(district, block, "weather_failed", lat, lon)
+    soil_df = None if any(part is None for part in soil_parts) else concat_frames(soil_parts)
+    return finish_block(district, block, lat, lon, concat_frames(weather_parts), soil_df, history)
+
+
+async def collect_async(blocks_df: pd.DataFrame, concurrency: int = MAX_CONCURRENT_BLOCKS,
+                        rate_limits: dict | None = None, geocode_url: str = GEOCODE_URL,
+                        weather_url: str = OPEN_METEO_URL, cache: GeocodeCache | None = None,
+                        incremental: bool = False, on_record=None, **client_kwargs) -> list[dict]:
+    """
+    Collect every block with at most `concurrency` blocks in flight.
+    Results are returned in blocks_df order; on_record(record) is called as
+    each block finishes.
+    """
+    on_record = on_record or (lambda record: None)
+    semaphore = asyncio.Semaphore(concurrency)
+    total = len(blocks_df)
+
+    async with RateLimitedClient(rate_limits, max_connections=concurrency, **client_kwargs) as client:
+        async def run(position: int, district: str, block: str) -> dict:
+            async with semaphore:
+                print(f"\n[{position+1}/{total}]  {block}  ({district})")
+                try:
+                    record = await collect_block_async(client, district, block, geocode_url=geocode_url,
+                                                       weather_url=weather_url, cache=cache,
+                                                       incremental=incremental)
+                except Exception as exc:
+                    print(f"  ✘  [{block}] Unexpected error: {exc}")
+                    record = failed_record(district, block, "error")
+                on_record(record)
+                return record
+
+        tasks = [
+            run(position, row["District"], row["Block"])
+            for position, (_, row) in enumerate(blocks_df.iterrows())
+        ]
+        results = await asyncio.gather(*tasks)
+        print(f"\n✔  {client.request_count} HTTP requests issued.")
+    return list(results)
+
+
+async def collect_batched_async(blocks_df: pd.DataFrame, batch_size: int = WEATHER_BATCH_SIZE,
+                                concurrency: int = MAX_CONCURRENT_BLOCKS, rate_limits: dict | None = None,
+                                geocode_url: str = GEOCODE_URL, weather_url: str = OPEN_METEO_URL,
+                                cache: GeocodeCache | None = None, incremental: bool = False,
+                                on_record=None, **client_kwargs) -> list[dict]:
+    """
+    Batched collector: geocode every block, group blocks that need the same
+    date range, and fetch each group of up to batch_size locations with one
+    request carrying both DAILY_VARIABLES and HOURLY_SOIL_VARIABLES.
+    Results are returned in blocks_df order.
+    """
+    on_record = on_record or (lambda record: None)
+    semaphore = asyncio.Semaphore(concurrency)
+    blocks = list(zip(blocks_df["District"], blocks_df["Block"]))
+    records = [None] * len(blocks)
+
+    async with RateLimitedClient(rate_limits, max_connections=concurrency, **client_kwargs) as client:
+        # ── Step 1: Geocode (cached blocks do not touch the network) ────────
+        async def locate(district: str, block: str):
+            async with semaphore:
+                return await geocode_block_async(client, block, district, geocode_url=geocode_url, cache=cache)
+
+        coords = await asyncio.gather(*(locate(district, block) for district, block in blocks))
+
+        # ── Step 2: Missing ranges per block, grouped by range ─────────────
+        histories = {}
+        groups = {}
+        for position, ((district, block), location) in enumerate(zip(blocks, coords)):
+            if location is None:
+                print(f"  ✘  Could not geocode '{block}' ({district}) — skipping.")
+                records[position] = failed_record(district, block, "geocode_failed")
+                on_record(records[position])
+                continue
+            histories[position] = load_raw_history(district, block) if incremental else None
+            for date_range in missing_ranges(histories[position]):
+                groups.setdefault(date_range, []).append(position)
+
+        batches = [
+            (date_range, members[i:i + batch_size])
+            for date_range, members in groups.items()
+            for i in range(0, len(members), batch_size)
+        ]
+        print(f"\n→ {len(batches)} batched Open-Meteo request(s) for {len(histories)} block(s)")
+
+        # ── Step 3: One request per batch, split back per block ────────────
+        weather_parts = {position: [] for position in histories}
+        soil_parts = {position: [] for position in histories}
+
+        async def fetch_batch(date_range: tuple[str, str], members: list[int]) -> None:
+            start, end = date_range
+            async with semaphore:
+                try:
+                    data = await client.get_json(weather_url, batch_params([coords[p] for p in members], start, end))
+                    locations = split_locations(data, len(members))
+                except (HttpError, ValueError) as exc:
+                    print(f"    Batched fetch {start} → {end} ({len(members)} blocks) failed: {exc}")
+                    locations = [{}] * len(members)
+            for position, location in zip(members, locations):
+                weather_parts[position].append(daily_frame(location))
+                soil_parts[position].append(soil_daily_frame(location))
+
+        await asyncio.gather(*(fetch_batch(date_range, members) for date_range, members in batches))
+
+        # ── Step 4: Merge, save and summarise per block ────────────────────
+        for position in histories:
+            district, block = blocks[position]
+            lat, lon = coords[position]
+            try:
+                if any(part is None for part in weather_parts[position]):
+                    print(f"  ✘  Weather fetch failed for '{block}'.")
+                    records[position] = failed_record(district, block, "weather_failed", lat, lon)
+                else:
+                    parts = soil_parts[position]
+                    soil_df = None if any(part is None for part in parts) else concat_frames(parts)
+                    records[position] = finish_block(district, block, lat, lon,
+                                                     concat_frames(weather_parts[position]), soil_df,
+                                                     histories[position])
+            except Exception as exc:
+                print(f"  ✘  [{block}] Unexpected error: {exc}")
+                records[position] = failed_record(district, block, "error")
+            on_record(records[position])
+
+        print(f"\n✔  {client.request_count} HTTP requests issued.")
+    return records
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+def benchmark_soil_aggregation(years: int = 5, n_variables: int = 8, seed: int = 42) -> None:
+    """Time soil_daily_frame() against the original loop on synthetic hourly data and check parity."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    hours = pd.date_range("2015-01-01", periods=years * 365 * 24, freq="h")
+    variables = [f"soil_var_{i}" for i in range(n_variables)]
+    payload = {"hourly": {"time": hours.strftime("%Y-%m-%dT%H:%M").tolist()}}
+    for name in variables:
+        values = rng.normal(25, 5, len(hours))
+        values[rng.random(len(hours)) < 0.02] = np.nan      # scattered missing hours
+        values[: 24 * 3] = np.nan                           # a few fully-missing days
+        payload["hourly"][name] = values.tolist()
+
+    global HOURLY_SOIL_VARIABLES
+    saved, HOURLY_SOIL_VARIABLES = HOURLY_SOIL_VARIABLES, variables
+    try:
+        start = time.perf_counter()
+        loop_df = soil_daily_frame_loop(payload)
+        loop_seconds = time.perf_counter() - start
+    finally:
+        HOURLY_SOIL_VARIABLES = saved
+    start = time.perf_counter()
+    fast_df = soil_daily_frame(payload, variables)
+    fast_seconds = time.perf_counter() - start
+
+    pd.testing.assert_frame_equal(fast_df, loop_df, check_dtype=False)
+    print(f"✔  Parity OK: {len(hours):,} hourly rows x {n_variables} variables → {len(fast_df):,} days")
+    print(f"   Vectorized: {fast_seconds:.3f}s   |   groupby loop: {loop_seconds:.3f}s   "
+          f"|   speedup {loop_seconds / fast_seconds:.0f}x")
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+def main():
+    parser = argparse.ArgumentParser(description="Agriculture weather data extractor (Open-Meteo)")
+    parser.add_argument("--serial", action="store_true",
+                        help=f"Original serial loop with {SLEEP_BETWEEN_CALLS}s sleeps between calls")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENT_BLOCKS,
+                        help="Blocks processed concurrently (async mode)")
+    parser.add_argument("--geocode-url", default=GEOCODE_URL, help="Nominatim search endpoint")
+    parser.add_argument("--weather-url", default=OPEN_METEO_URL, help="Open-Meteo archive endpoint")
+    parser.add_argument("--geocode-rate", type=float, default=None,
+                        help="Requests/second for the geocode host (default: per-host table)")
+    parser.add_argument("--weather-rate", type=float, default=None,
+                        help="Requests/second for the weather host (default: per-host table)")
+    parser.add_argument("--geocode-cache", default=str(GEOCODE_CACHE_PATH), help="SQLite geocode cache file")
+    parser.add_argument("--no-geocode-cache", action="store_true", help="Always ask Nominatim")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Fetch only dates missing from each block's stored history")
+    parser.add_argument("--batch-size", type=int, default=0,
+                        help=f"Blocks per batched Open-Meteo request (0 = one block per request; "
+                             f"suggested {WEATHER_BATCH_SIZE})")
+    parser.add_argument("--benchmark-soil", type=int, metavar="YEARS", default=None,
+                        help="Benchmark hourly→daily soil aggregation on YEARS of synthetic data and exit")
+    parser.add_argument("--restart", action="store_true",
+                        help="Ignore the checkpoint of an interrupted run over the same window")
+    args = parser.parse_args()
+
+    if args.benchmark_soil is not None:
+        benchmark_soil_aggregation(args.benchmark_soil)
+        return
+
+    print("=" * 70)
+    print("   Agriculture Weather Data Extractor  —  Open-Meteo API")
+    print(f"   Period: {START_DATE}  →  {END_DATE}")
+    if args.serial:
+        print(f"   Sleep between API calls: {SLEEP_BETWEEN_CALLS}s")
+    else:
+        print(f"   Async collector: {args.concurrency} blocks in flight, per-host rate limits")
+    print("=" * 70)
+
+    # 1. Load all blocks
+    blocks_df = load_all_blocks()
+    ensure_store(RAW_DAILY_DIR, STORE_DIR)
+    cache = None if args.no_geocode_cache else GeocodeCache(args.geocode_cache)
+
+    # 2. Resume: blocks that already succeeded for this window are not fetched again
+    if args.restart and CHECKPOINT_FILE.exists():
+        CHECKPOINT_FILE.unlink()
+    done = {key: record for key, record in load_checkpoint().items() if record.get("status") == "success"}
+    block_keys = list(zip(blocks_df["District"], blocks_df["Block"]))
+    todo_df = blocks_df[[key not in done for key in block_keys]].reset_index(drop=True)
+    if done:
+        print(f"✔  Resuming: {len(done)} block(s) already collected, {len(todo_df)} to go.")
+
+    if args.serial:
+        results = collect_serial(todo_df, cache=cache, incremental=args.incremental, on_record=append_checkpoint)
+    else:
+        rate_limits = {}
+        for url, rate in ((args.geocode_url, args.geocode_rate), (args.weather_url, args.weather_rate)):
+            if rate is not None:
+                rate_limits[urlsplit(url).netloc] = (rate, max(1, int(rate)))
+        collector = collect_batched_async if args.batch_size > 0 else collect_async
+        batch_kwargs = {"batch_size": args.batch_size} if args.batch_size > 0 else {}
+        results = asyncio.run(collector(
+            todo_df,
+            **batch_kwargs,
+            concurrency=args.concurrency,
+            rate_limits=rate_limits,
+            geocode_url=args.geocode_url,
+            weather_url=args.weather_url,
+            cache=cache,
+            incremental=args.incremental,
+            on_record=append_checkpoint,
+        ))
+    if cache is not None:
+        print(f"✔  Geocode cache: {cache.hits} hits, {cache.misses} misses")
+        cache.close()
 
-    # ── Save consolidated CSV ──────────────────────────────────────────────────
-    out_df = pd.DataFrame(results)
+    # ── Save consolidated CSV (blocks_df order) ───────────────────────────────
+    fresh = {(record["district"], record["block"]): record for record in results}
+    out_df = pd.DataFrame([fresh.get(key, done.get(key)) for key in block_keys])
+    # One part file per district again, then crop-season columns for every block in one read
+    compact_store(STORE_DIR, verbose=False)
+    seasonal = summarise_blocks(load_store_daily(STORE_DIR, START_DATE, END_DATE), START_DATE, END_DATE)
+    season_cols = [c for c in seasonal.columns if c.split("_")[0] in SEASONS]
+    out_df = out_df.merge(seasonal[["district", "block"] + season_cols], on=["district", "block"], how="left")
     out_df.to_csv(OUTPUT_CSV, index=False, encoding="utf-8")
+    # The summary now holds every block; the next run starts clean
+    CHECKPOINT_FILE.unlink(missing_ok=True)
     print("\n" + "=" * 70)
     print(f"✔  Consolidated weather summary saved to:")
     print(f"   {OUTPUT_CSV}")
@@ -0,0 +1,300 @@
+"""
+Statewide Batch Scoring
+=======================
+Scores every (district, block, crop) combination with the saved ensemble and
+writes a ranked recommendation table, instead of one notebook run per district.
+
+    - blocks come from the soil CSVs and the weather summary, crops from the
+      market store, crop_requirements.csv and the area/yield data; feature
+      vectors use the same lookup tables as recommendation_service.py,
+    - blocks are scored in chunks sized to a memory budget; within a chunk each
+      member scores its distinct feature rows only, and rows already scored in
+      an earlier chunk are reused, so every distinct row is scored exactly once
+      per ensemble member,
+    - each chunk is ranked per block and streamed to one Parquet file.
+
+    Data/7_Recommendations/
+        recommendations.parquet   district, block, crop, probability, rank, yield / profit scores
+        _manifest.json            model + data version, row counts, timings
+
+The run is skipped when the model version (registry run id) and data version
+match the last output, so a nightly job only rescores after retraining or an
+input change.
+
+Usage:
+    python "Scripts/batch_scoring.py"                       # score the grid (skips if up to date)
+    python "Scripts/batch_scoring.py" --force --memory-mb 64
+    python "Scripts/batch_scoring.py" --show Thanjavur      # top crops per block from the output
+"""
+
+import json
+import time
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from compressed_dataset import compress_rows
+from feature_builder import normalize_crop_name
+from market_store import STORE_PATH as MARKET_STORE_PATH
+from model_registry import REGISTRY_PATH, latest_run_id, load_ensemble_members
+from recommendation_service import (
+    DATA_PATH,
+    FEATURE_NAMES,
+    block_vectors,
+    crop_feature_table,
+    feature_frame,
+    load_lookup_tables,
+)
+
+OUTPUT_PATH = DATA_PATH / "7_Recommendations"
+OUTPUT_NAME = "recommendations.parquet"
+MANIFEST_NAME = "_manifest.json"
+OUTPUT_FORMAT_VERSION = 1
+MEMORY_BUDGET_MB = 256
+# Feature frame + one member's column subset + its scaled copy, plus output columns
+BYTES_PER_ROW = len(FEATURE_NAMES) * 8 * 3 + 64
+
+OUTPUT_SCHEMA = pa.schema([
+    ('district', pa.dictionary(pa.int32(), pa.string())),
+    ('block', pa.dictionary(pa.int32(), pa.string())),
+    ('crop', pa.dictionary(pa.int32(), pa.string())),
+    ('high_performance_prob', pa.float64()),
+    ('performance_rank', pa.int16()),
+    ('yield_combined_score', pa.float64()),
+    ('profit_proxy_score', pa.float64()),
+    ('soil_source', pa.dictionary(pa.int8(), pa.string())),
+    ('weather_source', pa.dictionary(pa.int8(), pa.string())),
+])
+
+
+# ============================================================================
+# 1. GRID
+# ============================================================================
+def crop_universe(tables: dict) -> tuple[list[str], np.ndarray]:
+    """Every crop known to the market store, requirements or area/yield data, with its feature row."""
+    crops = sorted(tables['crop_names'].values(), key=str.casefold)
+    features = crop_feature_table(crops, tables['requirements_lookup'], tables['area_yield_lookup'],
+                                  tables['default_req'], tables['default_area_yield'])
+    return crops, features
+
+
+def blocks_per_chunk(n_crops: int, memory_mb: float = MEMORY_BUDGET_MB) -> int:
+    """How many blocks (x every crop) fit in the memory budget at once."""
+    return max(1, int(memory_mb * 1024 * 1024) // (BYTES_PER_ROW * max(1, n_crops)))
+
+
+# ============================================================================
+# 2. SCORING
+# ============================================================================
+class MemberScorer:
+    """One ensemble member with a memo of every distinct feature row it has scored."""
+
+    def __init__(self, member: dict):
+        self.member = member
+        self.memo = {}
+        self.scored_rows = 0
+
+    def score(self, features: pd.DataFrame) -> np.ndarray:
+        X_unique, codes = compress_rows(features[self.member['features']].to_numpy('float64'))
+        keys = X_unique.view(np.dtype((np.void, X_unique.dtype.itemsize * X_unique.shape[1]))).ravel()
+        keys = [key.tobytes() for key in keys]
+        missing = [i for i, key in enumerate(keys) if key not in self.memo]
+        if missing:
+            X_new = X_unique[missing]
+            if self.member['scaler'] is not None:
+                X_new = self.member['scaler'].transform(X_new)
+            for i, proba in zip(missing, self.member['model'].predict_proba(X_new)[:, 1]):
+                self.memo[keys[i]] = float(proba)
+            self.scored_rows += len(missing)
+        unique_proba = np.fromiter((self.memo[key] for key in keys), dtype='float64', count=len(keys))
+        return unique_proba[codes]
+
+
+def _dictionary(values: list[str], index_type=pa.int32()) -> pa.DictionaryArray:
+    return pa.array(values, pa.string()).dictionary_encode().cast(pa.dictionary(index_type, pa.string()))
+
+
+def score_chunk(tables: dict, blocks: list[tuple[str, str]], crops: list[str], crop_features: np.ndarray,
+                scorers: list[MemberScorer], crop_scores: dict) -> pa.Table:
+    """Score and rank one chunk of blocks x every crop; rows sorted by block then rank."""
+    vectors = []
+    sources = []
+    for district, block in blocks:
+        soil, weather, source = block_vectors(tables, district, block)
+        vectors.append((soil, weather))
+        sources.append(source)
+
+    features = feature_frame(tables, vectors, crop_features)
+    proba = np.mean(np.vstack([scorer.score(features) for scorer in scorers]), axis=0)
+
+    n_crops = len(crops)
+    proba = proba.reshape(len(blocks), n_crops)
+    order = np.argsort(-proba, axis=1, kind='stable')
+    rank = np.empty_like(order)
+    np.put_along_axis(rank, order, np.arange(1, n_crops + 1), axis=1)
+
+    block_idx = np.repeat(np.arange(len(blocks)), n_crops)
+    crop_idx = order.ravel()
+    crop_keys = [normalize_crop_name(crop) for crop in crops]
+    return pa.table({
+        'district': _dictionary([blocks[i][0] for i in block_idx]),
+        'block': _dictionary([blocks[i][1] for i in block_idx]),
+        'crop': _dictionary([crops[i] for i in crop_idx]),
+        'high_performance_prob': pa.array(np.take_along_axis(proba, order, axis=1).ravel()),
+        'performance_rank': pa.array(np.take_along_axis(rank, order, axis=1).ravel().astype('int16')),
+        'yield_combined_score': pa.array([crop_scores['yield'].get(crop_keys[i]) for i in crop_idx], pa.float64()),
+        'profit_proxy_score': pa.array([crop_scores['profit'].get(crop_keys[i]) for i in crop_idx], pa.float64()),
+        'soil_source': _dictionary([sources[i]['soil'] for i in block_idx], pa.int8()),
+        'weather_source': _dictionary([sources[i]['weather'] for i in block_idx], pa.int8()),
+    }, schema=OUTPUT_SCHEMA)
+
+
+def _crop_scores(tables: dict) -> dict:
+    """Crop-level yield and profit scores keyed by normalized crop name (NaN -> missing)."""
+    yield_rank = tables['yield_rank'].dropna(subset=['Yield_Combined_Score'])
+    profit_rank = tables['profit_rank'].dropna(subset=['Profit_Proxy_Score'])
+    return {
+        'yield': dict(zip(yield_rank['Crop'].map(normalize_crop_name), yield_rank['Yield_Combined_Score'])),
+        'profit': dict(zip(profit_rank['Crop'].map(normalize_crop_name), profit_rank['Profit_Proxy_Score'])),
+    }
+
+
+# ============================================================================
+# 3. RUN
+# ============================================================================
+def load_output_manifest(output_dir: Path = OUTPUT_PATH) -> dict | None:
+    manifest_path = Path(output_dir) / MANIFEST_NAME
+    if not manifest_path.exists():
+        return None
+    manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+    return manifest if manifest.get('format_version') == OUTPUT_FORMAT_VERSION else None
+
+
+def score_grid(output_dir: Path = OUTPUT_PATH, data_path: Path = DATA_PATH, registry_dir: Path = REGISTRY_PATH,
+               market_store_dir: Path = MARKET_STORE_PATH, run_id: str | None = None,
+               memory_mb: float = MEMORY_BUDGET_MB, force: bool = False, verbose: bool = True) -> dict:
+    """
+    Score the full district x block x crop grid into output_dir.
+
+    Args:
+        output_dir       : Folder for recommendations.parquet and its manifest.
+        data_path        : Project Data folder.
+        registry_dir     : Model registry folder.
+        market_store_dir : Market store folder.
+        run_id           : Registry run to score with (default: latest).
+        memory_mb        : Memory budget for one chunk of feature rows.
+        force            : Rescore even when model and data versions are unchanged.
+
+    Returns:
+        The output manifest (with skipped=True when nothing had to be done).
+    """
+    output_dir = Path(output_dir)
+    start = time.perf_counter()
+    run_id = run_id or latest_run_id(registry_dir)
+    tables = load_lookup_tables(data_path, market_store_dir)
+
+    previous = load_output_manifest(output_dir)
+    if (not force and previous is not None and (output_dir / OUTPUT_NAME).exists()
+            and previous['model_version'] == run_id and previous['data_version'] == tables['data_version']):
+        if verbose:
+            print(f"⏭  Recommendations up to date (run {run_id}, data {tables['data_version'][:12]})")
+        return {**previous, 'skipped': True}
+
+    members = load_ensemble_members(run_id, registry_dir)
+    scorers = [MemberScorer(member) for member in members.values()]
+    crops, crop_features = crop_universe(tables)
+    crop_scores = _crop_scores(tables)
+    blocks = tables['blocks']
+    chunk_blocks = blocks_per_chunk(len(crops), memory_mb)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_dir / f".{OUTPUT_NAME}.tmp"
+    rows = 0
+    chunks = 0
+    with pq.ParquetWriter(tmp_path, OUTPUT_SCHEMA) as writer:
+        for first in range(0, len(blocks), chunk_blocks):
+            table = score_chunk(tables, blocks[first:first + chunk_blocks], crops, crop_features,
+                                scorers, crop_scores)
+            writer.write_table(table)
+            rows += table.num_rows
+            chunks += 1
+    tmp_path.replace(output_dir / OUTPUT_NAME)
+
+    manifest = {
+        'format_version': OUTPUT_FORMAT_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'model_version': run_id,
+        'data_version': tables['data_version'],
+        'ensemble_members': list(members),
+        'districts': len({district for district, _ in blocks}),
+        'blocks': len(blocks),
+        'crops': len(crops),
+        'rows': rows,
+        'chunks': chunks,
+        'blocks_per_chunk': chunk_blocks,
+        'scored_rows': {name: scorer.scored_rows for name, scorer in zip(members, scorers)},
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+    manifest_tmp = output_dir / f".{MANIFEST_NAME}.tmp"
+    manifest_tmp.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+    manifest_tmp.replace(output_dir / MANIFEST_NAME)
+
+    if verbose:
+        scored = ', '.join(f"{name} {count:,}" for name, count in manifest['scored_rows'].items())
+        print(f"✓ Scored {rows:,} rows ({manifest['districts']} districts x {len(blocks)} blocks x "
+              f"{len(crops)} crops) in {chunks} chunk(s), {manifest['seconds']:.2f}s")
+        print(f"   Distinct rows scored per member: {scored}")
+    return {**manifest, 'skipped': False}
+
+
+def read_recommendations(districts=None, blocks=None, top_n: int | None = None,
+                         output_dir: Path = OUTPUT_PATH) -> pd.DataFrame:
+    """Ranked rows from the output, with district / block / rank pushdown."""
+    dataset = ds.dataset(Path(output_dir) / OUTPUT_NAME, format='parquet')
+    expressions = []
+    if districts is not None:
+        expressions.append(ds.field('district').isin(list(districts)))
+    if blocks is not None:
+        expressions.append(ds.field('block').isin(list(blocks)))
+    if top_n is not None:
+        expressions.append(ds.field('performance_rank') <= top_n)
+    combined = None
+    for expression in expressions:
+        combined = expression if combined is None else combined & expression
+    return dataset.to_table(filter=combined).to_pandas()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score every district x block x crop with the saved ensemble")
+    parser.add_argument("--output", default=str(OUTPUT_PATH), help="Output folder")
+    parser.add_argument("--data-path", default=str(DATA_PATH), help="Project Data folder")
+    parser.add_argument("--registry", default=str(REGISTRY_PATH), help="Model registry folder")
+    parser.add_argument("--market-store", default=str(MARKET_STORE_PATH), help="Market store folder")
+    parser.add_argument("--run", default=None, help="Registry run id (default: latest)")
+    parser.add_argument("--memory-mb", type=float, default=MEMORY_BUDGET_MB, help="Memory budget per chunk")
+    parser.add_argument("--force", action="store_true", help="Rescore even if versions are unchanged")
+    parser.add_argument("--show", metavar="DISTRICT", help="Print the top crops per block of a district")
+    parser.add_argument("--top", type=int, default=3, help="Crops per block for --show")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("STATEWIDE BATCH SCORING")
+    print("=" * 80)
+    score_grid(Path(args.output), Path(args.data_path), Path(args.registry), Path(args.market_store),
+               run_id=args.run, memory_mb=args.memory_mb, force=args.force)
+
+    if args.show:
+        df = read_recommendations(districts=[args.show], top_n=args.top, output_dir=Path(args.output))
+        print()
+        print(df[['block', 'performance_rank', 'crop', 'high_performance_prob',
+                  'yield_combined_score', 'profit_proxy_score']].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
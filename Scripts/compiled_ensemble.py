@@ -0,0 +1,590 @@
+"""
+Compiled Ensemble Inference
+===========================
+Flattens the fitted ensemble members of a registry run into plain NumPy
+arrays and scores them with a vectorized pure-NumPy evaluator, so a scoring
+process can start and predict without importing sklearn, xgboost, lightgbm
+or catboost, and without per-call estimator overhead.
+
+Supported members (anything else is rejected at export time):
+
+    trees   - sklearn RandomForest / ExtraTrees / DecisionTree (mean of leaf
+              class fractions), GradientBoosting (prior + learning_rate x leaf
+              sums, sigmoid), XGBoost / LightGBM / CatBoost binary models
+              (margin sums, sigmoid); every tree becomes rows of one node
+              table (feature, threshold, left, right, value, default_left)
+    linear  - LogisticRegression (coef / intercept, sigmoid)
+    kernel  - WeightedPlattSVC with an RBF or linear SVC (support vectors,
+              dual coefficients, weighted Platt sigmoid)
+
+A member's StandardScaler is folded into its arrays, so compiled members
+take raw feature columns in the order of their 'features' list.
+
+Each compiled member is checked against the original predict_proba on the
+verification rows before it is written; a member that does not reproduce its
+probabilities within tolerance is never saved.
+
+Layout (inside the registry run):
+
+    Data/6_Model Registry/<run_id>/compiled/
+        compiled.json              members, kinds, features, links, checks
+        <artifact>.npz             node tables / coefficients per member
+
+    members = load_compiled_members()                      # numpy only
+    proba = members['RandomForest']['model'].predict_proba(X)[:, 1]
+
+Loaded members keep the notebook's pipeline shape ({'model', 'scaler',
+'features'}, scaler None), so they drop into ensemble_probability() and
+predict_proba_expanded() unchanged.
+
+The evaluator advances all (row, tree) cells one tree level per NumPy pass,
+so a handful of rows is scored in about a millisecond (vs ~15 ms through
+predict_proba) and a fresh process imports, loads and predicts in ~0.1 s.
+For thousands of rows the compiled C traversal of the original libraries
+is still faster; batch_scoring.py keeps using the original members.
+
+Usage:
+    python "Scripts/compiled_ensemble.py"                  # compile the latest run and verify it
+    python "Scripts/compiled_ensemble.py" --benchmark      # cold start + per-call latency vs the originals
+"""
+
+import json
+import time
+import argparse
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from model_registry import REGISTRY_PATH, latest_run_id, load_run_info
+
+COMPILED_DIR_NAME = "compiled"
+COMPILED_MANIFEST = "compiled.json"
+COMPILED_FORMAT_VERSION = 1
+CHECK_TOLERANCE = 1e-6
+# Rows x trees evaluated at once by the tree walker (bounds its temporaries)
+TREE_BLOCK_CELLS = 1 << 20
+
+
+# ============================================================================
+# 1. EVALUATOR (numpy only)
+# ============================================================================
+def _sigmoid(raw: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-raw))
+
+
+def _walk_trees(arrays: dict, X: np.ndarray, strict: bool) -> np.ndarray:
+    """Leaf value reached by every row in every tree, shape (n_rows, n_trees)."""
+    is_leaf = arrays['feature'] < 0
+    node_ids = np.arange(len(is_leaf))
+    # Leaves point back to themselves (testing feature 0), so finished cells can
+    # ride along until the active set is worth compacting
+    feature = np.where(is_leaf, 0, arrays['feature'])
+    threshold = arrays['threshold']
+    default_left = arrays['default_left']
+    zero_missing = arrays['zero_missing']
+    roots = arrays['roots']
+    # children[2 * node] is the left child, children[2 * node + 1] the right one
+    children = np.column_stack([np.where(is_leaf, node_ids, arrays['left']),
+                                np.where(is_leaf, node_ids, arrays['right'])]).ravel()
+    check_missing = bool(zero_missing.any()) or bool(np.isnan(X).any())
+
+    n_rows, n_features = X.shape
+    n_trees = len(roots)
+    out = np.empty(n_rows * n_trees, dtype='float64')
+    block = max(1, TREE_BLOCK_CELLS // max(1, n_trees))
+    for first in range(0, n_rows, block):
+        X_flat = np.ascontiguousarray(X[first:first + block]).ravel()
+        n_block = len(X_flat) // max(1, n_features)
+        # One cell per (row, tree), advanced one level per pass
+        cell = np.arange(first * n_trees, (first + n_block) * n_trees, dtype=np.int64)
+        node = np.tile(roots, n_block).astype(np.int64)
+        offset = np.repeat(np.arange(n_block, dtype=np.int64) * n_features, n_trees)
+        while True:
+            finished = is_leaf[node]
+            n_finished = np.count_nonzero(finished)
+            if n_finished == len(node):
+                out[cell] = arrays['value'][node]
+                break
+            if n_finished * 4 >= len(node):
+                out[cell[finished]] = arrays['value'][node[finished]]
+                running = ~finished
+                cell, node, offset = cell[running], node[running], offset[running]
+            x = X_flat[offset + feature[node]]
+            go_right = ~(x < threshold[node]) if strict else ~(x <= threshold[node])
+            if check_missing:
+                missing = np.isnan(x) | (zero_missing[node] & (x == 0))
+                go_right = np.where(missing, ~default_left[node], go_right)
+            node = children[2 * node + go_right]
+    return out.reshape(n_rows, n_trees)
+
+
+class CompiledMember:
+    """One compiled ensemble member with a sklearn-style predict_proba()."""
+
+    def __init__(self, meta: dict, arrays: dict):
+        self.meta = meta
+        self.arrays = arrays
+        self.kind = meta['kind']
+        self.features = meta['features']
+        self.classes_ = np.array([0, 1])
+
+    def decision(self, X: np.ndarray) -> np.ndarray:
+        """Raw score before the link function (mean leaf fraction for forests)."""
+        X = np.asarray(X, dtype='float64')
+        if 'scaler_mean' in self.arrays:
+            X = (X - self.arrays['scaler_mean']) / self.arrays['scaler_scale']
+        X = X.astype(self.meta['input_dtype'], copy=False)
+
+        if self.kind == 'trees':
+            leaves = _walk_trees(self.arrays, X, self.meta['strict'])
+            if self.meta['aggregate'] == 'mean':
+                return leaves.mean(axis=1)
+            return self.meta['base'] + leaves.sum(axis=1)
+        if self.kind == 'linear':
+            return X @ self.arrays['coef'] + self.meta['base']
+        if self.kind == 'kernel':
+            support = self.arrays['support_vectors']
+            if self.meta['kernel'] == 'rbf':
+                sq_dist = (X * X).sum(1)[:, None] + (support * support).sum(1)[None, :] - 2.0 * X @ support.T
+                gram = np.exp(-self.meta['gamma'] * np.maximum(sq_dist, 0.0))
+            else:
+                gram = X @ support.T
+            return gram @ self.arrays['dual_coef'] + self.meta['base']
+        raise ValueError(f"Unknown compiled member kind: {self.kind}")
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        raw = self.decision(X)
+        if self.kind == 'kernel':
+            a, b = self.meta['calibration']
+            proba = _sigmoid(a * raw + b)
+        elif self.meta['link'] == 'sigmoid':
+            proba = _sigmoid(raw)
+        else:
+            proba = raw
+        return np.column_stack([1.0 - proba, proba])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return (self.predict_proba(X)[:, 1] >= 0.5).astype(np.int64)
+
+
+# ============================================================================
+# 2. EXPORTERS (duck-typed; the training libraries are only touched here)
+# ============================================================================
+class _NodeTable:
+    """Accumulates trees into one flat node table."""
+
+    def __init__(self):
+        self.feature, self.threshold, self.left, self.right = [], [], [], []
+        self.value, self.default_left, self.zero_missing = [], [], []
+        self.roots = []
+
+    def add_node(self, feature=-1, threshold=0.0, value=0.0, default_left=True, zero_missing=False) -> int:
+        self.feature.append(feature)
+        self.threshold.append(threshold)
+        self.left.append(-1)
+        self.right.append(-1)
+        self.value.append(value)
+        self.default_left.append(default_left)
+        self.zero_missing.append(zero_missing)
+        return len(self.feature) - 1
+
+    def link(self, node: int, left: int, right: int) -> None:
+        self.left[node] = left
+        self.right[node] = right
+
+    def add_arrays(self, feature, threshold, left, right, value, default_left) -> None:
+        """Append one tree given as parallel node arrays (children -1 at leaves)."""
+        offset = len(self.feature)
+        leaf = np.asarray(left) < 0
+        self.roots.append(offset)
+        self.feature.extend(np.where(leaf, -1, feature).tolist())
+        self.threshold.extend(np.asarray(threshold, dtype='float64').tolist())
+        self.left.extend(np.where(leaf, -1, np.asarray(left) + offset).tolist())
+        self.right.extend(np.where(leaf, -1, np.asarray(right) + offset).tolist())
+        self.value.extend(np.asarray(value, dtype='float64').tolist())
+        self.default_left.extend(np.asarray(default_left, dtype=bool).tolist())
+        self.zero_missing.extend([False] * len(leaf))
+
+    def arrays(self) -> dict:
+        return {
+            'feature': np.asarray(self.feature, dtype=np.int32),
+            'threshold': np.asarray(self.threshold, dtype='float64'),
+            'left': np.asarray(self.left, dtype=np.int32),
+            'right': np.asarray(self.right, dtype=np.int32),
+            'value': np.asarray(self.value, dtype='float64'),
+            'default_left': np.asarray(self.default_left, dtype=bool),
+            'zero_missing': np.asarray(self.zero_missing, dtype=bool),
+            'roots': np.asarray(self.roots, dtype=np.int32),
+        }
+
+
+def _sklearn_tree(table: _NodeTable, tree, value: np.ndarray) -> None:
+    missing_left = getattr(tree, 'missing_go_to_left', None)
+    default_left = (np.asarray(missing_left, dtype=bool) if missing_left is not None
+                    else np.zeros(tree.node_count, dtype=bool))
+    table.add_arrays(tree.feature, tree.threshold, tree.children_left, tree.children_right, value, default_left)
+
+
+def _positive_column(model) -> int:
+    classes = list(getattr(model, 'classes_', [0, 1]))
+    if len(classes) != 2:
+        raise ValueError(f"Only binary classifiers can be compiled (classes: {classes})")
+    return classes.index(1) if 1 in classes else 1
+
+
+def export_sklearn_forest(model) -> tuple[dict, dict]:
+    trees = model.estimators_ if hasattr(model, 'estimators_') else [model]
+    column = _positive_column(model)
+    table = _NodeTable()
+    for tree in trees:
+        value = tree.tree_.value[:, 0, :]
+        fractions = value / value.sum(axis=1, keepdims=True)
+        _sklearn_tree(table, tree.tree_, fractions[:, column])
+    return ({'kind': 'trees', 'aggregate': 'mean', 'link': 'identity', 'base': 0.0,
+             'strict': False, 'input_dtype': 'float32'}, table.arrays())
+
+
+def export_sklearn_gradient_boosting(model) -> tuple[dict, dict]:
+    if model.estimators_.shape[1] != 1:
+        raise ValueError("Only binary GradientBoosting models can be compiled")
+    if type(model.init_).__name__ != 'DummyClassifier':
+        raise ValueError("GradientBoosting with a custom init estimator cannot be compiled")
+    base = float(model._raw_predict_init(np.zeros((1, model.n_features_in_), dtype=np.float32))[0, 0])
+    table = _NodeTable()
+    for tree in model.estimators_[:, 0]:
+        _sklearn_tree(table, tree.tree_, tree.tree_.value[:, 0, 0] * model.learning_rate)
+    return ({'kind': 'trees', 'aggregate': 'sum', 'link': 'sigmoid', 'base': base,
+             'strict': False, 'input_dtype': 'float32'}, table.arrays())
+
+
+def export_xgboost(model) -> tuple[dict, dict]:
+    booster = model.get_booster()
+    config = json.loads(booster.save_config())
+    objective = config['learner']['objective']['name']
+    if objective != 'binary:logistic':
+        raise ValueError(f"XGBoost objective {objective} cannot be compiled")
+    base_score = float(str(config['learner']['learner_model_param']['base_score']).strip('[]'))
+    names = booster.feature_names
+
+    table = _NodeTable()
+
+    def add(node: dict) -> int:
+        if 'leaf' in node:
+            return table.add_node(value=float(node['leaf']))
+        split = node['split']
+        feature = names.index(split) if names and split in names else int(str(split).lstrip('f'))
+        index = table.add_node(feature=feature, threshold=float(np.float32(node['split_condition'])),
+                               default_left=node['missing'] == node['yes'])
+        children = {child['nodeid']: child for child in node['children']}
+        table.link(index, add(children[node['yes']]), add(children[node['no']]))
+        return index
+
+    for dump in booster.get_dump(dump_format='json'):
+        tree = json.loads(dump)
+        table.roots.append(add(tree))
+    return ({'kind': 'trees', 'aggregate': 'sum', 'link': 'sigmoid',
+             'base': float(np.log(base_score / (1.0 - base_score))),
+             'strict': True, 'input_dtype': 'float32'}, table.arrays())
+
+
+def export_lightgbm(model) -> tuple[dict, dict]:
+    dump = model.booster_.dump_model()
+    if not str(dump.get('objective', '')).startswith('binary'):
+        raise ValueError(f"LightGBM objective {dump.get('objective')} cannot be compiled")
+    sigmoid = float(str(dump['objective']).split('sigmoid:')[-1]) if 'sigmoid:' in str(dump['objective']) else 1.0
+    if sigmoid != 1.0:
+        raise ValueError("LightGBM binary objective with sigmoid != 1 cannot be compiled")
+
+    table = _NodeTable()
+
+    def add(node: dict) -> int:
+        if 'leaf_value' in node:
+            return table.add_node(value=float(node['leaf_value']))
+        if node['decision_type'] != '<=':
+            raise ValueError("LightGBM categorical splits cannot be compiled")
+        missing_type = node.get('missing_type', 'None')
+        threshold = float(node['threshold'])
+        if missing_type == 'None':
+            # NaN is treated as 0.0, which falls on the side 0 <= threshold picks
+            default_left = 0.0 <= threshold
+        else:
+            default_left = bool(node['default_left'])
+        index = table.add_node(feature=int(node['split_feature']), threshold=threshold,
+                               default_left=default_left, zero_missing=missing_type == 'Zero')
+        table.link(index, add(node['left_child']), add(node['right_child']))
+        return index
+
+    for tree in dump['tree_info']:
+        table.roots.append(add(tree['tree_structure']))
+    return ({'kind': 'trees', 'aggregate': 'sum', 'link': 'sigmoid', 'base': 0.0,
+             'strict': False, 'input_dtype': 'float64'}, table.arrays())
+
+
+def export_catboost(model) -> tuple[dict, dict]:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'model.json'
+        model.save_model(str(path), format='json')
+        dump = json.loads(path.read_text(encoding='utf-8'))
+    if dump['features_info'].get('categorical_features'):
+        raise ValueError("CatBoost models with categorical features cannot be compiled")
+    float_features = {f['feature_index']: f for f in dump['features_info']['float_features']}
+    scale, bias = dump.get('scale_and_bias', [1.0, [0.0]])
+    bias = float(bias[0] if isinstance(bias, list) else bias)
+
+    table = _NodeTable()
+    for tree in dump['oblivious_trees']:
+        splits = tree['splits']
+        leaves = np.asarray(tree['leaf_values'], dtype='float64') * scale
+        depth = len(splits)
+
+        # Oblivious tree -> full binary tree: level i tests splits[depth - 1 - i];
+        # leaf index bit k is set when x > border of splits[k]
+        def add(level: int, leaf_bits: int) -> int:
+            if level == depth:
+                return table.add_node(value=float(leaves[leaf_bits]))
+            k = depth - 1 - level
+            split = splits[k]
+            info = float_features[split['float_feature_index']]
+            # nan_mode Min sends NaN left (AsFalse), Max sends it right (AsTrue)
+            index = table.add_node(feature=info['flat_feature_index'],
+                                   threshold=float(np.float32(split['border'])),
+                                   default_left=info.get('nan_value_treatment') != 'AsTrue')
+            table.link(index, add(level + 1, leaf_bits), add(level + 1, leaf_bits | (1 << k)))
+            return index
+
+        table.roots.append(add(0, 0))
+    return ({'kind': 'trees', 'aggregate': 'sum', 'link': 'sigmoid', 'base': bias,
+             'strict': False, 'input_dtype': 'float32'}, table.arrays())
+
+
+def export_logistic(model) -> tuple[dict, dict]:
+    coef = np.asarray(model.coef_, dtype='float64')
+    if coef.shape[0] != 1:
+        raise ValueError("Only binary linear models can be compiled")
+    sign = 1.0 if _positive_column(model) == 1 else -1.0
+    return ({'kind': 'linear', 'link': 'sigmoid', 'base': sign * float(model.intercept_[0]),
+             'input_dtype': 'float64'}, {'coef': sign * coef[0]})
+
+
+def export_platt_svc(model) -> tuple[dict, dict]:
+    svc = model.svc_
+    if svc.kernel not in ('rbf', 'linear'):
+        raise ValueError(f"SVC kernel {svc.kernel!r} cannot be compiled")
+    calibrator = model.calibrator_
+    sign = 1.0 if _positive_column(calibrator) == 1 else -1.0
+    meta = {'kind': 'kernel', 'kernel': svc.kernel, 'gamma': float(getattr(svc, '_gamma', 0.0)),
+            'base': float(svc.intercept_[0]), 'link': 'sigmoid', 'input_dtype': 'float64',
+            'calibration': [sign * float(calibrator.coef_[0, 0]), sign * float(calibrator.intercept_[0])]}
+    arrays = {'support_vectors': np.asarray(svc.support_vectors_, dtype='float64'),
+              'dual_coef': np.asarray(svc.dual_coef_[0], dtype='float64')}
+    return meta, arrays
+
+
+def export_model(model) -> tuple[dict, dict]:
+    """(meta, arrays) for a fitted estimator; ValueError when it cannot be compiled."""
+    name = type(model).__name__
+    if hasattr(model, 'svc_') and hasattr(model, 'calibrator_'):
+        return export_platt_svc(model)
+    if hasattr(model, 'get_booster'):
+        return export_xgboost(model)
+    if hasattr(model, 'booster_'):
+        return export_lightgbm(model)
+    if name.startswith('CatBoost'):
+        return export_catboost(model)
+    if hasattr(model, 'estimators_') and hasattr(model, 'init_'):
+        return export_sklearn_gradient_boosting(model)
+    if hasattr(model, 'tree_') or (hasattr(model, 'estimators_')
+                                   and all(hasattr(tree, 'tree_') for tree in model.estimators_)):
+        return export_sklearn_forest(model)
+    if hasattr(model, 'coef_') and hasattr(model, 'intercept_') and hasattr(model, 'predict_proba'):
+        return export_logistic(model)
+    raise ValueError(f"{name} cannot be compiled")
+
+
+def compile_pipeline(pipeline: dict, X_check: np.ndarray | None = None,
+                     tolerance: float = CHECK_TOLERANCE) -> CompiledMember:
+    """
+    Compile one {'model', 'scaler', 'features'} pipeline, folding in its scaler.
+
+    X_check holds raw feature rows in pipeline['features'] order; the compiled
+    probabilities must match the original within tolerance (ValueError otherwise).
+    """
+    meta, arrays = export_model(pipeline['model'])
+    meta = {**meta, 'features': list(pipeline['features']), 'source': type(pipeline['model']).__name__}
+    scaler = pipeline.get('scaler')
+    if scaler is not None:
+        arrays['scaler_mean'] = (np.asarray(scaler.mean_, dtype='float64') if scaler.mean_ is not None
+                                 else np.zeros(len(meta['features'])))
+        arrays['scaler_scale'] = (np.asarray(scaler.scale_, dtype='float64') if scaler.scale_ is not None
+                                  else np.ones(len(meta['features'])))
+    compiled = CompiledMember(meta, arrays)
+
+    if X_check is not None and len(X_check):
+        X_model = scaler.transform(X_check) if scaler is not None else X_check
+        expected = pipeline['model'].predict_proba(X_model)[:, _positive_column(pipeline['model'])]
+        max_error = float(np.max(np.abs(compiled.predict_proba(X_check)[:, 1] - expected)))
+        if not max_error <= tolerance:
+            raise ValueError(f"{meta['source']} compiled probabilities differ by {max_error:.2e} (> {tolerance:.0e})")
+        compiled.meta['max_abs_error'] = max_error
+        compiled.meta['check_rows'] = int(len(X_check))
+    return compiled
+
+
+# ============================================================================
+# 3. SAVE / LOAD
+# ============================================================================
+def compiled_dir(run_id: str | None = None, registry_dir: Path = REGISTRY_PATH) -> Path:
+    run_id = run_id or latest_run_id(registry_dir)
+    return Path(registry_dir) / run_id / COMPILED_DIR_NAME
+
+
+def compile_run(run_id: str | None = None, check_frame=None, registry_dir: Path = REGISTRY_PATH,
+                tolerance: float = CHECK_TOLERANCE, verbose: bool = True) -> Path:
+    """
+    Compile a run's ensemble members into <run>/compiled/.
+
+    Args:
+        run_id      : Registry run (latest when None).
+        check_frame : DataFrame of raw feature rows (named columns) every member
+                      is verified on.
+        tolerance   : Maximum absolute probability difference allowed.
+
+    Returns:
+        The compiled folder.
+    """
+    from model_registry import load_pipeline
+
+    run = load_run_info(run_id, registry_dir)
+    out_dir = compiled_dir(run['run_id'], registry_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    members = []
+    for member_name, artifact in run['ensemble']:
+        pipeline = load_pipeline(run['run_id'], artifact, registry_dir, mmap=False)
+        X_check = None if check_frame is None else check_frame[pipeline['features']].to_numpy('float64')
+        compiled = compile_pipeline(pipeline, X_check, tolerance)
+        tmp_path = out_dir / f".{artifact}.npz"
+        with open(tmp_path, 'wb') as handle:
+            np.savez(handle, **compiled.arrays)
+        tmp_path.replace(out_dir / f"{artifact}.npz")
+        members.append({'name': member_name, 'artifact': artifact, **compiled.meta})
+        if verbose:
+            size_kb = (out_dir / f"{artifact}.npz").stat().st_size / 1024
+            check = (f"max |Δp| {compiled.meta['max_abs_error']:.1e} on {compiled.meta['check_rows']:,} rows"
+                     if 'max_abs_error' in compiled.meta else 'not verified')
+            print(f"   ✓ {member_name:<20} {compiled.meta['source']:<28} {size_kb:8.1f} KB  {check}")
+
+    manifest = {'format_version': COMPILED_FORMAT_VERSION, 'run_id': run['run_id'], 'members': members}
+    tmp_path = out_dir / f".{COMPILED_MANIFEST}.tmp"
+    tmp_path.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+    tmp_path.replace(out_dir / COMPILED_MANIFEST)
+    return out_dir
+
+
+def load_compiled_members(run_id: str | None = None, registry_dir: Path = REGISTRY_PATH) -> dict:
+    """
+    Compiled ensemble_members ({name: {'model', 'scaler': None, 'features'}}) of a run.
+
+    Raises:
+        FileNotFoundError: the run has not been compiled (see compile_run()).
+    """
+    directory = compiled_dir(run_id, registry_dir)
+    manifest_path = directory / COMPILED_MANIFEST
+    if not manifest_path.exists():
+        raise FileNotFoundError(f"No compiled ensemble in {directory}")
+    manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+    if manifest.get('format_version') != COMPILED_FORMAT_VERSION:
+        raise ValueError(f"Unsupported compiled format in {directory}: {manifest.get('format_version')}")
+    members = {}
+    for meta in manifest['members']:
+        with np.load(directory / f"{meta['artifact']}.npz") as npz:
+            arrays = {key: npz[key] for key in npz.files}
+        members[meta['name']] = {'model': CompiledMember(meta, arrays), 'scaler': None, 'features': meta['features']}
+    return members
+
+
+# ============================================================================
+# 4. CLI
+# ============================================================================
+def _check_frame(data_path: Path | None = None):
+    """Verification rows: every known block x crop, plus jittered copies to reach other branches."""
+    import pandas as pd
+    from recommendation_service import DATA_PATH, block_vectors, feature_frame, load_lookup_tables
+    from batch_scoring import crop_universe
+
+    tables = load_lookup_tables(data_path or DATA_PATH)
+    _, crop_features = crop_universe(tables)
+    vectors = [block_vectors(tables, district, block)[:2] for district, block in tables['blocks']]
+    frame = feature_frame(tables, vectors, crop_features)
+    rng = np.random.default_rng(42)
+    jitter = frame * (1.0 + rng.normal(0.0, 0.1, frame.shape))
+    return pd.concat([frame, jitter], ignore_index=True)
+
+
+def benchmark(run_id: str | None, registry_dir: Path, check_frame) -> None:
+    """Per-call latency of compiled vs original members, and a cold start in a fresh process."""
+    from model_registry import load_ensemble_members
+
+    originals = load_ensemble_members(run_id, registry_dir)
+    compiled = load_compiled_members(run_id, registry_dir)
+    for batch in (1, 28, len(check_frame)):
+        rows = check_frame.iloc[:batch]
+        timings = {}
+        for label, members in (('original', originals), ('compiled', compiled)):
+            repeats = max(3, 200 // batch)
+            start = time.perf_counter()
+            for _ in range(repeats):
+                for member in members.values():
+                    X = rows[member['features']].to_numpy('float64')
+                    if member['scaler'] is not None:
+                        X = member['scaler'].transform(X)
+                    member['model'].predict_proba(X)
+            timings[label] = (time.perf_counter() - start) / repeats * 1000
+        print(f"   {batch:>6} rows: original {timings['original']:8.3f} ms | compiled {timings['compiled']:8.3f} ms")
+
+    # Fresh interpreter: import + load + one prediction, and which heavy modules got imported
+    run = load_run_info(run_id, registry_dir)
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"sys.path.insert(0, {str(Path(__file__).resolve().parent)!r})\n"
+        "import numpy as np\n"
+        "from compiled_ensemble import load_compiled_members\n"
+        f"members = load_compiled_members({run['run_id']!r}, {str(registry_dir)!r})\n"
+        f"row = np.asarray({check_frame.iloc[0].tolist()!r}, dtype='float64')\n"
+        f"names = {list(check_frame.columns)!r}\n"
+        "proba = np.mean([m['model'].predict_proba(row[[names.index(f) for f in m['features']]][None, :])[0, 1]\n"
+        "                 for m in members.values()])\n"
+        "heavy = [name for name in ('sklearn', 'xgboost', 'lightgbm', 'catboost') if name in sys.modules]\n"
+        "print(f\"{time.perf_counter() - start:.3f} {','.join(heavy) or 'none'}\")\n"
+    )
+    seconds, heavy = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                    check=True).stdout.split()
+    print(f"   Cold start (import + load + first prediction): {float(seconds):.3f}s | "
+          f"training libraries imported: {heavy}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile registry ensemble members to NumPy arrays")
+    parser.add_argument("--registry", default=str(REGISTRY_PATH), help="Model registry folder")
+    parser.add_argument("--run", default=None, help="Run id (default: latest)")
+    parser.add_argument("--tolerance", type=float, default=CHECK_TOLERANCE, help="Max |Δ probability| allowed")
+    parser.add_argument("--benchmark", action="store_true", help="Compare latency with the original members")
+    args = parser.parse_args()
+    registry_dir = Path(args.registry)
+
+    print("=" * 80)
+    print("COMPILED ENSEMBLE")
+    print("=" * 80)
+    check_frame = _check_frame()
+    out_dir = compile_run(args.run, check_frame, registry_dir, tolerance=args.tolerance)
+    print(f"\n✓ Compiled ensemble written to {out_dir}")
+    if args.benchmark:
+        print()
+        benchmark(args.run, registry_dir, check_frame)
+
+
+if __name__ == "__main__":
+    main()
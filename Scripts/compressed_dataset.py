@@ -0,0 +1,196 @@
+"""
+Duplicate-Row Compression for Training and Scoring
+==================================================
+Every model feature depends only on crop and district, so the per-transaction
+matrix holds a few hundred distinct rows repeated thousands of times.
+
+This module collapses a matrix to its distinct rows plus per-transaction row
+codes, and turns any subset of transactions into a weighted training set:
+one row per (distinct feature row, label) with the transaction count as
+sample_weight. Fits, predict_proba calls and scaler fits then cost in
+proportion to distinct rows; predictions are expanded back per transaction
+with a single take().
+
+    X_unique, row_codes = compress_rows(X)
+    fit_idx, fit_y, fit_w = weighted_rows(row_codes, y, train_idx)
+    model.fit(X_unique[fit_idx], fit_y, sample_weight=fit_w)
+    y_pred, y_proba = predict_expanded(model, X_unique, row_codes[test_idx])
+"""
+
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin, clone
+from sklearn.linear_model import LogisticRegression
+from sklearn.svm import SVC
+
+
+def compress_rows(X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Collapse a 2-D matrix to its distinct rows.
+
+    Rows are compared bytewise, so identical NaN patterns collapse together.
+
+    Returns:
+        (X_unique, row_codes) with X_unique[row_codes] == X.
+    """
+    X = np.ascontiguousarray(X)
+    if X.ndim != 2:
+        raise ValueError(f"Expected a 2-D matrix, got shape {X.shape}")
+    if len(X) == 0:
+        return X.copy(), np.empty(0, dtype=np.int64)
+
+    row_view = X.view(np.dtype((np.void, X.dtype.itemsize * X.shape[1]))).ravel()
+    _, first_idx, row_codes = np.unique(row_view, return_index=True, return_inverse=True)
+    return X[first_idx], row_codes.ravel().astype(np.int64)
+
+
+def compress_dataset(X: np.ndarray, y: np.ndarray) -> dict:
+    """
+    Compressed representation of a labelled dataset.
+
+    Returns:
+        Dict with X (distinct rows), row_codes (per transaction), counts
+        (transactions per distinct row) and pos_counts (label-1 transactions
+        per distinct row).
+    """
+    X_unique, row_codes = compress_rows(X)
+    y = np.asarray(y).astype(np.int64)
+    n_unique = len(X_unique)
+    return {
+        'X': X_unique,
+        'row_codes': row_codes,
+        'counts': np.bincount(row_codes, minlength=n_unique),
+        'pos_counts': np.bincount(row_codes, weights=y, minlength=n_unique).astype(np.int64),
+        'n_rows': int(len(row_codes)),
+    }
+
+
+def weighted_rows(row_codes: np.ndarray, y: np.ndarray,
+                  idx: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Weighted training rows for a subset of transactions.
+
+    Args:
+        row_codes : Per-transaction codes into the distinct-row table.
+        y         : Per-transaction binary labels.
+        idx       : Transaction indices to include (all when None). Repeats count again.
+
+    Returns:
+        (unique_idx, labels, weights): one entry per (distinct row, label) pair
+        present in the subset, weighted by its transaction count.
+    """
+    codes = row_codes if idx is None else row_codes[idx]
+    labels = np.asarray(y if idx is None else y[idx]).astype(np.int64)
+    n_unique = int(row_codes.max()) + 1 if len(row_codes) else 0
+
+    pair_counts = np.bincount(codes * 2 + labels, minlength=2 * n_unique)
+    pairs = np.flatnonzero(pair_counts)
+    return pairs // 2, pairs % 2, pair_counts[pairs].astype(np.float64)
+
+
+def predict_expanded(model, X_unique: np.ndarray,
+                     row_codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Predict labels and positive-class probabilities per transaction.
+
+    Each distinct row referenced by row_codes is scored once; results are
+    expanded back to one value per transaction.
+    """
+    used, inverse = np.unique(row_codes, return_inverse=True)
+    X_used = X_unique[used]
+    y_proba = model.predict_proba(X_used)[:, 1]
+    y_pred = model.predict(X_used)
+    return y_pred[inverse], y_proba[inverse]
+
+
+def predict_proba_expanded(model, X_unique: np.ndarray, row_codes: np.ndarray) -> np.ndarray:
+    """Positive-class probability per transaction, scoring each distinct row once."""
+    used, inverse = np.unique(row_codes, return_inverse=True)
+    return model.predict_proba(X_unique[used])[:, 1][inverse]
+
+
+class WeightedPlattSVC(ClassifierMixin, BaseEstimator):
+    """
+    SVC with Platt scaling fitted on the weighted training rows.
+
+    SVC(probability=True) calibrates with an internal 5-fold CV that ignores
+    sample weights; on a few dozen distinct rows that produces meaningless
+    (even inverted) probabilities. Here the SVC is fitted without probability
+    and a weighted sigmoid is fitted on its decision values instead.
+    """
+
+    def __init__(self, svc=None):
+        self.svc = svc
+
+    def fit(self, X, y, sample_weight=None):
+        base = clone(self.svc) if self.svc is not None else SVC()
+        self.svc_ = base.set_params(probability=False).fit(X, y, sample_weight=sample_weight)
+        scores = self.svc_.decision_function(X).reshape(-1, 1)
+        self.calibrator_ = LogisticRegression(C=1e6).fit(scores, y, sample_weight=sample_weight)
+        self.classes_ = self.svc_.classes_
+        return self
+
+    def decision_function(self, X):
+        return self.svc_.decision_function(X)
+
+    def predict(self, X):
+        return self.svc_.predict(X)
+
+    def predict_proba(self, X):
+        return self.calibrator_.predict_proba(self.decision_function(X).reshape(-1, 1))
+
+
+def clone_estimator(model):
+    """
+    sklearn clone() with a fallback for estimators that rewrite their own
+    constructor params (CatBoost stores class_weights in its own form, which
+    clone's identity check rejects).
+    """
+    try:
+        return clone(model)
+    except RuntimeError:
+        return type(model)(**model.get_params())
+
+
+def adapt_for_weighted_rows(model, labels: np.ndarray, weights: np.ndarray):
+    """
+    Clone a model so that a weighted distinct row behaves like its transactions.
+
+    sklearn and the boosters count rows, not weight, for a few settings. On a
+    compressed set those would count distinct rows, so they are translated:
+
+        class_weight 'balanced'/'balanced_subsample' -> explicit weights from transaction counts
+        bootstrap=True (RandomForest)                 -> False; each tree sees every row at its weight
+        subsample < 1                                 -> 1.0; row subsampling would drop whole groups
+        min_samples_leaf / min_child_samples          -> 1; identical transactions never split anyway
+        SVC(probability=True)                         -> WeightedPlattSVC (weighted Platt scaling)
+
+    With thousands of copies per distinct row, bootstrap and subsampling only
+    perturb each row's weight slightly, so the translated fit is the closer
+    match to the uncompressed one.
+    """
+    fitted = clone_estimator(model)
+    params = fitted.get_params()
+    updates = {}
+
+    if params.get('class_weight') in ('balanced', 'balanced_subsample'):
+        class_totals = np.bincount(labels, weights=weights, minlength=2)
+        n_classes = int((class_totals > 0).sum())
+        if n_classes == 2:
+            total = class_totals.sum()
+            updates['class_weight'] = {
+                cls: float(total / (n_classes * class_totals[cls])) for cls in range(2)
+            }
+    if params.get('bootstrap') is True:
+        updates['bootstrap'] = False
+    if isinstance(params.get('subsample'), float) and params['subsample'] < 1.0:
+        updates['subsample'] = 1.0
+    if isinstance(params.get('min_samples_leaf'), int) and params['min_samples_leaf'] > 1:
+        updates['min_samples_leaf'] = 1
+    if isinstance(params.get('min_child_samples'), int) and params['min_child_samples'] > 1:
+        updates['min_child_samples'] = 1
+
+    if updates:
+        fitted.set_params(**updates)
+    if isinstance(fitted, SVC) and fitted.probability:
+        return WeightedPlattSVC(fitted)
+    return fitted
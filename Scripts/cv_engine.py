@@ -0,0 +1,198 @@
+"""
+Fold-Shared, Fold-Parallel Cross-Validation
+===========================================
+The balanced CV sample and the StratifiedKFold splits depend only on the
+training labels, so they are computed once per dataset (a "CV plan") and
+reused by every model / feature-set experiment instead of being rebuilt on
+each call.
+
+Folds of one experiment are fitted in parallel with joblib (loky processes;
+large arrays are memory-mapped read-only into the workers) and the
+validation probabilities are kept as out-of-fold (OOF) predictions aligned
+with plan['sample_idx'] for later stages.
+
+    plan = build_cv_plan(y_train, cv_folds=5, max_rows=80000)
+    cv_stats, oof_proba = cross_validate('RandomForest', rf_model, X_unique, plan,
+                                         train_codes=train_codes, n_jobs=-1)
+"""
+
+import os
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.metrics import accuracy_score, f1_score, average_precision_score, roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+
+from compressed_dataset import weighted_rows, predict_expanded, adapt_for_weighted_rows, clone_estimator
+
+THREAD_PARAMS = ('n_jobs', 'thread_count', 'nthread')
+
+
+# ============================================================================
+# 1. CV PLAN
+# ============================================================================
+def sample_cv_indices(y_data, max_rows=80000, random_state=42) -> np.ndarray | None:
+    """Balanced sample positions used for CV, or None when every row is used."""
+    if len(y_data) <= max_rows:
+        return None
+
+    rng = np.random.default_rng(random_state)
+    pos_idx = np.where(y_data == 1)[0]
+    neg_idx = np.where(y_data == 0)[0]
+
+    n_pos = min(len(pos_idx), max_rows // 2)
+    n_neg = min(len(neg_idx), max_rows - n_pos)
+
+    pos_sel = rng.choice(pos_idx, size=n_pos, replace=False)
+    neg_sel = rng.choice(neg_idx, size=n_neg, replace=False)
+    sel = np.concatenate([pos_sel, neg_sel])
+    rng.shuffle(sel)
+    return sel
+
+
+def build_cv_plan(y_data, cv_folds=5, max_rows=80000, random_state=42) -> dict | None:
+    """
+    Sampling and fold indices shared by every experiment on the same labels.
+
+    Returns:
+        Dict with sample_idx (positions into y_data, None = all rows), y_cv,
+        folds (list of (train_pos, val_pos) into y_cv), cv_folds and max_rows;
+        None when the labels (or the sample) hold a single class.
+    """
+    y_data = np.asarray(y_data)
+    if len(np.unique(y_data)) < 2:
+        return None
+
+    sample_idx = sample_cv_indices(y_data, max_rows=max_rows, random_state=random_state)
+    y_cv = y_data if sample_idx is None else y_data[sample_idx]
+    if len(np.unique(y_cv)) < 2:
+        return None
+
+    skf = StratifiedKFold(n_splits=cv_folds, shuffle=True, random_state=random_state)
+    folds = list(skf.split(np.zeros(len(y_cv)), y_cv))
+    return {
+        'sample_idx': sample_idx,
+        'y_cv': y_cv,
+        'folds': folds,
+        'cv_folds': cv_folds,
+        'max_rows': max_rows,
+    }
+
+
+# ============================================================================
+# 2. FOLD FITTING
+# ============================================================================
+def set_thread_budget(model, n_threads: int):
+    """Cap the estimator's own thread parameters at n_threads (modifies and returns model)."""
+    params = model.get_params()
+    updates = {name: n_threads for name in THREAD_PARAMS if name in params}
+    # CatBoost only reports explicitly-set params, so thread_count may be missing
+    if type(model).__name__ == 'CatBoostClassifier':
+        updates['thread_count'] = n_threads
+    if updates:
+        model.set_params(**updates)
+    return model
+
+
+def fit_fold(model_name, model, X_train_model, X_cv, y_cv, fold_train_idx, fold_val_idx,
+             compressed, n_threads):
+    """
+    Fit a clone of model on fold_train_idx and predict fold_val_idx (positions into y_cv).
+
+    Compressed: X_cv holds row codes into X_train_model; otherwise it is the
+    feature matrix. Returns (y_val_pred, y_val_proba).
+    """
+    if compressed:
+        fit_idx, fit_y, fit_w = weighted_rows(X_cv, y_cv, fold_train_idx)
+        cv_model = adapt_for_weighted_rows(model, fit_y, fit_w)
+    else:
+        cv_model = clone_estimator(model)
+    if n_threads is not None:
+        set_thread_budget(cv_model, n_threads)
+
+    # Keep CV logging quiet for CatBoost
+    if model_name == 'CatBoost':
+        try:
+            cv_model.set_params(verbose=False, allow_writing_files=False)
+        except Exception:
+            pass
+
+    if compressed:
+        cv_model.fit(X_train_model[fit_idx], fit_y, sample_weight=fit_w)
+        return predict_expanded(cv_model, X_train_model, X_cv[fold_val_idx])
+
+    cv_model.fit(X_cv[fold_train_idx], y_cv[fold_train_idx])
+    y_val_pred = cv_model.predict(X_cv[fold_val_idx])
+    y_val_proba = cv_model.predict_proba(X_cv[fold_val_idx])[:, 1]
+    return y_val_pred, y_val_proba
+
+
+def cross_validate(model_name, model, X_train_model, plan: dict | None, train_codes=None,
+                   n_jobs: int = 1) -> tuple[dict | None, np.ndarray | None]:
+    """
+    Fit and score every fold of a CV plan.
+
+    Args:
+        model_name    : Family name (CatBoost logging is silenced per fold).
+        model         : Unfitted estimator template.
+        X_train_model : Training features per transaction, or the distinct-row
+                        table when train_codes is given.
+        plan          : Output of build_cv_plan() for these training labels.
+        train_codes   : Per-training-transaction codes into X_train_model.
+        n_jobs        : Thread budget; up to this many folds are fitted in parallel (-1 = all cores).
+
+    Returns:
+        (cv_stats, oof_proba): the cv_* metrics dict and the out-of-fold
+        positive-class probability for every CV row (aligned with plan['y_cv']);
+        (None, None) when there is no plan.
+    """
+    if plan is None:
+        return None, None
+
+    compressed = train_codes is not None
+    source = train_codes if compressed else X_train_model
+    X_cv = source if plan['sample_idx'] is None else source[plan['sample_idx']]
+    y_cv = plan['y_cv']
+    folds = plan['folds']
+
+    # n_jobs is the thread budget: split it between concurrent folds so the
+    # estimators' own n_jobs / thread_count do not oversubscribe the cores
+    budget = (os.cpu_count() or 1) if n_jobs is None or n_jobs < 0 else max(1, n_jobs)
+    n_workers = min(len(folds), budget)
+    n_threads = max(1, budget // n_workers) if n_workers > 1 else None
+
+    fold_args = [
+        (model_name, model, X_train_model, X_cv, y_cv, fold_train_idx, fold_val_idx, compressed, n_threads)
+        for fold_train_idx, fold_val_idx in folds
+    ]
+    if n_workers > 1:
+        fold_outputs = Parallel(n_jobs=n_workers)(delayed(fit_fold)(*args) for args in fold_args)
+    else:
+        fold_outputs = [fit_fold(*args) for args in fold_args]
+
+    fold_acc = []
+    fold_f1 = []
+    fold_pr_auc = []
+    fold_roc_auc = []
+    oof_proba = np.full(len(y_cv), np.nan)
+
+    for (_, fold_val_idx), (y_val_pred, y_val_proba) in zip(folds, fold_outputs):
+        y_fold_val = y_cv[fold_val_idx]
+        oof_proba[fold_val_idx] = y_val_proba
+        fold_acc.append(accuracy_score(y_fold_val, y_val_pred))
+        fold_f1.append(f1_score(y_fold_val, y_val_pred, zero_division=0))
+        fold_pr_auc.append(average_precision_score(y_fold_val, y_val_proba))
+        fold_roc_auc.append(roc_auc_score(y_fold_val, y_val_proba))
+
+    cv_stats = {
+        'cv_rows': int(len(y_cv)),
+        'cv_accuracy_mean': float(np.mean(fold_acc)),
+        'cv_accuracy_std': float(np.std(fold_acc)),
+        'cv_f1_mean': float(np.mean(fold_f1)),
+        'cv_f1_std': float(np.std(fold_f1)),
+        'cv_pr_auc_mean': float(np.mean(fold_pr_auc)),
+        'cv_pr_auc_std': float(np.std(fold_pr_auc)),
+        'cv_roc_auc_mean': float(np.mean(fold_roc_auc)),
+        'cv_roc_auc_std': float(np.std(fold_roc_auc)),
+    }
+    return cv_stats, oof_proba
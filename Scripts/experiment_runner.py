@@ -0,0 +1,192 @@
+"""
+Parallel Experiment Runner
+==========================
+Runs the model x feature-set grid in a process pool instead of one notebook
+cell (and one feature set) at a time.
+
+    - Each worker gets the training data once (pool initializer), not per job.
+    - Each job gets a thread budget: n_jobs / thread_count on the estimator,
+      BLAS/OpenMP limits in the worker and the job's parallel CV folds
+      (cv_engine) all share it, so workers x threads <= cores.
+    - Jobs are submitted longest-first using a per-family cost estimate
+      (or timings from a previous run), so a slow SVM/RandomForest job does
+      not start last and hold up the whole grid.
+    - Outcomes are returned in grid order, so merging them gives the same
+      results / trained_models a serial run produces.
+
+    grid_run = run_experiment_grid(jobs, training_data)
+    for outcome in grid_run['outcomes']:
+        merge_outcome(outcome, results, trained_models, skipped_runs)
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from threadpoolctl import threadpool_limits
+
+from compressed_dataset import clone_estimator
+from cv_engine import set_thread_budget
+from model_training import train_experiment
+
+# Relative cost of one experiment per model family (fit + 5-fold CV), used
+# for longest-job-first ordering when no measured timings are available
+MODEL_COST_WEIGHTS = {
+    'SVM': 6.0,
+    'RandomForest': 5.0,
+    'GradientBoosting': 4.0,
+    'CatBoost': 3.0,
+    'XGBoost': 2.0,
+    'LightGBM': 1.5,
+    'LogisticRegression': 0.5,
+}
+
+_worker_data = None
+_worker_limits = None
+
+
+# ============================================================================
+# 1. COST AND THREAD BUDGET
+# ============================================================================
+def estimate_job_cost(model_name: str, feature_set_name: str, data: dict,
+                      timings: dict | None = None) -> float:
+    """
+    Estimated cost of one job: a measured time from a previous run when
+    available, otherwise family weight x training rows x feature count.
+    """
+    if timings and (model_name, feature_set_name) in timings:
+        return float(timings[(model_name, feature_set_name)])
+    feature_set = data['feature_sets'][feature_set_name]
+    n_rows = len(feature_set['X']) if data['use_compression'] else len(data['train_idx'])
+    return MODEL_COST_WEIGHTS.get(model_name, 1.0) * n_rows * len(feature_set['cols'])
+
+
+def _init_worker(data: dict, n_threads: int) -> None:
+    global _worker_data, _worker_limits
+    for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[var] = str(n_threads)
+    _worker_limits = threadpool_limits(limits=n_threads)
+    # CV folds inside a job share the job's thread budget
+    _worker_data = {**data, 'cv_n_jobs': n_threads}
+
+
+def _run_job(job: tuple, n_threads: int, concurrent: bool = True) -> dict:
+    model_name, model, feature_set_name = job
+    model = set_thread_budget(clone_estimator(model), n_threads)
+    if model_name == 'CatBoost' and concurrent:
+        # Concurrent CatBoost jobs must not share one catboost_info folder
+        model.set_params(train_dir=os.path.join('catboost_info', feature_set_name))
+    log_lines = []
+    outcome = train_experiment(model_name, model, feature_set_name, _worker_data, log=log_lines.append)
+    outcome['log'] = log_lines
+    outcome['pid'] = os.getpid()
+    return outcome
+
+
+# ============================================================================
+# 2. GRID RUNNER
+# ============================================================================
+def run_serial(jobs: list, data: dict, verbose: bool = True) -> dict:
+    """Run jobs one after another in this process; same return shape as run_experiment_grid()."""
+    global _worker_data
+    _worker_data = data
+    start = time.perf_counter()
+    outcomes = []
+    for job in jobs:
+        log_lines = []
+        outcome = train_experiment(job[0], job[1], job[2], data, log=log_lines.append)
+        outcome['log'] = log_lines
+        outcome['pid'] = os.getpid()
+        outcomes.append(outcome)
+        if verbose:
+            print('\n'.join(log_lines))
+    return {'outcomes': outcomes, 'wall_time': time.perf_counter() - start,
+            'max_workers': 1, 'threads_per_job': None}
+
+
+def run_experiment_grid(jobs: list, data: dict, max_workers: int | None = None,
+                        threads_per_job: int | None = None, timings: dict | None = None,
+                        compare_serial: bool = False, verbose: bool = True) -> dict:
+    """
+    Run every (model_name, model, feature_set_name) job in a process pool.
+
+    Args:
+        jobs            : List of (model_name, unfitted estimator, feature_set_name).
+        data            : Output of model_training.prepare_training_data().
+        max_workers     : Worker processes (default: min(jobs, cores)).
+        threads_per_job : Threads per job (default: cores // max_workers).
+        timings         : {(model_name, feature_set_name): seconds} from a previous
+                          run, used for longest-first ordering.
+        compare_serial  : Also time a serial run of the same jobs for the speedup report.
+        verbose         : Print each job's log as it finishes.
+
+    Returns:
+        Dict with outcomes (grid order), wall_time, serial_time (measured, or the
+        sum of job times), speedup, max_workers, threads_per_job and timings.
+    """
+    global _worker_data
+    n_cores = os.cpu_count() or 1
+    if max_workers is None:
+        max_workers = min(len(jobs), n_cores)
+    max_workers = max(1, max_workers)
+    if threads_per_job is None:
+        threads_per_job = max(1, n_cores // max_workers)
+
+    serial_time = None
+    if compare_serial:
+        serial_time = run_serial(jobs, data, verbose=False)['wall_time']
+
+    order = sorted(range(len(jobs)), reverse=True,
+                   key=lambda i: estimate_job_cost(jobs[i][0], jobs[i][2], data, timings))
+
+    if verbose:
+        print(f'Running {len(jobs)} experiments on {max_workers} worker(s) x {threads_per_job} thread(s) '
+              f'({n_cores} cores)')
+
+    start = time.perf_counter()
+    outcomes = [None] * len(jobs)
+    if max_workers == 1:
+        # No pool for a single worker; limits are scoped so the caller's settings survive
+        _worker_data = {**data, 'cv_n_jobs': threads_per_job}
+        with threadpool_limits(limits=threads_per_job):
+            for i in order:
+                outcomes[i] = _run_job(jobs[i], threads_per_job, concurrent=False)
+                if verbose:
+                    print('\n'.join(outcomes[i]['log']))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(data, threads_per_job)) as pool:
+            futures = {pool.submit(_run_job, jobs[i], threads_per_job): i for i in order}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    outcomes[i] = future.result()
+                except Exception as ex:
+                    model_name, _, feature_set_name = jobs[i]
+                    message = f'{model_name} on {feature_set_name}: worker failed - {str(ex)[:120]}'
+                    outcomes[i] = {'model': model_name, 'feature_set': feature_set_name, 'result': None,
+                                   'pipeline': None, 'skipped': [message], 'elapsed': 0.0,
+                                   'log': [f'[{model_name}] {message}'], 'pid': None}
+                if verbose:
+                    print('\n'.join(outcomes[i]['log']))
+    wall_time = time.perf_counter() - start
+
+    job_time_total = sum(outcome['elapsed'] for outcome in outcomes)
+    if serial_time is None:
+        serial_time = job_time_total
+    speedup = serial_time / wall_time if wall_time > 0 else float('nan')
+
+    if verbose:
+        basis = 'measured serial run' if compare_serial else 'sum of job times'
+        print(f'\n✓ Grid finished in {wall_time:.1f}s | serial {serial_time:.1f}s ({basis}) | '
+              f'speedup {speedup:.2f}x')
+
+    return {
+        'outcomes': outcomes,
+        'wall_time': wall_time,
+        'serial_time': serial_time,
+        'speedup': speedup,
+        'max_workers': max_workers,
+        'threads_per_job': threads_per_job,
+        'timings': {(o['model'], o['feature_set']): o['elapsed'] for o in outcomes},
+    }
@@ -0,0 +1,213 @@
+"""
+Content-Addressed Feature-Matrix Cache
+======================================
+Persists the output of feature_builder.build_transaction_features() so a
+notebook restart does not rebuild X / y / X_df when no input has changed.
+
+The cache key is a SHA-256 over:
+    - the contents of the input files (soil CSV, weather summary, crop
+      requirements, area/yield),
+    - the market store manifest (per-crop source hashes),
+    - FEATURE_BUILDER_VERSION and any builder parameters.
+
+Layout (one folder per key, written to a temp folder and renamed into place):
+
+    Data/5_Feature Cache/<key>/
+        X.npy                      float32, opened with mmap_mode='r'
+        y.npy                      int64
+        year.npy                   int16
+        target_revenue_proxy.npy   float64
+        crop_codes.npy             int32 codes into meta['crop_categories']
+        meta.json                  feature names, threshold, match counts, ...
+
+A warm load memory-maps X and y; nothing is copied until the caller slices.
+
+Usage:
+    python "Scripts/feature_cache.py"              # list cache entries
+    python "Scripts/feature_cache.py" --prune 3    # keep only the 3 newest
+"""
+
+import json
+import shutil
+import hashlib
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from feature_builder import FEATURE_BUILDER_VERSION
+from market_store import MANIFEST_NAME, file_sha256
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "Data"
+CACHE_PATH = DATA_PATH / "5_Feature Cache"
+CACHE_FORMAT_VERSION = 1
+
+
+# ============================================================================
+# 1. CACHE KEY
+# ============================================================================
+def feature_cache_key(input_files: list, market_store_dir: Path | None = None,
+                      params: dict | None = None) -> str:
+    """
+    Hash the feature-build inputs into a cache key.
+
+    Args:
+        input_files      : Small input files whose contents feed the build.
+        market_store_dir : Market store folder; its manifest stands in for the
+                           market partitions (it already records a sha256 per crop CSV).
+        params           : Extra builder parameters (e.g. fallback district).
+
+    Returns:
+        Hex digest identifying this exact build.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"format={CACHE_FORMAT_VERSION};builder={FEATURE_BUILDER_VERSION}".encode())
+
+    for path in sorted(Path(p) for p in input_files):
+        digest.update(f"|{path.name}={file_sha256(path)}".encode())
+
+    if market_store_dir is not None:
+        manifest = json.loads((Path(market_store_dir) / MANIFEST_NAME).read_text(encoding='utf-8'))
+        sources = {crop: entry.get('sha256') for crop, entry in manifest.get('sources', {}).items()}
+        digest.update(f"|market={json.dumps(sources, sort_keys=True)}".encode())
+
+    if params:
+        digest.update(f"|params={json.dumps(params, sort_keys=True, default=str)}".encode())
+    return digest.hexdigest()
+
+
+# ============================================================================
+# 2. SAVE / LOAD
+# ============================================================================
+def save_feature_cache(key: str, build: dict, cache_dir: Path = CACHE_PATH) -> Path:
+    """Write a feature build under its key; returns the entry folder."""
+    cache_dir = Path(cache_dir)
+    entry_dir = cache_dir / key
+    if entry_dir.exists():
+        return entry_dir
+
+    tmp_dir = cache_dir / f".{key}.tmp"
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    X_df = build['X_df']
+    crop = pd.Categorical(X_df['crop'])
+
+    np.save(tmp_dir / 'X.npy', np.ascontiguousarray(build['X'], dtype=np.float32))
+    np.save(tmp_dir / 'y.npy', np.asarray(build['y'], dtype=np.int64))
+    np.save(tmp_dir / 'year.npy', X_df['year'].to_numpy(dtype=np.int16))
+    np.save(tmp_dir / 'target_revenue_proxy.npy', X_df['target_revenue_proxy'].to_numpy(dtype=np.float64))
+    np.save(tmp_dir / 'crop_codes.npy', crop.codes.astype(np.int32))
+
+    meta = {
+        'key': key,
+        'format_version': CACHE_FORMAT_VERSION,
+        'feature_builder_version': FEATURE_BUILDER_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'feature_names': list(build['feature_names']),
+        'crop_categories': [str(c) for c in crop.categories],
+        'high_perf_threshold': build['high_perf_threshold'],
+        'total_records': int(build['total_records']),
+        'req_matches': int(build['req_matches']),
+        'area_yield_matches': int(build['area_yield_matches']),
+    }
+    (tmp_dir / 'meta.json').write_text(json.dumps(meta, indent=2), encoding='utf-8')
+
+    try:
+        tmp_dir.rename(entry_dir)
+    except OSError:
+        # Another process committed the same key first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return entry_dir
+
+
+def load_feature_cache(key: str, cache_dir: Path = CACHE_PATH) -> dict | None:
+    """
+    Load a cached feature build, or None on a miss.
+
+    X and y are memory-mapped read-only; X_df wraps the mapped X without copying.
+    """
+    entry_dir = Path(cache_dir) / key
+    meta_path = entry_dir / 'meta.json'
+    if not meta_path.exists():
+        return None
+
+    meta = json.loads(meta_path.read_text(encoding='utf-8'))
+    X = np.load(entry_dir / 'X.npy', mmap_mode='r')
+    y = np.load(entry_dir / 'y.npy', mmap_mode='r')
+    crop_codes = np.load(entry_dir / 'crop_codes.npy', mmap_mode='r')
+
+    X_df = pd.DataFrame(X, columns=meta['feature_names'], copy=False)
+    X_df['crop'] = pd.Categorical.from_codes(crop_codes, categories=meta['crop_categories'])
+    X_df['success'] = y
+    X_df['year'] = np.load(entry_dir / 'year.npy', mmap_mode='r')
+    X_df['target_revenue_proxy'] = np.load(entry_dir / 'target_revenue_proxy.npy', mmap_mode='r')
+
+    return {
+        'X': X,
+        'y': y,
+        'X_df': X_df,
+        'feature_names': meta['feature_names'],
+        'high_perf_threshold': meta['high_perf_threshold'],
+        'total_records': meta['total_records'],
+        'req_matches': meta['req_matches'],
+        'area_yield_matches': meta['area_yield_matches'],
+        'cache_key': key,
+    }
+
+
+def load_or_build(key: str, build_fn, cache_dir: Path = CACHE_PATH) -> tuple[dict, bool]:
+    """
+    Return (feature build, cache_hit). On a miss build_fn() is called, saved and reloaded
+    so both paths hand back the same memory-mapped float32 arrays.
+    """
+    cached = load_feature_cache(key, cache_dir)
+    if cached is not None:
+        return cached, True
+    save_feature_cache(key, build_fn(), cache_dir)
+    return load_feature_cache(key, cache_dir), False
+
+
+def prune_feature_cache(keep: int = 3, cache_dir: Path = CACHE_PATH) -> list[str]:
+    """Delete all but the newest `keep` cache entries; returns the removed keys."""
+    cache_dir = Path(cache_dir)
+    if not cache_dir.exists():
+        return []
+    entries = sorted((p for p in cache_dir.iterdir() if (p / 'meta.json').exists()),
+                     key=lambda p: p.stat().st_mtime, reverse=True)
+    removed = []
+    for entry in entries[keep:]:
+        shutil.rmtree(entry, ignore_errors=True)
+        removed.append(entry.name)
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or prune the feature-matrix cache")
+    parser.add_argument("--cache", default=str(CACHE_PATH), help="Feature cache folder")
+    parser.add_argument("--prune", type=int, metavar="N", help="Keep only the N newest entries")
+    args = parser.parse_args()
+    cache_dir = Path(args.cache)
+
+    if args.prune is not None:
+        removed = prune_feature_cache(args.prune, cache_dir)
+        print(f"✓ Removed {len(removed)} cache entr{'y' if len(removed) == 1 else 'ies'}")
+
+    if not cache_dir.exists():
+        print(f"No feature cache at {cache_dir}")
+        return
+    for entry in sorted(cache_dir.iterdir()):
+        meta_path = entry / 'meta.json'
+        if not meta_path.exists():
+            continue
+        meta = json.loads(meta_path.read_text(encoding='utf-8'))
+        size_mb = sum(f.stat().st_size for f in entry.iterdir()) / 1e6
+        print(f"  {entry.name[:12]}  {meta['created']}  {meta['total_records']:>10,} rows  "
+              f"{len(meta['feature_names'])} features  {size_mb:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
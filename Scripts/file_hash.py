@@ -0,0 +1,19 @@
+"""
+File Content Hashing
+====================
+Dependency-free content hashing shared by the data scripts (CSV merging,
+file swapping, XLSX conversion) and the market store, so the lightweight
+scripts do not pull in pyarrow just to fingerprint a file.
+"""
+
+import hashlib
+from pathlib import Path
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
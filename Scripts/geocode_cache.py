@@ -0,0 +1,163 @@
+"""
+Persistent Geocode Cache
+========================
+SQLite cache for Nominatim block lookups used by Weather Data Collection.py.
+Block coordinates do not change, so a block that was geocoded once is never
+sent to Nominatim again.
+
+Each row is keyed by the normalized (block, district, state, country) query
+and records:
+    - found = 1 with lat / lon and the fallback level that matched
+      (0 = "block, district, state, country" ... 3 = "district, state, country"),
+    - found = 0 for a "no result" answer from every fallback query
+      (negative entry, re-tried after NEGATIVE_TTL_DAYS).
+
+Network errors are never cached.
+
+    cache = GeocodeCache()
+    hit = cache.get(block, district)          # MISS, None (negative) or dict
+    cache.put(block, district, coords=(lat, lon), level=1, query='...')
+
+Usage:
+    python "Scripts/geocode_cache.py"                    # cache summary
+    python "Scripts/geocode_cache.py" --drop-negative    # forget "no result" entries
+"""
+
+import re
+import time
+import sqlite3
+import argparse
+from pathlib import Path
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "Data"
+GEOCODE_CACHE_PATH = DATA_PATH / "Weather Data (District Wise)" / "geocode_cache.sqlite"
+POSITIVE_TTL_DAYS = None    # coordinates never expire
+NEGATIVE_TTL_DAYS = 30
+
+MISS = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS geocode (
+    key        TEXT PRIMARY KEY,
+    block      TEXT,
+    district   TEXT,
+    state      TEXT,
+    country    TEXT,
+    found      INTEGER NOT NULL,
+    lat        REAL,
+    lon        REAL,
+    level      INTEGER,
+    query      TEXT,
+    fetched_at REAL NOT NULL
+)
+"""
+
+
+def normalize_part(value: str) -> str:
+    """Case-fold and collapse whitespace so 'T.  Palur ' and 't. palur' share a key."""
+    return re.sub(r"\s+", " ", str(value)).strip().casefold()
+
+
+def cache_key(block: str, district: str, state: str = "Tamil Nadu", country: str = "India") -> str:
+    return "|".join(normalize_part(part) for part in (block, district, state, country))
+
+
+class GeocodeCache:
+    """SQLite-backed geocode cache with a TTL for positive and negative entries."""
+
+    def __init__(self, path: Path = GEOCODE_CACHE_PATH, positive_ttl_days: float | None = POSITIVE_TTL_DAYS,
+                 negative_ttl_days: float | None = NEGATIVE_TTL_DAYS):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.positive_ttl = None if positive_ttl_days is None else positive_ttl_days * 86400
+        self.negative_ttl = None if negative_ttl_days is None else negative_ttl_days * 86400
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute(_SCHEMA)
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _expired(self, found: int, fetched_at: float) -> bool:
+        ttl = self.positive_ttl if found else self.negative_ttl
+        return ttl is not None and time.time() - fetched_at > ttl
+
+    def get(self, block: str, district: str, state: str = "Tamil Nadu", country: str = "India"):
+        """
+        Cached answer for a block: MISS when unknown or expired, None for a
+        cached "no result", otherwise a dict with lat, lon, level and query.
+        """
+        row = self.conn.execute(
+            "SELECT found, lat, lon, level, query, fetched_at FROM geocode WHERE key = ?",
+            (cache_key(block, district, state, country),),
+        ).fetchone()
+        if row is None or self._expired(row[0], row[5]):
+            self.misses += 1
+            return MISS
+        self.hits += 1
+        if not row[0]:
+            return None
+        return {"lat": row[1], "lon": row[2], "level": row[3], "query": row[4]}
+
+    def contains(self, block: str, district: str, state: str = "Tamil Nadu", country: str = "India") -> bool:
+        """True when get() would answer without the network (does not count as a hit)."""
+        row = self.conn.execute(
+            "SELECT found, fetched_at FROM geocode WHERE key = ?",
+            (cache_key(block, district, state, country),),
+        ).fetchone()
+        return row is not None and not self._expired(row[0], row[1])
+
+    def put(self, block: str, district: str, coords: tuple[float, float] | None,
+            level: int | None = None, query: str | None = None,
+            state: str = "Tamil Nadu", country: str = "India") -> None:
+        """Store a lookup result; coords=None records a negative ("no result") entry."""
+        lat, lon = coords if coords is not None else (None, None)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (cache_key(block, district, state, country), block, district, state, country,
+             int(coords is not None), lat, lon, level, query, time.time()),
+        )
+        self.conn.commit()
+
+    def drop_negative(self) -> int:
+        """Delete every negative entry; returns how many were removed."""
+        removed = self.conn.execute("DELETE FROM geocode WHERE found = 0").rowcount
+        self.conn.commit()
+        return removed
+
+    def summary(self) -> dict:
+        found, negative = self.conn.execute(
+            "SELECT COALESCE(SUM(found), 0), COALESCE(SUM(1 - found), 0) FROM geocode"
+        ).fetchone()
+        levels = dict(self.conn.execute(
+            "SELECT level, COUNT(*) FROM geocode WHERE found = 1 GROUP BY level ORDER BY level"
+        ).fetchall())
+        return {"found": found, "negative": negative, "levels": levels}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the geocode cache")
+    parser.add_argument("--cache", default=str(GEOCODE_CACHE_PATH), help="SQLite cache file")
+    parser.add_argument("--drop-negative", action="store_true", help="Forget cached 'no result' answers")
+    args = parser.parse_args()
+
+    with GeocodeCache(args.cache) as cache:
+        if args.drop_negative:
+            print(f"✓ Removed {cache.drop_negative()} negative entries")
+        info = cache.summary()
+    print(f"Geocode cache: {args.cache}")
+    print(f"  Found: {info['found']}  |  No result: {info['negative']}")
+    for level, count in info["levels"].items():
+        print(f"  Fallback level {level}: {count}")
+
+
+if __name__ == "__main__":
+    main()
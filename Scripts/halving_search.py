@@ -0,0 +1,437 @@
+"""
+Successive-Halving Experiment Search
+====================================
+Optional search mode for the leaderboard stage. Instead of running full
+5-fold CV plus a holdout fit for every (model, feature set) pair, every
+configuration - including hyperparameter variants drawn from a per-family
+search space - is first scored on a small budget (a stratified subsample,
+or a fraction of the trees when rows are compressed), and only the top
+1/eta is promoted to the next, larger budget.
+
+    - Rungs fit on the training fold of the shared CV plan (fold 0) and score
+      on its full validation fold, so scores are comparable across rungs and
+      the holdout set is never looked at.
+    - The rung budget is rows when training on full matrices: a stratified
+      fraction of the training fold. With compressed rows any fraction of
+      transactions collapses back onto the same few distinct rows (only the
+      weights change), so the budget is the ensemble size instead: tree
+      models fit fraction x n_estimators (or CatBoost iterations) on the
+      whole fold, and models without a size parameter (LogisticRegression,
+      SVM) are scored once and carry that score through later rungs.
+    - Configurations are ranked by PR-AUC, then F1, then accuracy (the
+      leaderboard order). The best configuration of every model family is
+      always promoted, so the ensemble keeps one member per family.
+    - Survivors of the last rung run through train_experiment() (full CV +
+      holdout) via the parallel runner; at most one configuration per
+      (model, feature set) reaches it, so trained_models keys stay unique.
+
+    search = run_halving_search(jobs, training_data, param_space=DEFAULT_PARAM_SPACE)
+    for outcome in search['outcomes']:
+        merge_outcome(outcome, results, trained_models, skipped_runs)
+"""
+
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.metrics import accuracy_score, f1_score, average_precision_score
+from sklearn.model_selection import ParameterGrid, ParameterSampler
+from sklearn.preprocessing import StandardScaler
+from threadpoolctl import threadpool_limits
+
+from compressed_dataset import weighted_rows, clone_estimator
+from cv_engine import fit_fold, set_thread_budget
+from experiment_runner import run_experiment_grid
+from model_training import SCALED_MODELS
+
+# Hyperparameter ranges around the notebook's fixed settings
+DEFAULT_PARAM_SPACE = {
+    'RandomForest': {'n_estimators': [100, 200, 400], 'max_depth': [8, 14, None]},
+    'GradientBoosting': {'n_estimators': [100, 150, 300], 'learning_rate': [0.03, 0.05, 0.1], 'max_depth': [3, 4]},
+    'LogisticRegression': {'C': [0.1, 1.0, 10.0]},
+    'SVM': {'C': [0.5, 1.5, 5.0], 'gamma': ['scale', 0.1]},
+    'CatBoost': {'depth': [4, 6, 8], 'learning_rate': [0.03, 0.05, 0.1]},
+    'XGBoost': {'max_depth': [4, 6, 8], 'learning_rate': [0.03, 0.05, 0.1]},
+    'LightGBM': {'num_leaves': [15, 31, 63], 'learning_rate': [0.03, 0.05, 0.1]},
+}
+
+CATBOOST_DEFAULT_ITERATIONS = 1000
+XGBOOST_DEFAULT_ESTIMATORS = 100
+
+_worker_data = None
+
+
+# ============================================================================
+# 1. CONFIGURATIONS
+# ============================================================================
+def format_params(params: dict) -> str:
+    """Compact label for a hyperparameter override ('default' when empty)."""
+    if not params:
+        return 'default'
+    return ', '.join(f'{name}={value}' for name, value in sorted(params.items()))
+
+
+def expand_configs(jobs: list, param_space: dict | None = None, n_candidates: int | None = None,
+                   random_state: int = 42) -> list:
+    """
+    Expand (model_name, model, feature_set_name) jobs into search configurations.
+
+    Args:
+        jobs         : Queued jobs, as passed to run_experiment_grid().
+        param_space  : {model_name: {param: list or scipy distribution}}; families
+                       without an entry keep only their notebook settings.
+        n_candidates : Sample this many overrides per family (ParameterSampler)
+                       instead of the full grid (required for distributions).
+
+    Returns:
+        List of dicts with model, feature_set, estimator and params. The
+        unmodified estimator (params == {}) is always included.
+    """
+    param_space = param_space or {}
+    overrides = {}
+    for model_name, model, _ in jobs:
+        if model_name in overrides:
+            continue
+        space = param_space.get(model_name)
+        candidates = [{}]
+        if space:
+            if n_candidates is None:
+                candidates += list(ParameterGrid(space))
+            else:
+                candidates += list(ParameterSampler(space, n_iter=n_candidates, random_state=random_state))
+        base_params = model.get_params()
+        unique = []
+        for params in candidates:
+            # Drop overrides that only repeat the notebook settings
+            params = {k: v for k, v in params.items() if k not in base_params or base_params[k] != v}
+            if params not in unique:
+                unique.append(params)
+        overrides[model_name] = unique
+
+    configs = []
+    for model_name, model, feature_set_name in jobs:
+        for params in overrides[model_name]:
+            estimator = clone_estimator(model)
+            if params:
+                estimator.set_params(**params)
+            configs.append({'model': model_name, 'feature_set': feature_set_name,
+                            'estimator': estimator, 'params': params})
+    return configs
+
+
+# ============================================================================
+# 2. RUNG SCORING
+# ============================================================================
+def rung_positions(data: dict) -> tuple[np.ndarray, np.ndarray]:
+    """Training-set positions of fold 0 of the shared CV plan: (fit_pos, val_pos)."""
+    plan = data['cv_plan']
+    if plan is None:
+        raise ValueError('Successive halving needs a CV plan (training labels hold a single class).')
+    fit_pos, val_pos = plan['folds'][0]
+    if plan['sample_idx'] is not None:
+        fit_pos, val_pos = plan['sample_idx'][fit_pos], plan['sample_idx'][val_pos]
+    return np.asarray(fit_pos), np.asarray(val_pos)
+
+
+def stratified_fraction(y_data, positions: np.ndarray, fraction: float, min_rows: int = 0,
+                        random_state: int = 42) -> np.ndarray:
+    """A class-stratified random subset of positions holding about fraction of them."""
+    n_keep = min(len(positions), max(min_rows, int(round(len(positions) * fraction))))
+    if n_keep >= len(positions):
+        return positions
+    rng = np.random.default_rng(random_state)
+    labels = np.asarray(y_data)[positions]
+    keep = []
+    for cls in np.unique(labels):
+        cls_pos = positions[labels == cls]
+        n_cls = max(1, int(round(n_keep * len(cls_pos) / len(positions))))
+        keep.append(rng.choice(cls_pos, size=min(n_cls, len(cls_pos)), replace=False))
+    sel = np.concatenate(keep)
+    rng.shuffle(sel)
+    return sel
+
+
+def size_param(estimator) -> tuple[str, int] | None:
+    """(parameter, value) holding an ensemble's trees / boosting rounds, or None."""
+    params = estimator.get_params()
+    if type(estimator).__name__ == 'CatBoostClassifier':
+        return 'iterations', int(params.get('iterations') or CATBOOST_DEFAULT_ITERATIONS)
+    if 'n_estimators' in params:
+        return 'n_estimators', int(params['n_estimators'] or XGBOOST_DEFAULT_ESTIMATORS)
+    return None
+
+
+def rung_estimator(estimator, fraction: float, min_estimators: int = 10):
+    """Copy of estimator with fraction of its trees / rounds (at least min_estimators)."""
+    size = size_param(estimator)
+    if size is None or fraction >= 1:
+        return estimator
+    name, value = size
+    estimator = clone_estimator(estimator)
+    estimator.set_params(**{name: max(min(min_estimators, value), int(round(value * fraction)))})
+    return estimator
+
+
+def _model_matrix(model_name: str, feature_set_name: str, data: dict):
+    # Same inputs as train_experiment(): (X_model, X_cv, compressed), X_cv being
+    # per-training-transaction row codes when compressed; None for constant features
+    feature_set = data['feature_sets'][feature_set_name]
+    y_train = data['y_train']
+    scaler = StandardScaler()
+    if data['use_compression']:
+        train_codes = feature_set['row_codes'][data['train_idx']]
+        fit_idx, _, fit_w = weighted_rows(train_codes, y_train)
+        if model_name in SCALED_MODELS:
+            scaler.fit(feature_set['X'][fit_idx], sample_weight=fit_w)
+            X_model = scaler.transform(feature_set['X'])
+        else:
+            X_model = feature_set['X']
+        X_check = X_model[fit_idx]
+        X_cv = train_codes
+    else:
+        X_model = feature_set['X'][data['train_idx']]
+        if model_name in SCALED_MODELS:
+            X_model = scaler.fit_transform(X_model)
+        X_check = X_cv = X_model
+    if np.all(np.nanstd(X_check, axis=0) < 1e-12):
+        return None
+    return X_model, X_cv, data['use_compression']
+
+
+def score_config(config: dict, data: dict, fit_pos: np.ndarray, val_pos: np.ndarray,
+                 n_threads: int | None = None) -> dict:
+    """
+    Fit one configuration on fit_pos and score it on val_pos (training-set positions).
+
+    Returns:
+        Dict with pr_auc, f1, accuracy (NaN when the configuration cannot be
+        scored), fit_rows, elapsed and an error message or None.
+    """
+    start = time.perf_counter()
+    scores = {'pr_auc': np.nan, 'f1': np.nan, 'accuracy': np.nan,
+              'fit_rows': int(len(fit_pos)), 'elapsed': 0.0, 'error': None}
+    try:
+        matrix = _model_matrix(config['model'], config['feature_set'], data)
+        if matrix is None:
+            scores['error'] = 'constant features'
+        else:
+            X_model, X_cv, compressed = matrix
+            y_train = data['y_train']
+            y_pred, y_proba = fit_fold(config['model'], config['estimator'], X_model, X_cv, y_train,
+                                       fit_pos, val_pos, compressed, n_threads)
+            y_val = y_train[val_pos]
+            scores['pr_auc'] = float(average_precision_score(y_val, y_proba))
+            scores['f1'] = float(f1_score(y_val, y_pred, zero_division=0))
+            scores['accuracy'] = float(accuracy_score(y_val, y_pred))
+    except Exception as ex:
+        scores['error'] = str(ex)[:120]
+    scores['elapsed'] = time.perf_counter() - start
+    return scores
+
+
+def _init_worker(data: dict, n_threads: int) -> None:
+    global _worker_data
+    for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[var] = str(n_threads)
+    threadpool_limits(limits=n_threads)
+    _worker_data = data
+
+
+def _score_job(config: dict, fit_pos: np.ndarray, val_pos: np.ndarray, n_threads: int) -> dict:
+    config = {**config, 'estimator': set_thread_budget(clone_estimator(config['estimator']), n_threads)}
+    return score_config(config, _worker_data, fit_pos, val_pos, n_threads=n_threads)
+
+
+# ============================================================================
+# 3. PROMOTION
+# ============================================================================
+def _rank_key(scores: dict) -> tuple:
+    # Leaderboard order: PR-AUC, then F1, then accuracy; unscored configurations last
+    return tuple(-np.inf if np.isnan(scores[m]) else scores[m] for m in ('pr_auc', 'f1', 'accuracy'))
+
+
+def promote(configs: list, scores: list, n_keep: int, min_per_model: int = 1) -> list:
+    """
+    Indices of the configurations promoted to the next rung.
+
+    The top n_keep by leaderboard order are kept, plus the best min_per_model
+    of every model family. Unscored configurations (failed / constant) never
+    advance.
+    """
+    order = sorted((i for i in range(len(configs)) if not np.isnan(scores[i]['pr_auc'])),
+                   key=lambda i: _rank_key(scores[i]), reverse=True)
+    keep = order[:n_keep]
+    per_model = {}
+    for i in keep:
+        per_model[configs[i]['model']] = per_model.get(configs[i]['model'], 0) + 1
+    for i in order[n_keep:]:
+        model_name = configs[i]['model']
+        if per_model.get(model_name, 0) < min_per_model:
+            keep.append(i)
+            per_model[model_name] = per_model.get(model_name, 0) + 1
+    return sorted(keep)
+
+
+# ============================================================================
+# 4. SEARCH
+# ============================================================================
+def run_halving_search(jobs: list, data: dict, param_space: dict | None = None,
+                       n_candidates: int | None = None, eta: int = 3, min_fraction: float = 1 / 27,
+                       min_rows: int = 2000, min_estimators: int = 10, min_per_model: int = 1,
+                       max_workers: int | None = None,
+                       threads_per_job: int | None = None, random_state: int = 42,
+                       verbose: bool = True) -> dict:
+    """
+    Successive-halving search over the queued model x feature-set grid.
+
+    Args:
+        jobs            : List of (model_name, unfitted estimator, feature_set_name).
+        data            : Output of model_training.prepare_training_data().
+        param_space     : Per-family hyperparameter ranges (see DEFAULT_PARAM_SPACE).
+        n_candidates    : Sampled overrides per family instead of the full grid.
+        eta             : Keep the top 1/eta per rung; each rung gets eta x the budget
+                          (rows, or trees / rounds with compressed rows).
+        min_fraction    : Budget fraction used by the first rung.
+        min_rows        : Lower bound on rows fitted in any rung (full matrices).
+        min_estimators  : Lower bound on trees / rounds in any rung (compressed rows).
+        min_per_model   : Best configurations per model family always promoted.
+        max_workers     : Worker processes for rung scoring and the final grid.
+        threads_per_job : Threads per job (default: cores // max_workers).
+
+    Returns:
+        Dict with outcomes (final train_experiment() results, one per surviving
+        (model, feature set), each result row carrying a 'params' label),
+        rungs (per-rung history), n_configs, wall_time, fits, fit_cost (fits in
+        full-size fit units) and full_grid_fits.
+    """
+    global _worker_data
+    configs = expand_configs(jobs, param_space, n_candidates=n_candidates, random_state=random_state)
+    fit_pos, val_pos = rung_positions(data)
+    y_train = data['y_train']
+    compressed = data['use_compression']
+    resource = 'n_estimators' if compressed else 'rows'
+
+    n_rungs = max(0, int(math.floor(math.log(1 / min_fraction, eta) + 1e-9)))
+    fractions = [eta ** -(n_rungs - r) for r in range(n_rungs)]
+
+    n_cores = os.cpu_count() or 1
+    if max_workers is None:
+        max_workers = min(len(configs), n_cores)
+    max_workers = max(1, max_workers)
+    if threads_per_job is None:
+        threads_per_job = max(1, n_cores // max_workers)
+
+    if verbose:
+        print(f'Successive halving: {len(configs)} configurations over {len(jobs)} model x feature-set jobs, '
+              f'{n_rungs} rung(s) (eta={eta}) before full CV')
+
+    start = time.perf_counter()
+    alive = list(range(len(configs)))
+    rungs = []
+    fixed_scores = {}    # compressed rows: scores of configurations without a size parameter
+    rung_cost = 0.0
+    pool = None
+    if max_workers > 1 and n_rungs > 0:
+        pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                   initargs=(data, threads_per_job))
+    try:
+        for rung, fraction in enumerate(fractions):
+            rung_start = time.perf_counter()
+            rung_configs = [configs[i] for i in alive]
+            if compressed:
+                rung_fit_pos = fit_pos
+                todo = [(j, {**config, 'estimator': rung_estimator(config['estimator'], fraction, min_estimators)})
+                        for j, config in enumerate(rung_configs) if alive[j] not in fixed_scores]
+            else:
+                rung_fit_pos = stratified_fraction(y_train, fit_pos, fraction, min_rows=min_rows,
+                                                   random_state=random_state + rung)
+                todo = list(enumerate(rung_configs))
+            if pool is not None:
+                futures = [pool.submit(_score_job, config, rung_fit_pos, val_pos, threads_per_job)
+                           for _, config in todo]
+                fresh_scores = [future.result() for future in futures]
+            else:
+                _worker_data = data
+                with threadpool_limits(limits=threads_per_job):
+                    fresh_scores = [_score_job(config, rung_fit_pos, val_pos, threads_per_job)
+                                    for _, config in todo]
+            rung_scores = [fixed_scores.get(i) for i in alive]
+            for (j, config), scores in zip(todo, fresh_scores):
+                rung_scores[j] = scores
+                # Cost in full-size fits of one fold: fraction of the rows or of the trees
+                sized = not compressed or size_param(config['estimator']) is not None
+                rung_cost += fraction if sized else 1.0
+                if compressed and size_param(config['estimator']) is None:
+                    fixed_scores[alive[j]] = scores
+
+            n_keep = max(1, int(math.ceil(len(alive) / eta)))
+            kept = promote(rung_configs, rung_scores, n_keep, min_per_model=min_per_model)
+            rungs.append({
+                'rung': rung,
+                'fraction': fraction,
+                'resource': resource,
+                'fit_rows': int(len(rung_fit_pos)),
+                'fits': len(todo),
+                'evaluated': [(configs[i]['model'], configs[i]['feature_set'], format_params(configs[i]['params']),
+                               rung_scores[j]) for j, i in enumerate(alive)],
+                'promoted': len(kept),
+                'wall_time': time.perf_counter() - rung_start,
+            })
+            if verbose:
+                budget = (f'{fraction:.1%} of each ensemble\'s trees on the full training fold'
+                          if compressed else f'{len(rung_fit_pos):,} rows ({fraction:.1%} of the training fold)')
+                print(f'  Rung {rung}: {len(alive)} configs ({len(todo)} fitted), {budget} '
+                      f'-> {len(kept)} promoted [{rungs[-1]["wall_time"]:.1f}s]')
+            alive = [alive[j] for j in kept]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    # One configuration per (model, feature set) reaches full CV: the best-ranked survivor
+    final, seen = [], set()
+    last_scores = {}
+    if rungs:
+        last_scores = {(m, fs, p): s for m, fs, p, s in rungs[-1]['evaluated']}
+    alive.sort(key=lambda i: _rank_key(last_scores.get(
+        (configs[i]['model'], configs[i]['feature_set'], format_params(configs[i]['params'])),
+        {'pr_auc': np.nan, 'f1': np.nan, 'accuracy': np.nan})), reverse=True)
+    for i in alive:
+        key = (configs[i]['model'], configs[i]['feature_set'])
+        if key not in seen:
+            seen.add(key)
+            final.append(i)
+    final.sort()
+
+    final_jobs = [(configs[i]['model'], configs[i]['estimator'], configs[i]['feature_set']) for i in final]
+    if verbose:
+        print(f'  Full CV + holdout for {len(final_jobs)} of {len(configs)} configurations')
+    grid_run = run_experiment_grid(final_jobs, data, max_workers=max_workers, threads_per_job=threads_per_job,
+                                   verbose=verbose)
+    for i, outcome in zip(final, grid_run['outcomes']):
+        outcome['params'] = configs[i]['params']
+        if outcome['result'] is not None:
+            outcome['result']['params'] = format_params(configs[i]['params'])
+
+    # Fit counts: rung fits are one fold each on a fraction of the rows (or of
+    # the trees); the full grid would run cv_folds + 1 full fits per configuration
+    full_fits_per_config = data['cv_folds'] + 1
+    fits = sum(r['fits'] for r in rungs) + full_fits_per_config * len(final_jobs)
+    fit_cost = rung_cost + full_fits_per_config * len(final_jobs)
+    full_grid_fits = full_fits_per_config * len(configs)
+    wall_time = time.perf_counter() - start
+    if verbose:
+        print(f'\n✓ Search finished in {wall_time:.1f}s | {fits} fits costing ~{fit_cost:.0f} full-size fits '
+              f'(full grid of {len(configs)} configurations: {full_grid_fits} full-size fits)')
+
+    return {
+        'outcomes': grid_run['outcomes'],
+        'rungs': rungs,
+        'n_configs': len(configs),
+        'wall_time': wall_time,
+        'fits': fits,
+        'fit_cost': fit_cost,
+        'full_grid_fits': full_grid_fits,
+        'final_grid': grid_run,
+    }
@@ -0,0 +1,322 @@
+"""
+Columnar Market-Price Store
+===========================
+Ingests the crop market CSVs under Data/3_Cleaned CSVs into a typed Parquet
+dataset partitioned by crop and year:
+
+    Data/4_Market Store/
+        _manifest.json
+        crop=Bajra/year=2016/part-0.parquet
+        crop=Bajra/year=2017/part-0.parquet
+        ...
+
+String columns (District Name, Market Name, Commodity, Variety, Grade) are
+dictionary-encoded and load as pandas categoricals; Price Date is a real date
+column. Rows are sorted by district and date inside each partition so
+district and date filters can skip row groups.
+
+Only crops whose source CSV changed (size/mtime, confirmed by content hash)
+are rewritten. read_market() supports column projection and pushdown on
+crop, district (exact names or a case-insensitive substring) and date range.
+
+Usage:
+    python "Scripts/market_store.py"            # incremental ingest
+    python "Scripts/market_store.py" --force    # rebuild every partition
+"""
+
+import json
+import shutil
+import argparse
+from datetime import date, datetime
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from file_hash import file_sha256  # re-exported for existing callers
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "Data"
+CLEANED_CSV_PATH = DATA_PATH / "3_Cleaned CSVs"
+STORE_PATH = DATA_PATH / "4_Market Store"
+MANIFEST_NAME = "_manifest.json"
+STORE_FORMAT_VERSION = 1
+
+STRING_COLUMNS = ['District Name', 'Market Name', 'Commodity', 'Variety', 'Grade']
+PRICE_COLUMNS = ['Min Price (Rs./Quintal)', 'Max Price (Rs./Quintal)', 'Modal Price (Rs./Quintal)']
+DATE_COLUMN = 'Price Date'
+DAY_COLUMN = 'Day Of Week'
+
+CSV_COLUMN_TYPES = {
+    **{col: pa.string() for col in STRING_COLUMNS},
+    **{col: pa.float64() for col in PRICE_COLUMNS},
+    DATE_COLUMN: pa.date32(),
+    DAY_COLUMN: pa.float32(),   # some files write 3.0 or leave it blank; narrowed to int8 below
+}
+ROW_GROUP_SIZE = 64_000
+
+
+# ============================================================================
+# 1. MANIFEST HELPERS
+# ============================================================================
+def load_manifest(store_dir: Path = STORE_PATH) -> dict:
+    """Return the store manifest, or an empty one if the store has not been built."""
+    manifest_path = Path(store_dir) / MANIFEST_NAME
+    if not manifest_path.exists():
+        return {'format_version': STORE_FORMAT_VERSION, 'sources': {}}
+    manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+    if manifest.get('format_version') != STORE_FORMAT_VERSION:
+        return {'format_version': STORE_FORMAT_VERSION, 'sources': {}}
+    return manifest
+
+
+def _save_manifest(manifest: dict, store_dir: Path) -> None:
+    manifest_path = Path(store_dir) / MANIFEST_NAME
+    tmp_path = manifest_path.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding='utf-8')
+    tmp_path.replace(manifest_path)
+
+
+def _source_changed(csv_file: Path, entry: dict | None) -> tuple[bool, dict]:
+    """Compare a source CSV with its manifest entry; returns (changed, fresh stat info)."""
+    stat = csv_file.stat()
+    info = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if entry is None:
+        info['sha256'] = file_sha256(csv_file)
+        return True, info
+    if entry.get('size') == info['size'] and entry.get('mtime_ns') == info['mtime_ns']:
+        info['sha256'] = entry.get('sha256')
+        return False, info
+    # Touched but possibly identical (e.g. re-saved) — confirm with the content hash
+    info['sha256'] = file_sha256(csv_file)
+    return info['sha256'] != entry.get('sha256'), info
+
+
+# ============================================================================
+# 2. INGEST
+# ============================================================================
+def read_market_csv(csv_file: Path) -> pa.Table:
+    """Parse one market CSV into a typed Arrow table (dictionary strings, date32 dates)."""
+    table = pv.read_csv(
+        csv_file,
+        convert_options=pv.ConvertOptions(column_types=CSV_COLUMN_TYPES, strings_can_be_null=True),
+    )
+    columns = []
+    for name in table.column_names:
+        column = table[name]
+        if name in STRING_COLUMNS:
+            column = pc.dictionary_encode(column)
+        elif name == DAY_COLUMN:
+            try:
+                column = column.cast(pa.int8())
+            except pa.ArrowInvalid:
+                pass
+        columns.append(column)
+    table = pa.table(columns, names=table.column_names)
+
+    if DATE_COLUMN in table.column_names:
+        table = table.append_column('year', pc.year(table[DATE_COLUMN]).cast(pa.int16()))
+    else:
+        table = table.append_column('year', pa.nulls(len(table), pa.int16()))
+
+    sort_keys = [(col, 'ascending') for col in ['District Name', DATE_COLUMN] if col in table.column_names]
+    if sort_keys:
+        # Sort on the decoded strings so row-group min/max statistics follow district order
+        order = pc.sort_indices(
+            pa.table({name: table[name].cast(pa.string()) if name in STRING_COLUMNS else table[name]
+                      for name, _ in sort_keys}),
+            sort_keys=sort_keys,
+        )
+        table = table.take(order)
+    return table
+
+
+def _write_crop_partitions(crop: str, table: pa.Table, store_dir: Path) -> int:
+    """Replace every year partition of one crop; returns the number of partitions written."""
+    crop_dir = store_dir / f"crop={crop}"
+    if crop_dir.exists():
+        shutil.rmtree(crop_dir)
+    ds.write_dataset(
+        table,
+        base_dir=crop_dir,
+        format='parquet',
+        partitioning=ds.partitioning(pa.schema([('year', pa.int16())]), flavor='hive'),
+        basename_template='part-{i}.parquet',
+        max_rows_per_group=ROW_GROUP_SIZE,
+        min_rows_per_group=min(ROW_GROUP_SIZE, max(len(table), 1)),
+        existing_data_behavior='overwrite_or_ignore',
+    )
+    return len(pc.unique(table['year']))
+
+
+def build_market_store(source_dir: Path = CLEANED_CSV_PATH, store_dir: Path = STORE_PATH,
+                       force: bool = False, verbose: bool = True) -> dict:
+    """
+    Bring the Parquet store up to date with the CSVs in source_dir.
+
+    Args:
+        source_dir : Folder with one market CSV per crop (non-recursive).
+        store_dir  : Output dataset folder.
+        force      : Rebuild every crop even if its CSV is unchanged.
+        verbose    : Print one line per crop.
+
+    Returns:
+        Dict with lists of rebuilt, unchanged and removed crops.
+    """
+    source_dir, store_dir = Path(source_dir), Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(store_dir)
+    sources = manifest['sources']
+    summary = {'rebuilt': [], 'unchanged': [], 'removed': []}
+
+    csv_files = {csv_file.stem: csv_file for csv_file in sorted(source_dir.glob('*.csv'))}
+
+    for crop, csv_file in csv_files.items():
+        changed, info = _source_changed(csv_file, sources.get(crop))
+        crop_dir = store_dir / f"crop={crop}"
+        if not (changed or force or not crop_dir.exists()):
+            sources[crop].update(info)
+            summary['unchanged'].append(crop)
+            continue
+
+        try:
+            table = read_market_csv(csv_file)
+        except Exception as exc:
+            print(f"   ✗ Error reading {csv_file.name}: {exc}")
+            continue
+
+        n_partitions = _write_crop_partitions(crop, table, store_dir)
+        sources[crop] = {**info, 'rows': len(table), 'partitions': n_partitions,
+                         'ingested_at': datetime.now().isoformat(timespec='seconds')}
+        _save_manifest(manifest, store_dir)
+        summary['rebuilt'].append(crop)
+        if verbose:
+            print(f"   ✓ {crop}: {len(table):,} rows → {n_partitions} year partitions")
+
+    for crop in sorted(set(sources) - set(csv_files)):
+        shutil.rmtree(store_dir / f"crop={crop}", ignore_errors=True)
+        del sources[crop]
+        summary['removed'].append(crop)
+        if verbose:
+            print(f"   ✓ {crop}: source CSV removed → partitions deleted")
+
+    _save_manifest(manifest, store_dir)
+    if verbose:
+        print(f"\n   Rebuilt: {len(summary['rebuilt'])} | Unchanged: {len(summary['unchanged'])} "
+              f"| Removed: {len(summary['removed'])}")
+    return summary
+
+
+# ============================================================================
+# 3. READER
+# ============================================================================
+def market_dataset(store_dir: Path = STORE_PATH) -> ds.Dataset:
+    """Open the store as a hive-partitioned Arrow dataset (crop and year columns included)."""
+    return ds.dataset(
+        Path(store_dir),
+        format='parquet',
+        partitioning=ds.partitioning(pa.schema([('crop', pa.string()), ('year', pa.int16())]), flavor='hive'),
+        exclude_invalid_files=True,
+        ignore_prefixes=['_', '.'],
+    )
+
+
+def _as_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(value).date()
+
+
+def market_filter(crops=None, districts=None, start_date=None, end_date=None,
+                  district_match: str | None = None) -> ds.Expression | None:
+    """Build the pushdown expression for read_market(); None means no filter."""
+    expressions = []
+    if crops is not None:
+        expressions.append(ds.field('crop').isin(list(crops)))
+    if districts is not None:
+        expressions.append(ds.field('District Name').isin(list(districts)))
+    if district_match is not None:
+        expressions.append(pc.match_substring(ds.field('District Name').cast(pa.string()),
+                                              district_match, ignore_case=True))
+    if start_date is not None:
+        start = _as_date(start_date)
+        expressions.append(ds.field('year') >= start.year)
+        expressions.append(ds.field(DATE_COLUMN) >= pa.scalar(start, pa.date32()))
+    if end_date is not None:
+        end = _as_date(end_date)
+        expressions.append(ds.field('year') <= end.year)
+        expressions.append(ds.field(DATE_COLUMN) <= pa.scalar(end, pa.date32()))
+
+    if not expressions:
+        return None
+    combined = expressions[0]
+    for expression in expressions[1:]:
+        combined = combined & expression
+    return combined
+
+
+def read_market(columns: list[str] | None = None, crops=None, districts=None,
+                start_date=None, end_date=None, store_dir: Path = STORE_PATH,
+                district_match: str | None = None) -> pd.DataFrame:
+    """
+    Read market rows from the store.
+
+    Args:
+        columns    : Columns to load (all when None). 'crop' and 'year' are available too.
+        crops      : Crop names (CSV stems) to keep; prunes whole crop partitions.
+        districts  : Exact District Name values to keep.
+        start_date : Inclusive lower bound on Price Date; prunes year partitions.
+        end_date   : Inclusive upper bound on Price Date; prunes year partitions.
+        store_dir  : Store folder.
+        district_match : Keep rows whose District Name contains this text
+                         (case-insensitive), e.g. 'thanjavur'.
+
+    Returns:
+        DataFrame with categorical string columns and datetime64 Price Date.
+    """
+    dataset = market_dataset(store_dir)
+    table = dataset.to_table(
+        columns=columns,
+        filter=market_filter(crops=crops, districts=districts, start_date=start_date, end_date=end_date,
+                             district_match=district_match),
+    )
+    return table.to_pandas(date_as_object=False)
+
+
+def read_market_dict(columns: list[str] | None = None, crops=None, districts=None,
+                     start_date=None, end_date=None, store_dir: Path = STORE_PATH,
+                     district_match: str | None = None) -> dict:
+    """read_market() split into {crop: DataFrame}, the shape the notebook and scripts use."""
+    load_columns = None if columns is None else list(dict.fromkeys(['crop', *columns]))
+    df = read_market(load_columns, crops=crops, districts=districts,
+                     start_date=start_date, end_date=end_date, store_dir=store_dir,
+                     district_match=district_match)
+
+    crop_frames = {}
+    keep = [col for col in df.columns if col not in ('crop', 'year')] if columns is None else list(columns)
+    for crop, crop_df in df.groupby('crop', observed=True, sort=True):
+        crop_frames[str(crop)] = crop_df[keep].reset_index(drop=True)
+    return crop_frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the columnar market-price store")
+    parser.add_argument("--source", default=str(CLEANED_CSV_PATH), help="Folder with crop CSVs")
+    parser.add_argument("--store", default=str(STORE_PATH), help="Output Parquet dataset folder")
+    parser.add_argument("--force", action="store_true", help="Rebuild every partition")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("BUILDING COLUMNAR MARKET STORE")
+    print("=" * 80)
+    print(f"\nInput directory: {args.source}")
+    print(f"Store directory: {args.store}\n")
+    build_market_store(Path(args.source), Path(args.store), force=args.force)
+
+
+if __name__ == "__main__":
+    main()
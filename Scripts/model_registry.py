@@ -0,0 +1,318 @@
+"""
+Model Artifact Registry
+=======================
+Persists what a training run produces (trained_models, best_pipeline,
+ensemble_members, fitted scalers, feature lists, leaderboard rows) so the
+rankings can be refreshed in a new process without refitting the grid.
+
+Each run is one versioned folder, written to a temp folder and renamed into
+place:
+
+    Data/6_Model Registry/
+        LATEST                                   id of the newest run
+        <run_id>/                                <YYYYmmdd-HHMMSS>-<data hash[:8]>
+            run.json                             artifact index, ensemble, best key, data hash
+            results.json                         full leaderboard rows
+            artifacts/<feature_set>__<model>/
+                model.joblib                     uncompressed, so arrays can be memory-mapped
+                scaler.joblib                    only for scaled families
+                meta.json                        features, metrics row, data hash
+
+Every artifact records the SHA-256 of the training data it was fitted on
+(split indices, labels and its feature set's matrix), so a loaded model can
+be checked against the current feature build.
+
+load_ensemble_members() restores only the ensemble pipelines and opens their
+numpy arrays with mmap_mode='r': coefficients, scaler statistics and other
+array attributes stay mapped (sklearn trees copy their node tables on load).
+Restoring the ensemble takes ~0.1 s once sklearn is imported.
+
+    run_id = save_run(trained_models, results, ensemble_members, best_key, data=training_data)
+    ensemble_members = load_ensemble_members()
+
+Usage:
+    python "Scripts/model_registry.py"              # list runs
+    python "Scripts/model_registry.py" --load       # time a cold load of the latest ensemble
+    python "Scripts/model_registry.py" --prune 3    # keep only the 3 newest runs
+"""
+
+import re
+import json
+import time
+import shutil
+import hashlib
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "Data"
+REGISTRY_PATH = DATA_PATH / "6_Model Registry"
+REGISTRY_FORMAT_VERSION = 1
+LATEST_NAME = "LATEST"
+
+
+# ============================================================================
+# 1. DATA HASH
+# ============================================================================
+def _update_array(digest, array) -> None:
+    array = np.ascontiguousarray(array)
+    digest.update(f"{array.dtype.str}{array.shape}".encode())
+    digest.update(memoryview(array).cast('B'))
+
+
+def training_data_hash(data: dict, feature_set_name: str | None = None) -> str:
+    """
+    SHA-256 of a model_training.prepare_training_data() bundle: split indices,
+    labels and either one feature set (cols, matrix, row codes) or all of them.
+    """
+    digest = hashlib.sha256()
+    for name in ('train_idx', 'test_idx', 'y_train', 'y_test'):
+        _update_array(digest, data[name])
+    names = [feature_set_name] if feature_set_name is not None else sorted(data['feature_sets'])
+    for name in names:
+        feature_set = data['feature_sets'][name]
+        digest.update(f"|{name}={json.dumps(list(feature_set['cols']))}".encode())
+        _update_array(digest, feature_set['X'])
+        if feature_set.get('row_codes') is not None:
+            _update_array(digest, feature_set['row_codes'])
+    return digest.hexdigest()
+
+
+# ============================================================================
+# 2. SAVE
+# ============================================================================
+def artifact_name(feature_set_name: str, model_name: str) -> str:
+    """Folder name of one (feature set, model) artifact."""
+    return re.sub(r"[^\w.-]+", "_", f"{feature_set_name}__{model_name}")
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+def _write_json(path: Path, payload) -> None:
+    path.write_text(json.dumps(payload, indent=2, default=_json_default), encoding='utf-8')
+
+
+def save_run(trained_models: dict, results: list, ensemble_members: dict | None = None,
+             best_key: tuple | None = None, data: dict | None = None, data_hash: str | None = None,
+             params: dict | None = None, registry_dir: Path = REGISTRY_PATH) -> str:
+    """
+    Save every fitted pipeline of a training run as a new registry version.
+
+    Args:
+        trained_models   : {(feature_set, model): {'model', 'scaler', 'features'}}.
+        results          : Leaderboard rows (one dict per experiment).
+        ensemble_members : {model_name: pipeline}; each pipeline must be one of
+                           trained_models' values.
+        best_key         : (feature_set, model) of best_pipeline.
+        data             : prepare_training_data() bundle, hashed per feature set.
+        data_hash        : Run-level input hash when data is not given
+                           (e.g. the feature cache key).
+        params           : Extra run settings recorded in run.json.
+        registry_dir     : Registry folder.
+
+    Returns:
+        The new run id (also written to LATEST).
+    """
+    registry_dir = Path(registry_dir)
+    if data is not None:
+        data_hash = training_data_hash(data)
+    created = datetime.now()
+    run_id = f"{created:%Y%m%d-%H%M%S}-{(data_hash or 'nohash')[:8]}"
+
+    tmp_dir = registry_dir / f".{run_id}.tmp"
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    (tmp_dir / 'artifacts').mkdir(parents=True)
+
+    metrics = {(row['feature_set'], row['model']): row for row in results}
+    artifacts = {}
+    names_by_id = {}
+    for (feature_set_name, model_name), pipeline in trained_models.items():
+        name = artifact_name(feature_set_name, model_name)
+        artifact_dir = tmp_dir / 'artifacts' / name
+        artifact_dir.mkdir()
+        # Uncompressed dumps keep numpy arrays as raw buffers that joblib can memory-map
+        joblib.dump(pipeline['model'], artifact_dir / 'model.joblib')
+        if pipeline.get('scaler') is not None:
+            joblib.dump(pipeline['scaler'], artifact_dir / 'scaler.joblib')
+        meta = {
+            'feature_set': feature_set_name,
+            'model': model_name,
+            'features': list(pipeline['features']),
+            'scaled': pipeline.get('scaler') is not None,
+            'metrics': metrics.get((feature_set_name, model_name)),
+            'data_hash': training_data_hash(data, feature_set_name) if data is not None else data_hash,
+        }
+        _write_json(artifact_dir / 'meta.json', meta)
+        artifacts[name] = {key: meta[key] for key in ('feature_set', 'model', 'scaled', 'data_hash')}
+        names_by_id[id(pipeline)] = name
+
+    ensemble = []
+    for member_name, pipeline in (ensemble_members or {}).items():
+        if id(pipeline) not in names_by_id:
+            shutil.rmtree(tmp_dir)
+            raise ValueError(f"Ensemble member {member_name!r} is not one of trained_models")
+        ensemble.append([member_name, names_by_id[id(pipeline)]])
+
+    run = {
+        'run_id': run_id,
+        'format_version': REGISTRY_FORMAT_VERSION,
+        'created': created.isoformat(timespec='seconds'),
+        'data_hash': data_hash,
+        'params': params or {},
+        'best': artifact_name(*best_key) if best_key is not None else None,
+        'ensemble': ensemble,
+        'artifacts': artifacts,
+    }
+    _write_json(tmp_dir / 'results.json', list(results))
+    _write_json(tmp_dir / 'run.json', run)
+
+    tmp_dir.rename(registry_dir / run_id)
+    latest_tmp = registry_dir / f".{LATEST_NAME}.tmp"
+    latest_tmp.write_text(run_id, encoding='utf-8')
+    latest_tmp.replace(registry_dir / LATEST_NAME)
+    return run_id
+
+
+# ============================================================================
+# 3. LOAD
+# ============================================================================
+def latest_run_id(registry_dir: Path = REGISTRY_PATH) -> str | None:
+    latest_path = Path(registry_dir) / LATEST_NAME
+    if not latest_path.exists():
+        return None
+    return latest_path.read_text(encoding='utf-8').strip()
+
+
+def _run_dir(run_id: str | None, registry_dir: Path) -> Path:
+    run_id = run_id or latest_run_id(registry_dir)
+    if run_id is None:
+        raise FileNotFoundError(f"No saved runs in {registry_dir}")
+    run_dir = Path(registry_dir) / run_id
+    if not (run_dir / 'run.json').exists():
+        raise FileNotFoundError(f"Run not found: {run_dir}")
+    return run_dir
+
+
+def load_run_info(run_id: str | None = None, registry_dir: Path = REGISTRY_PATH) -> dict:
+    """run.json of a saved run (the latest when run_id is None)."""
+    run_dir = _run_dir(run_id, registry_dir)
+    run = json.loads((run_dir / 'run.json').read_text(encoding='utf-8'))
+    if run.get('format_version') != REGISTRY_FORMAT_VERSION:
+        raise ValueError(f"Unsupported registry format in {run_dir}: {run.get('format_version')}")
+    return run
+
+
+def load_pipeline(run_id: str | None, name: str, registry_dir: Path = REGISTRY_PATH, mmap: bool = True) -> dict:
+    """One artifact as the {'model', 'scaler', 'features'} pipeline dict used by the notebook."""
+    artifact_dir = _run_dir(run_id, registry_dir) / 'artifacts' / name
+    meta = json.loads((artifact_dir / 'meta.json').read_text(encoding='utf-8'))
+    mmap_mode = 'r' if mmap else None
+    scaler_path = artifact_dir / 'scaler.joblib'
+    return {
+        'model': joblib.load(artifact_dir / 'model.joblib', mmap_mode=mmap_mode),
+        'scaler': joblib.load(scaler_path, mmap_mode=mmap_mode) if scaler_path.exists() else None,
+        'features': meta['features'],
+    }
+
+
+def load_ensemble_members(run_id: str | None = None, registry_dir: Path = REGISTRY_PATH,
+                          mmap: bool = True) -> dict:
+    """Restore ensemble_members ({model_name: pipeline}, leaderboard order) without refitting."""
+    run = load_run_info(run_id, registry_dir)
+    return {member_name: load_pipeline(run['run_id'], name, registry_dir, mmap=mmap)
+            for member_name, name in run['ensemble']}
+
+
+def load_run(run_id: str | None = None, registry_dir: Path = REGISTRY_PATH, mmap: bool = True) -> dict:
+    """
+    Restore a whole run.
+
+    Returns:
+        Dict with run_id, data_hash, results (leaderboard rows), trained_models
+        ({(feature_set, model): pipeline}), ensemble_members, best_key and
+        best_pipeline; ensemble members and best_pipeline share trained_models' objects.
+    """
+    run = load_run_info(run_id, registry_dir)
+    run_dir = _run_dir(run['run_id'], registry_dir)
+    pipelines = {name: load_pipeline(run['run_id'], name, registry_dir, mmap=mmap) for name in run['artifacts']}
+    keys = {name: (info['feature_set'], info['model']) for name, info in run['artifacts'].items()}
+    best = run.get('best')
+    return {
+        'run_id': run['run_id'],
+        'data_hash': run['data_hash'],
+        'results': json.loads((run_dir / 'results.json').read_text(encoding='utf-8')),
+        'trained_models': {keys[name]: pipeline for name, pipeline in pipelines.items()},
+        'ensemble_members': {member_name: pipelines[name] for member_name, name in run['ensemble']},
+        'best_key': keys[best] if best else None,
+        'best_pipeline': pipelines[best] if best else None,
+    }
+
+
+# ============================================================================
+# 4. MAINTENANCE
+# ============================================================================
+def list_runs(registry_dir: Path = REGISTRY_PATH) -> list[dict]:
+    """run.json of every saved run, newest first."""
+    registry_dir = Path(registry_dir)
+    if not registry_dir.exists():
+        return []
+    runs = [json.loads((p / 'run.json').read_text(encoding='utf-8'))
+            for p in registry_dir.iterdir() if (p / 'run.json').exists()]
+    return sorted(runs, key=lambda run: run['run_id'], reverse=True)
+
+
+def prune_runs(keep: int = 3, registry_dir: Path = REGISTRY_PATH) -> list[str]:
+    """Delete all but the newest `keep` runs (never the LATEST one); returns the removed ids."""
+    latest = latest_run_id(registry_dir)
+    removed = []
+    for run in list_runs(registry_dir)[keep:]:
+        if run['run_id'] == latest:
+            continue
+        shutil.rmtree(Path(registry_dir) / run['run_id'], ignore_errors=True)
+        removed.append(run['run_id'])
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the model artifact registry")
+    parser.add_argument("--registry", default=str(REGISTRY_PATH), help="Registry folder")
+    parser.add_argument("--run", default=None, help="Run id for --load (default: latest)")
+    parser.add_argument("--load", action="store_true", help="Load the ensemble members and report the time")
+    parser.add_argument("--prune", type=int, metavar="N", help="Keep only the N newest runs")
+    args = parser.parse_args()
+    registry_dir = Path(args.registry)
+
+    if args.prune is not None:
+        removed = prune_runs(args.prune, registry_dir)
+        print(f"✓ Removed {len(removed)} run{'' if len(removed) == 1 else 's'}")
+
+    if args.load:
+        start = time.perf_counter()
+        members = load_ensemble_members(args.run, registry_dir)
+        elapsed = time.perf_counter() - start
+        print(f"✓ Loaded {len(members)} ensemble members in {elapsed:.3f}s: {', '.join(members)}")
+
+    runs = list_runs(registry_dir)
+    if not runs:
+        print(f"No saved runs in {registry_dir}")
+        return
+    latest = latest_run_id(registry_dir)
+    for run in runs:
+        size_mb = sum(f.stat().st_size for f in (registry_dir / run['run_id']).rglob('*') if f.is_file()) / 1e6
+        marker = '*' if run['run_id'] == latest else ' '
+        print(f"{marker} {run['run_id']}  {run['created']}  {len(run['artifacts']):>3} artifacts  "
+              f"{len(run['ensemble'])} ensemble  best={run['best']}  {size_mb:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Model Training Helpers
+======================
+Training, cross-validation and holdout scoring for one (model, feature set)
+experiment, moved out of the notebook so experiments can run in worker
+processes (see experiment_runner.py).
+
+Nothing here reads notebook globals: the split and feature matrices are
+bundled once by prepare_training_data() and every experiment returns its
+leaderboard row, fitted pipeline and skip messages instead of appending to
+shared lists.
+
+    training_data = prepare_training_data(X_source, y, train_idx, test_idx, feature_sets)
+    outcome = train_experiment('RandomForest', rf_model, 'soil_weather_req_area_yield', training_data)
+"""
+
+import time
+
+import numpy as np
+from sklearn.metrics import accuracy_score, f1_score, average_precision_score, roc_auc_score
+from sklearn.preprocessing import StandardScaler
+
+from compressed_dataset import (
+    compress_rows,
+    weighted_rows,
+    predict_expanded,
+    adapt_for_weighted_rows,
+    clone_estimator,
+)
+from cv_engine import build_cv_plan, cross_validate
+
+CV_FOLDS = 5
+CV_MAX_ROWS = 80000
+SVM_TRAIN_CAP = 20000
+SCALED_MODELS = ('LogisticRegression', 'SVM')
+CV_RESULT_COLUMNS = [
+    'cv_rows',
+    'cv_accuracy_mean', 'cv_accuracy_std',
+    'cv_f1_mean', 'cv_f1_std',
+    'cv_pr_auc_mean', 'cv_pr_auc_std',
+    'cv_roc_auc_mean', 'cv_roc_auc_std',
+]
+
+
+# ============================================================================
+# 1. TRAINING DATA
+# ============================================================================
+def prepare_training_data(X_source, y, train_idx, test_idx, feature_sets: dict,
+                          use_compression: bool = True, cv_folds: int = CV_FOLDS,
+                          cv_max_rows: int = CV_MAX_ROWS, svm_train_cap: int = SVM_TRAIN_CAP,
+                          cv_n_jobs: int = -1) -> dict:
+    """
+    Bundle the split and per-feature-set matrices needed by train_experiment().
+
+    Args:
+        X_source        : Feature DataFrame (one row per transaction).
+        y               : Per-transaction labels.
+        train_idx       : Training transaction indices.
+        test_idx        : Holdout transaction indices.
+        feature_sets    : {feature_set_name: [columns]}.
+        use_compression : Store distinct rows + row codes instead of full matrices.
+        cv_n_jobs       : CV folds fitted in parallel per experiment (-1 = all cores).
+
+    Returns:
+        Dict with y_train, y_test, train_idx, test_idx, settings, the shared
+        cv_plan (see cv_engine.build_cv_plan) and a 'feature_sets' entry per set
+        holding cols, X and row_codes (None when uncompressed).
+    """
+    y = np.asarray(y)
+    sets = {}
+    for feature_set_name, cols in feature_sets.items():
+        X_set = np.asarray(X_source[cols].values)
+        if use_compression:
+            X_unique, row_codes = compress_rows(X_set)
+            sets[feature_set_name] = {'cols': list(cols), 'X': X_unique, 'row_codes': row_codes}
+        else:
+            sets[feature_set_name] = {'cols': list(cols), 'X': X_set, 'row_codes': None}
+
+    y_train = y[train_idx]
+    return {
+        'feature_sets': sets,
+        'train_idx': np.asarray(train_idx),
+        'test_idx': np.asarray(test_idx),
+        'y_train': y_train,
+        'y_test': y[test_idx],
+        'use_compression': use_compression,
+        'cv_folds': cv_folds,
+        'cv_max_rows': cv_max_rows,
+        'cv_n_jobs': cv_n_jobs,
+        # Sampling + fold indices depend only on the labels: one plan for every experiment
+        'cv_plan': build_cv_plan(y_train, cv_folds=cv_folds, max_rows=cv_max_rows, random_state=42),
+        'svm_train_cap': svm_train_cap,
+    }
+
+
+# ============================================================================
+# 2. ONE EXPERIMENT
+# ============================================================================
+def train_experiment(model_name, model, feature_set_name, data: dict, log=print) -> dict:
+    """
+    Cross-validate, fit and score one model on one feature set.
+
+    Args:
+        model_name       : Family name used on the leaderboard.
+        model            : Unfitted estimator (cloned, never mutated).
+        feature_set_name : Key into data['feature_sets'].
+        data             : Output of prepare_training_data().
+        log              : Callable receiving progress lines.
+
+    Returns:
+        Dict with model, feature_set, result (leaderboard row or None),
+        pipeline ({'model', 'scaler', 'features'} or None), oof_proba
+        (out-of-fold probabilities aligned with the CV plan, or None),
+        skipped (messages) and elapsed seconds.
+    """
+    start = time.perf_counter()
+    feature_set = data['feature_sets'][feature_set_name]
+    cols = feature_set['cols']
+    y_train = data['y_train']
+    y_test = data['y_test']
+    cv_folds = data['cv_folds']
+    cv_max_rows = data['cv_max_rows']
+    outcome = {'model': model_name, 'feature_set': feature_set_name,
+               'result': None, 'pipeline': None, 'oof_proba': None, 'skipped': [], 'elapsed': 0.0}
+
+    log(f'[{model_name}] Preparing feature set: {feature_set_name}')
+
+    use_scaled = model_name in SCALED_MODELS
+    scaler = StandardScaler()
+
+    if data['use_compression']:
+        train_codes = feature_set['row_codes'][data['train_idx']]
+        test_codes = feature_set['row_codes'][data['test_idx']]
+        fit_idx, fit_y, fit_w = weighted_rows(train_codes, y_train)
+
+        # Weighted scaler fit == scaler fit on every training transaction
+        scaler.fit(feature_set['X'][fit_idx], sample_weight=fit_w)
+        X_unique_use = scaler.transform(feature_set['X']) if use_scaled else feature_set['X']
+        X_check = X_unique_use[fit_idx]
+    else:
+        X_train_raw = feature_set['X'][data['train_idx']]
+        X_test_raw = feature_set['X'][data['test_idx']]
+
+        X_train_scaled = scaler.fit_transform(X_train_raw)
+        X_test_scaled = scaler.transform(X_test_raw)
+
+        X_train_use = X_train_scaled if use_scaled else X_train_raw
+        X_test_use = X_test_scaled if use_scaled else X_test_raw
+        X_check = X_train_use
+
+    if np.all(np.nanstd(X_check, axis=0) < 1e-12):
+        message = f'{model_name} on {feature_set_name}: constant features'
+        log(f'[{model_name}] Skipping - {message}')
+        outcome['skipped'].append(message)
+        outcome['elapsed'] = time.perf_counter() - start
+        return outcome
+
+    cv_plan = data['cv_plan']
+    if data['use_compression']:
+        # Distinct rows are few, so SVM no longer needs the training-row cap
+        cv_args = (X_unique_use, cv_plan)
+        cv_kwargs = {'train_codes': train_codes}
+        log(f'[{model_name}] Compressed {len(train_codes):,} training rows to {len(fit_idx):,} weighted distinct rows')
+    elif model_name == 'SVM' and len(X_train_use) > data['svm_train_cap']:
+        svm_train_cap = data['svm_train_cap']
+        pos_idx = np.where(y_train == 1)[0]
+        neg_idx = np.where(y_train == 0)[0]
+        svm_pos_n = min(len(pos_idx), svm_train_cap // 2)
+        svm_neg_n = min(len(neg_idx), svm_train_cap - svm_pos_n)
+        svm_pos_sel = np.random.choice(pos_idx, size=svm_pos_n, replace=False)
+        svm_neg_sel = np.random.choice(neg_idx, size=svm_neg_n, replace=False)
+        svm_idx = np.concatenate([svm_pos_sel, svm_neg_sel])
+        np.random.shuffle(svm_idx)
+        X_train_fit = X_train_use[svm_idx]
+        y_train_fit = y_train[svm_idx]
+        # The capped subset has its own labels, so it needs its own plan
+        cv_plan = build_cv_plan(y_train_fit, cv_folds=cv_folds, max_rows=cv_max_rows, random_state=42)
+        cv_args, cv_kwargs = (X_train_fit, cv_plan), {}
+        log(f'[{model_name}] SVM checkpoint: using {len(svm_idx):,} rows for fit')
+    else:
+        X_train_fit = X_train_use
+        y_train_fit = y_train
+        cv_args, cv_kwargs = (X_train_fit, cv_plan), {}
+
+    log(f'[{model_name}] Running {cv_folds}-fold CV (up to {cv_max_rows:,} rows) ...')
+    cv_stats = None
+    try:
+        cv_stats, outcome['oof_proba'] = cross_validate(model_name, model, *cv_args, **cv_kwargs,
+                                                        n_jobs=data['cv_n_jobs'])
+        if cv_stats is not None:
+            log(
+                f"[{model_name}] CV PR-AUC={cv_stats['cv_pr_auc_mean']:.4f} (+/- {cv_stats['cv_pr_auc_std']:.4f}) | "
+                f"CV ROC-AUC={cv_stats['cv_roc_auc_mean']:.4f} | CV F1={cv_stats['cv_f1_mean']:.4f}"
+            )
+    except Exception as ex:
+        message = f"{model_name} CV on {feature_set_name}: {str(ex)[:120]}"
+        log(f'[{model_name}] CV failed - {message}')
+        outcome['skipped'].append(message)
+
+    try:
+        # Fresh estimator per feature set so trained_models entries stay independent
+        if data['use_compression']:
+            log(f'[{model_name}] Fitting on {len(fit_idx):,} weighted rows; testing on {len(test_codes):,} rows')
+            fitted_model = adapt_for_weighted_rows(model, fit_y, fit_w)
+            fitted_model.fit(X_unique_use[fit_idx], fit_y, sample_weight=fit_w)
+            y_pred, y_proba = predict_expanded(fitted_model, X_unique_use, test_codes)
+        else:
+            log(f'[{model_name}] Fitting on {len(X_train_fit):,} rows; testing on {len(X_test_use):,} rows')
+            fitted_model = clone_estimator(model)
+            fitted_model.fit(X_train_fit, y_train_fit)
+            y_pred = fitted_model.predict(X_test_use)
+            y_proba = fitted_model.predict_proba(X_test_use)[:, 1]
+    except Exception as ex:
+        message = f"{model_name} on {feature_set_name}: {str(ex)[:120]}"
+        log(f'[{model_name}] Failed - {message}')
+        outcome['skipped'].append(message)
+        outcome['elapsed'] = time.perf_counter() - start
+        return outcome
+
+    accuracy_value = accuracy_score(y_test, y_pred)
+    f1_value = f1_score(y_test, y_pred, zero_division=0)
+    pr_auc_value = average_precision_score(y_test, y_proba)
+    roc_auc_value = roc_auc_score(y_test, y_proba)
+
+    row_result = {
+        'feature_set': feature_set_name,
+        'model': model_name,
+        'accuracy': accuracy_value,
+        'f1': f1_value,
+        'pr_auc': pr_auc_value,
+        'roc_auc': roc_auc_value,
+    }
+    row_result.update({col: np.nan for col in CV_RESULT_COLUMNS})
+    if cv_stats is not None:
+        row_result.update(cv_stats)
+
+    outcome['result'] = row_result
+    outcome['pipeline'] = {
+        'model': fitted_model,
+        'scaler': scaler if use_scaled else None,
+        'features': cols,
+    }
+
+    log(
+        f'[{model_name}] Done | holdout accuracy={accuracy_value:.4f} | '
+        f'holdout f1={f1_value:.4f} | holdout pr_auc={pr_auc_value:.4f} | holdout roc_auc={roc_auc_value:.4f}'
+    )
+    outcome['elapsed'] = time.perf_counter() - start
+    return outcome
+
+
+def merge_outcome(outcome: dict, results: list, trained_models: dict, skipped_runs: list,
+                  cv_oof: dict | None = None) -> None:
+    """
+    Append one experiment outcome to the notebook's results / trained_models /
+    skipped_runs, and its out-of-fold probabilities to cv_oof when given.
+    """
+    skipped_runs.extend(outcome['skipped'])
+    if outcome['result'] is not None:
+        results.append(outcome['result'])
+        trained_models[(outcome['feature_set'], outcome['model'])] = outcome['pipeline']
+        if cv_oof is not None and outcome.get('oof_proba') is not None:
+            cv_oof[(outcome['feature_set'], outcome['model'])] = outcome['oof_proba']
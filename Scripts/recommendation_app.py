@@ -0,0 +1,56 @@
+"""
+Crop Recommendation App
+=======================
+Thin Streamlit front end over recommendation_service.RecommendationService.
+The service (ensemble + lookup tables) is created once per server process;
+each selection is a cached recommend() call.
+
+Usage:
+    streamlit run "Scripts/recommendation_app.py"
+"""
+
+import pandas as pd
+import streamlit as st
+
+from recommendation_service import RecommendationService
+
+
+@st.cache_resource
+def get_service() -> RecommendationService:
+    return RecommendationService()
+
+
+def main():
+    st.set_page_config(page_title="Crop Recommendations", layout="wide")
+    st.title("Crop Recommendations")
+
+    service = get_service()
+    blocks = service.tables['blocks']
+    districts = sorted({district for district, _ in blocks})
+
+    district = st.sidebar.selectbox("District", districts,
+                                    index=districts.index('Thanjavur') if 'Thanjavur' in districts else 0)
+    block_options = ['(whole district)'] + [block for d, block in blocks if d == district]
+    block = st.sidebar.selectbox("Block", block_options)
+    n_crops = len(service.tables['crops'])
+    top_n = st.sidebar.slider("Crops per ranking", 1, n_crops, min(10, n_crops))
+
+    response = service.recommend(district, None if block == '(whole district)' else block, top_n=top_n)
+    st.caption(f"Model run {response['model_version']} | data {response['data_version'][:12]} | "
+               f"soil: {response['source']['soil']} | weather: {response['source']['weather']}")
+
+    performance_col, yield_col, profit_col = st.columns(3)
+    with performance_col:
+        st.subheader("High-performance probability")
+        st.dataframe(pd.DataFrame(response['performance']), hide_index=True)
+    with yield_col:
+        st.subheader("Yield potential")
+        st.dataframe(pd.DataFrame(response['yield'])[['Crop', 'Yield_Combined_Score', 'yield_median']],
+                     hide_index=True)
+    with profit_col:
+        st.subheader("Profit proxy")
+        st.dataframe(pd.DataFrame(response['profit'])[['Crop', 'Profit_Proxy_Score', 'Avg_Price']],
+                     hide_index=True)
+
+
+main()
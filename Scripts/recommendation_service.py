@@ -0,0 +1,566 @@
+"""
+Crop Recommendation Service
+===========================
+Serves the three rankings of the notebook's prediction cell for any
+(district, block) without re-running the notebook:
+
+    1. performance - ensemble high-performance probability per crop
+    2. yield       - historical yield / area potential (0-100)
+    3. profit      - price x yield market proxy (0-100)
+
+At startup the service
+    - loads the latest ensemble from the model registry (model_registry.py) once,
+    - builds lookup tables: soil and weather vectors per block (with district
+      and Thanjavur fallbacks, as in feature_builder.py), requirement and
+      area/yield vectors per crop, and the crop-level yield / profit tables,
+    - scores every known block x crop in one pass per ensemble member.
+
+A request is then a dictionary lookup plus a small sort; responses sit in an
+LRU cache keyed by (district, block, top_n). The model version (registry run
+id) and data version (feature_cache_key over the inputs) are re-checked every
+few seconds with a stat() of the inputs; when either changes, tables are
+rebuilt and the cache is cleared.
+
+    service = RecommendationService()
+    service.recommend('Thanjavur', 'Budalur', top_n=10)
+
+Usage:
+    python "Scripts/recommendation_service.py" --district Thanjavur --block Budalur
+    python "Scripts/recommendation_service.py" --serve --port 8601      # GET /recommend?district=..&block=..
+    python "Scripts/recommendation_service.py" --benchmark 10000        # p50 / p99 latency
+    streamlit run "Scripts/recommendation_app.py"                       # browser front end
+"""
+
+import json
+import time
+import argparse
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from compressed_dataset import compress_rows, predict_proba_expanded
+from feature_builder import (
+    AREA_YIELD_COLUMNS,
+    AREA_YIELD_FEATURE_NAMES,
+    PRICE_COLUMN,
+    REQUIREMENT_COLUMNS,
+    REQUIREMENT_FEATURE_NAMES,
+    base_crop_name,
+    default_lookup_values,
+    normalize_crop_name,
+)
+from feature_cache import feature_cache_key
+from geocode_cache import normalize_part
+from market_store import MANIFEST_NAME, STORE_PATH as MARKET_STORE_PATH, read_market
+from model_registry import LATEST_NAME, REGISTRY_PATH, latest_run_id, load_ensemble_members
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "Data"
+SOIL_CSV_DIR = DATA_PATH / "Soil Data ( District Wise)" / "CSV Format"
+WEATHER_FILE = DATA_PATH / "Weather Data (District Wise)" / "weather_data_all_blocks.csv"
+REQUIREMENTS_FILE = DATA_PATH / "crop_requirements.csv"
+AREA_YIELD_FILE = DATA_PATH / "Crop Area And Yield Data.csv"
+FALLBACK_DISTRICT = "THANJAVUR"
+SERVICE_VERSION = "1"
+SERVICE_PORT = 8601    # Streamlit's default is 8501, so the API and the app can run side by side
+
+SOIL_FEATURE_COLUMNS = [
+    'n_High', 'n_Medium', 'n_Low',
+    'p_High', 'p_Medium', 'p_Low',
+    'k_High', 'k_Medium', 'k_Low',
+    'pH_Neutral', 'pH_Acidic', 'pH_Alkaline',
+    'EC_Saline', 'EC_NonSaline',
+    'OC_High', 'OC_Medium', 'OC_Low',
+]
+WEATHER_FEATURE_COLUMNS = [
+    'temp_max_mean', 'temp_min_mean', 'temp_mean_annual',
+    'total_rainfall_mm', 'avg_daily_rainfall_mm',
+    'humidity_max_mean', 'humidity_min_mean',
+    'rainy_days', 'wind_speed_max_mean',
+]
+FEATURE_NAMES = SOIL_FEATURE_COLUMNS + WEATHER_FEATURE_COLUMNS + REQUIREMENT_FEATURE_NAMES + AREA_YIELD_FEATURE_NAMES
+
+
+# ============================================================================
+# 1. LOOKUP TABLES
+# ============================================================================
+def input_files(data_path: Path = DATA_PATH) -> list[Path]:
+    """Files whose contents feed the lookup tables (market store handled separately)."""
+    data_path = Path(data_path)
+    soil_dir = data_path / SOIL_CSV_DIR.relative_to(DATA_PATH)
+    return [*sorted(soil_dir.glob('*.csv')),
+            data_path / WEATHER_FILE.relative_to(DATA_PATH),
+            data_path / REQUIREMENTS_FILE.relative_to(DATA_PATH),
+            data_path / AREA_YIELD_FILE.relative_to(DATA_PATH)]
+
+
+def _mean_vectors(df: pd.DataFrame, keys: list[str], columns: list[str]) -> dict:
+    """{normalized key tuple: float64 vector} of per-group column means."""
+    grouped = df.groupby(keys)[columns].mean()
+    return {tuple(normalize_part(part) for part in (idx if isinstance(idx, tuple) else (idx,))): row.to_numpy('float64')
+            for idx, row in grouped.iterrows()}
+
+
+def crop_feature_table(crops: list[str], requirements_lookup: pd.DataFrame, area_yield_lookup: pd.DataFrame,
+                       default_req: pd.Series, default_area_yield: pd.Series) -> np.ndarray:
+    """Requirement + area/yield features per crop (n_crops x 8), with feature_builder's fallbacks."""
+    crop_features = np.empty((len(crops), len(REQUIREMENT_COLUMNS) + len(AREA_YIELD_COLUMNS)), dtype='float64')
+    for i, crop in enumerate(crops):
+        crop_key = normalize_crop_name(crop)
+        req_values = requirements_lookup.loc[crop_key] if crop_key in requirements_lookup.index else default_req
+        ay_values = area_yield_lookup.loc[crop_key] if crop_key in area_yield_lookup.index else default_area_yield
+        crop_features[i] = [float(req_values[col]) for col in REQUIREMENT_COLUMNS] + [
+            float(ay_values[col]) if not pd.isna(ay_values[col]) else float(default_area_yield[col])
+            for col in AREA_YIELD_COLUMNS
+        ]
+    return crop_features
+
+
+def load_lookup_tables(data_path: Path = DATA_PATH, market_store_dir: Path = MARKET_STORE_PATH) -> dict:
+    """
+    Precompute everything a recommendation needs except the model.
+
+    Returns:
+        Dict with soil_block / soil_district / weather_block / weather_district
+        vectors (keys normalized with geocode_cache.normalize_part), the
+        fallback soil and weather vectors the notebook trains on, blocks
+        (sorted (district, block) display names), crops (market crop names),
+        crop_features (one 8-wide requirement + area/yield row per crop),
+        crop_names (display name per normalized key across market,
+        requirements and area/yield crops), the requirement / area-yield
+        lookups and defaults, yield_rank, profit_rank and data_version.
+    """
+    data_path = Path(data_path)
+    files = input_files(data_path)
+    soil_files, weather_file, requirements_file, area_yield_file = files[:-3], files[-3], files[-2], files[-1]
+
+    soil = pd.concat((pd.read_csv(f) for f in soil_files), ignore_index=True)
+    weather = pd.read_csv(weather_file)
+    soil_block = _mean_vectors(soil, ['District', 'Block'], SOIL_FEATURE_COLUMNS)
+    soil_district = {key[0]: value for key, value in _mean_vectors(soil, ['District'], SOIL_FEATURE_COLUMNS).items()}
+    weather_block = _mean_vectors(weather, ['district', 'block'], WEATHER_FEATURE_COLUMNS)
+    weather_district = {key[0]: value for key, value in
+                        _mean_vectors(weather, ['district'], WEATHER_FEATURE_COLUMNS).items()}
+    fallback_key = normalize_part(FALLBACK_DISTRICT)
+
+    # Weather files use title case ('Thanjavur'); their names override the soil CSVs' upper case
+    district_names = {}
+    block_names = {}
+    for district, block in [*zip(soil['District'], soil['Block']), *zip(weather['district'], weather['block'])]:
+        key = (normalize_part(district), normalize_part(block))
+        district_names[key[0]] = str(district).strip()
+        block_names[key] = str(block).strip()
+    display = {key: (district_names[key[0]], name) for key, name in block_names.items()}
+
+    # Crop-level tables, built the way the notebook's preprocessing and ranking cells do
+    crop_requirements_df = pd.read_csv(requirements_file)
+    crop_requirements_df['crop_key'] = crop_requirements_df['Crop'].apply(normalize_crop_name)
+    req_level_map = {'low': 1, 'medium': 2, 'high': 3}
+    for col in ['N_Req', 'P_Req', 'K_Req']:
+        crop_requirements_df[f'{col}_level'] = (
+            crop_requirements_df[col].astype(str).str.strip().str.lower().map(req_level_map).fillna(2)
+        )
+    area_yield_df = pd.read_csv(area_yield_file)
+    area_yield_df['crop_key'] = area_yield_df['Crop'].apply(normalize_crop_name)
+    area_yield_df['Area Under'] = pd.to_numeric(area_yield_df['Area Under'], errors='coerce')
+    area_yield_df['Yield'] = pd.to_numeric(area_yield_df['Yield'], errors='coerce')
+    crop_area_yield_agg = (
+        area_yield_df.groupby('crop_key')[['Area Under', 'Yield']]
+        .median()
+        .rename(columns={'Area Under': 'area_median', 'Yield': 'yield_median'})
+        .reset_index()
+    )
+    crop_area_yield_agg['yield_per_area'] = (
+        crop_area_yield_agg['yield_median'] / crop_area_yield_agg['area_median'].replace(0, np.nan)
+    ).replace([np.inf, -np.inf], np.nan)
+
+    requirements_lookup = crop_requirements_df.set_index('crop_key')[REQUIREMENT_COLUMNS]
+    area_yield_lookup = crop_area_yield_agg.set_index('crop_key')[AREA_YIELD_COLUMNS]
+    default_req, default_area_yield = default_lookup_values(crop_requirements_df, crop_area_yield_agg)
+
+    market = read_market(columns=['crop', PRICE_COLUMN], store_dir=market_store_dir)
+    market['Crop'] = market['crop'].astype(str).map(base_crop_name)
+    crops = sorted(market['Crop'].unique())
+
+    # Display name per crop key: market name first, then requirements, then area/yield
+    crop_names = {}
+    for names in (crops, crop_requirements_df['Crop'], area_yield_df['Crop']):
+        for name in names:
+            if not pd.isna(name) and str(name).strip():
+                crop_names.setdefault(normalize_crop_name(name), str(name).strip())
+
+    yield_rank = crop_area_yield_agg.copy()
+    yield_rank['Crop'] = yield_rank['crop_key']
+    yield_rank = yield_rank[['Crop', 'area_median', 'yield_median', 'yield_per_area']].copy()
+    yield_rank['Yield_Potential'] = (yield_rank['yield_median'].rank() / len(yield_rank)) * 100
+    yield_rank['Area_Potential'] = (yield_rank['area_median'].rank() / len(yield_rank)) * 100
+    yield_rank['Yield_Combined_Score'] = (0.7 * yield_rank['Yield_Potential'] + 0.3 * yield_rank['Area_Potential'])
+    yield_rank = yield_rank.sort_values('Yield_Combined_Score', ascending=False).reset_index(drop=True)
+
+    prices = market.assign(price=pd.to_numeric(market[PRICE_COLUMN], errors='coerce')).dropna(subset=['price'])
+    profit_rank = prices.groupby('Crop', sort=True)['price'].agg(
+        Avg_Price='mean', Median_Price='median', Price_Std='std', Records='size'
+    ).reset_index()
+    yield_by_key = crop_area_yield_agg.set_index('crop_key')['yield_median']
+    profit_rank['Yield_Median'] = profit_rank['Crop'].map(normalize_crop_name).map(yield_by_key)
+    profit_rank['Gross_Revenue_Proxy'] = profit_rank['Avg_Price'] * profit_rank['Yield_Median']
+    profit_rank['Profit_Proxy_Score'] = (profit_rank['Gross_Revenue_Proxy'].rank() / len(profit_rank)) * 100
+    profit_rank = profit_rank.sort_values('Profit_Proxy_Score', ascending=False).reset_index(drop=True)
+
+    return {
+        'soil_block': soil_block,
+        'soil_district': soil_district,
+        'weather_block': weather_block,
+        'weather_district': weather_district,
+        'soil_fallback': soil_district[fallback_key],
+        'weather_fallback': weather_district[fallback_key],
+        'blocks': sorted(display.values()),
+        'block_keys': {display[key]: key for key in display},
+        'crops': crops,
+        'crop_features': crop_feature_table(crops, requirements_lookup, area_yield_lookup,
+                                            default_req, default_area_yield),
+        'crop_names': crop_names,
+        'requirements_lookup': requirements_lookup,
+        'area_yield_lookup': area_yield_lookup,
+        'default_req': default_req,
+        'default_area_yield': default_area_yield,
+        'yield_rank': yield_rank,
+        'profit_rank': profit_rank,
+        'data_version': feature_cache_key(files, market_store_dir=market_store_dir,
+                                          params={'service': SERVICE_VERSION}),
+    }
+
+
+def block_vectors(tables: dict, district: str, block: str | None) -> tuple[np.ndarray, np.ndarray, dict]:
+    """
+    Soil and weather vectors for a block, falling back to the district mean
+    and then to the training (Thanjavur) vectors.
+
+    Returns:
+        (soil, weather, source) where source says which level each came from.
+
+    Raises:
+        KeyError: the district is in neither the soil nor the weather data.
+    """
+    district_key = normalize_part(district)
+    if district_key not in tables['soil_district'] and district_key not in tables['weather_district']:
+        raise KeyError(f"Unknown district: {district}")
+    key = (district_key, normalize_part(block)) if block else None
+
+    def pick(kind):
+        if key in tables[f'{kind}_block']:
+            return tables[f'{kind}_block'][key], 'block'
+        if district_key in tables[f'{kind}_district']:
+            return tables[f'{kind}_district'][district_key], 'district'
+        return tables[f'{kind}_fallback'], 'fallback'
+
+    soil, soil_source = pick('soil')
+    weather, weather_source = pick('weather')
+    return soil, weather, {'soil': soil_source, 'weather': weather_source}
+
+
+def feature_frame(tables: dict, vectors: list[tuple[np.ndarray, np.ndarray]],
+                  crop_features: np.ndarray | None = None) -> pd.DataFrame:
+    """Feature rows for every (soil, weather) pair x every crop, in FEATURE_NAMES order."""
+    if crop_features is None:
+        crop_features = tables['crop_features']
+    n_crops = len(crop_features)
+    X = np.empty((len(vectors) * n_crops, len(FEATURE_NAMES)), dtype='float64')
+    n_soil, n_weather = len(SOIL_FEATURE_COLUMNS), len(WEATHER_FEATURE_COLUMNS)
+    for i, (soil, weather) in enumerate(vectors):
+        rows = slice(i * n_crops, (i + 1) * n_crops)
+        X[rows, :n_soil] = soil
+        X[rows, n_soil:n_soil + n_weather] = weather
+        X[rows, n_soil + n_weather:] = crop_features
+    return pd.DataFrame(X, columns=FEATURE_NAMES, copy=False)
+
+
+def ensemble_probability(ensemble_members: dict, features: pd.DataFrame) -> np.ndarray:
+    """Mean positive-class probability of the ensemble, each distinct row scored once per member."""
+    parts = []
+    for member in ensemble_members.values():
+        X_member_unique, member_codes = compress_rows(features[member['features']].to_numpy('float64'))
+        if member['scaler'] is not None:
+            X_member_unique = member['scaler'].transform(X_member_unique)
+        parts.append(predict_proba_expanded(member['model'], X_member_unique, member_codes))
+    if not parts:
+        raise ValueError('No ensemble members available.')
+    return np.mean(np.vstack(parts), axis=0)
+
+
+def _records(df: pd.DataFrame) -> list[dict]:
+    """JSON-ready rows (NaN -> None, numpy scalars -> Python)."""
+    return [{key: (None if pd.isna(value) else value.item() if isinstance(value, np.generic) else value)
+             for key, value in row.items()} for row in df.to_dict('records')]
+
+
+# ============================================================================
+# 2. SERVICE
+# ============================================================================
+class RecommendationService:
+    """In-process scorer: warm ensemble, precomputed block probabilities and an LRU response cache."""
+
+    def __init__(self, data_path: Path = DATA_PATH, registry_dir: Path = REGISTRY_PATH,
+                 market_store_dir: Path = MARKET_STORE_PATH, run_id: str | None = None,
+                 cache_size: int = 4096, check_interval: float = 5.0):
+        self.data_path = Path(data_path)
+        self.registry_dir = Path(registry_dir)
+        self.market_store_dir = Path(market_store_dir)
+        self.pinned_run_id = run_id
+        self.cache_size = cache_size
+        self.check_interval = check_interval
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self._cache = OrderedDict()
+        self.load()
+
+    # -- versions -----------------------------------------------------------
+    def _watched_files(self) -> list[Path]:
+        return [*input_files(self.data_path), self.market_store_dir / MANIFEST_NAME,
+                self.registry_dir / LATEST_NAME]
+
+    def _stat_signature(self) -> tuple:
+        signature = []
+        for path in self._watched_files():
+            try:
+                stat = path.stat()
+                signature.append((str(path), stat.st_size, stat.st_mtime_ns))
+            except FileNotFoundError:
+                signature.append((str(path), None, None))
+        return tuple(signature)
+
+    def load(self) -> None:
+        """(Re)load the ensemble and lookup tables, score every known block and clear the cache."""
+        with self._lock:
+            start = time.perf_counter()
+            run_id = self.pinned_run_id or latest_run_id(self.registry_dir)
+            members = load_ensemble_members(run_id, self.registry_dir)
+            tables = load_lookup_tables(self.data_path, self.market_store_dir)
+
+            blocks = tables['blocks']
+            vectors = [block_vectors(tables, district, block)[:2] for district, block in blocks]
+            proba = ensemble_probability(members, feature_frame(tables, vectors)).reshape(len(blocks), -1)
+
+            self.ensemble_members = members
+            self.tables = tables
+            self.model_version = run_id
+            self.data_version = tables['data_version']
+            self._block_proba = {tables['block_keys'][name]: row for name, row in zip(blocks, proba)}
+            self._yield_records = _records(tables['yield_rank'])
+            self._profit_records = _records(tables['profit_rank'])
+            self._cache.clear()
+            self._signature = self._stat_signature()
+            self._last_check = time.monotonic()
+            self.load_seconds = time.perf_counter() - start
+
+    def check_versions(self, force: bool = False) -> bool:
+        """Reload when the registry's latest run or any input file changed; True if reloaded."""
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return False
+        with self._lock:
+            self._last_check = now
+            signature = self._stat_signature()
+            if signature == self._signature:
+                return False
+            # A touched file only counts when its contents or the run id really changed
+            self._signature = signature
+            run_id = self.pinned_run_id or latest_run_id(self.registry_dir)
+            data_version = feature_cache_key(input_files(self.data_path), market_store_dir=self.market_store_dir,
+                                             params={'service': SERVICE_VERSION})
+            if run_id == self.model_version and data_version == self.data_version:
+                return False
+            self.load()
+            return True
+
+    # -- scoring ------------------------------------------------------------
+    def _probabilities(self, district: str, block: str | None) -> tuple[np.ndarray, dict]:
+        soil, weather, source = block_vectors(self.tables, district, block)
+        key = (normalize_part(district), normalize_part(block)) if block else None
+        if key in self._block_proba:
+            return self._block_proba[key], source
+        proba = ensemble_probability(self.ensemble_members, feature_frame(self.tables, [(soil, weather)]))
+        return proba, source
+
+    def recommend(self, district: str, block: str | None = None, top_n: int | None = 10) -> dict:
+        """
+        All three rankings for a block (or a whole district when block is None).
+
+        Returns:
+            Dict with district, block, model_version, data_version, source
+            (soil / weather level used), performance, yield and profit record
+            lists (top_n each, None for all) and cached.
+        """
+        self.check_versions()
+        cache_key = (normalize_part(district), normalize_part(block) if block else None, top_n)
+        with self._lock:
+            response = self._cache.get(cache_key)
+            if response is not None:
+                self._cache.move_to_end(cache_key)
+                self.hits += 1
+                return {**response, 'cached': True}
+            self.misses += 1
+
+        proba, source = self._probabilities(district, block)
+        order = np.argsort(-proba, kind='stable')[:top_n]
+        crops = self.tables['crops']
+        response = {
+            'district': district,
+            'block': block,
+            'model_version': self.model_version,
+            'data_version': self.data_version,
+            'source': source,
+            'performance': [{'Crop': crops[i], 'High_Performance_Prob': float(proba[i])} for i in order],
+            'yield': self._yield_records[:top_n],
+            'profit': self._profit_records[:top_n],
+        }
+        with self._lock:
+            self._cache[cache_key] = response
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return {**response, 'cached': False}
+
+    def health(self) -> dict:
+        return {
+            'model_version': self.model_version,
+            'data_version': self.data_version,
+            'ensemble_members': list(self.ensemble_members),
+            'blocks': len(self._block_proba),
+            'crops': len(self.tables['crops']),
+            'cache_entries': len(self._cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'load_seconds': round(self.load_seconds, 3),
+        }
+
+
+# ============================================================================
+# 3. HTTP FRONT END
+# ============================================================================
+def make_handler(service: RecommendationService):
+    """Request handler class bound to one service instance."""
+
+    class RecommendationHandler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload: dict) -> None:
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            if url.path == '/health':
+                self._send(200, service.health())
+            elif url.path == '/blocks':
+                self._send(200, {'blocks': [list(pair) for pair in service.tables['blocks']]})
+            elif url.path == '/recommend':
+                if 'district' not in query:
+                    self._send(400, {'error': "missing 'district'"})
+                    return
+                try:
+                    top_n = int(query['top']) if 'top' in query else 10
+                    self._send(200, service.recommend(query['district'], query.get('block'), top_n=top_n))
+                except KeyError as ex:
+                    self._send(404, {'error': str(ex).strip("'\"")})
+                except ValueError as ex:
+                    self._send(400, {'error': str(ex)})
+            else:
+                self._send(404, {'error': f'unknown path {url.path}'})
+
+        def log_message(self, format, *args):
+            pass
+
+    return RecommendationHandler
+
+
+def serve(service: RecommendationService, host: str = '127.0.0.1', port: int = SERVICE_PORT) -> None:
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"✓ Serving recommendations on http://{host}:{port}/recommend?district=...&block=...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# ============================================================================
+# 4. CLI
+# ============================================================================
+def benchmark(service: RecommendationService, n_requests: int = 10000, random_state: int = 42) -> dict:
+    """Latency (ms) of recommend() over random known blocks: cold (cache cleared) and warm."""
+    rng = np.random.default_rng(random_state)
+    blocks = service.tables['blocks']
+    picks = rng.integers(0, len(blocks), n_requests)
+    timings = {}
+    for label in ('cold', 'warm'):
+        if label == 'cold':
+            with service._lock:
+                service._cache.clear()
+        samples = np.empty(n_requests)
+        for i, pick in enumerate(picks):
+            district, block = blocks[pick]
+            start = time.perf_counter()
+            service.recommend(district, block)
+            samples[i] = (time.perf_counter() - start) * 1000
+            if label == 'cold':
+                with service._lock:
+                    service._cache.clear()
+        timings[label] = {'p50': float(np.percentile(samples, 50)), 'p99': float(np.percentile(samples, 99)),
+                          'max': float(samples.max())}
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve crop recommendations from the saved ensemble")
+    parser.add_argument("--data-path", default=str(DATA_PATH), help="Project Data folder")
+    parser.add_argument("--registry", default=str(REGISTRY_PATH), help="Model registry folder")
+    parser.add_argument("--market-store", default=str(MARKET_STORE_PATH), help="Market store folder")
+    parser.add_argument("--run", default=None, help="Registry run id (default: latest, followed on change)")
+    parser.add_argument("--district", help="Print recommendations for this district")
+    parser.add_argument("--block", help="Block within --district")
+    parser.add_argument("--top", type=int, default=10, help="Rows per ranking")
+    parser.add_argument("--serve", action="store_true", help="Run the local HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--benchmark", type=int, metavar="N", help="Time N recommend() calls")
+    args = parser.parse_args()
+
+    service = RecommendationService(Path(args.data_path), Path(args.registry), Path(args.market_store),
+                                    run_id=args.run)
+    info = service.health()
+    print(f"✓ Loaded run {info['model_version']} ({', '.join(info['ensemble_members'])}) | "
+          f"{info['blocks']} blocks x {info['crops']} crops pre-scored in {info['load_seconds']:.2f}s")
+
+    if args.district:
+        # Same errors the HTTP handler maps to 404 / 400
+        try:
+            response = service.recommend(args.district, args.block, top_n=args.top)
+        except (KeyError, ValueError) as ex:
+            print(f"✘ {ex.args[0] if ex.args else ex}")
+            raise SystemExit(1)
+        print(f"\n{args.district} / {args.block or '(district)'}  (soil: {response['source']['soil']}, "
+              f"weather: {response['source']['weather']})")
+        for name in ('performance', 'yield', 'profit'):
+            print(f"\n{name.upper()}")
+            print(pd.DataFrame(response[name]).to_string(index=False))
+
+    if args.benchmark:
+        timings = benchmark(service, args.benchmark)
+        for label, stats in timings.items():
+            print(f"   {label:>4}: p50 {stats['p50']:.3f} ms | p99 {stats['p99']:.3f} ms | max {stats['max']:.3f} ms")
+
+    if args.serve:
+        serve(service, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,489 @@
+"""
+Time-Window Validation
+======================
+Rolling / expanding-window validation over the market Price Date, as a
+temporal counterpart to the stratified holdout and CV of model_training.py.
+
+Transactions are grouped into calendar periods (years by default); each
+window trains on earlier periods and scores the next one:
+
+    expanding - train on every period before the test period
+    rolling   - train on the last train_periods periods before it
+
+Instead of refitting every model from scratch per window, models grow from
+the previous window's fit:
+
+    warm_start - RandomForest / ExtraTrees keep their trees and add
+                 grow_fraction x n_estimators new ones (rolling forests drop
+                 their oldest trees to stay at n_estimators)
+    init_model - LightGBM / XGBoost / CatBoost continue boosting from the
+                 previous booster for grow_fraction x n_estimators rounds
+    refit      - everything else: GradientBoosting (a warm start keeps the
+                 first window's init_ prior and trailed a refit badly),
+                 LogisticRegression and SVM (cheap, and their scaler is refit
+                 per window anyway)
+
+Boosting stages cannot be retired, so a grown booster would keep fitting on
+periods that have left a rolling window; in rolling mode the init_model
+boosters therefore refit per window ('refit (rolling)' in the update column)
+and only forests grow. Feature sets that are constant over every
+transaction are skipped, as train_experiment() does.
+
+The first window is always a full fit. A grown model is ~2-3x cheaper per
+window than a refit of the same size; under strong label drift a booster
+that only adds a quarter of its rounds can trail the refit, which
+compare_refit reports side by side (refit_pr_auc). Rows come from the same
+prepare_training_data() bundle as the leaderboard (compressed weighted rows
+or full matrices), so per-window results use the leaderboard's columns
+(feature_set, model, accuracy, f1, pr_auc, roc_auc) plus the window.
+
+    dates = transaction_dates(crop_data_dict)
+    run = run_time_validation(jobs, training_data, y, dates, mode='expanding')
+    print(pd.DataFrame(run['results']))
+
+Usage:
+    python "Scripts/time_validation.py"                          # expanding windows, RF + GB on Data/
+    python "Scripts/time_validation.py" --mode rolling --compare-refit
+"""
+
+import time
+import argparse
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, f1_score, average_precision_score, roc_auc_score
+from sklearn.preprocessing import StandardScaler
+
+from compressed_dataset import weighted_rows, predict_expanded, adapt_for_weighted_rows, clone_estimator
+from feature_builder import DATA_PATH
+from market_store import DATE_COLUMN
+from model_training import SCALED_MODELS
+
+WINDOW_MODES = ('expanding', 'rolling')
+N_WINDOWS = 4
+TRAIN_PERIODS = 3
+PERIOD_FREQ = 'Y'
+GROW_FRACTION = 0.25
+# CatBoost only reports explicitly-set params; this is its default iteration count
+CATBOOST_DEFAULT_ITERATIONS = 1000
+
+
+# ============================================================================
+# 1. WINDOWS
+# ============================================================================
+def transaction_dates(crop_data_dict: dict) -> pd.Series:
+    """
+    Price Date per transaction, aligned with build_transaction_features() rows
+    (crop files in dict order, market rows in file order).
+    """
+    parts = [pd.to_datetime(crop_df[DATE_COLUMN], errors='coerce') for crop_df in crop_data_dict.values()]
+    if not parts:
+        return pd.Series([], dtype='datetime64[ns]')
+    return pd.concat(parts, ignore_index=True)
+
+
+def time_windows(dates, n_windows: int = N_WINDOWS, mode: str = 'expanding',
+                 train_periods: int = TRAIN_PERIODS, freq: str = PERIOD_FREQ) -> list:
+    """
+    Split transactions into consecutive train/test windows by calendar period.
+
+    Args:
+        dates         : Per-transaction dates (NaT rows belong to no window).
+        n_windows     : Number of test periods (the last n periods).
+        mode          : 'expanding' or 'rolling'.
+        train_periods : Periods per rolling training window.
+        freq          : pandas period alias ('Y' years, 'Q' quarters, 'M' months).
+
+    Returns:
+        List of dicts with window, train_start, train_end, test_period,
+        train_idx and test_idx (transaction indices).
+    """
+    if mode not in WINDOW_MODES:
+        raise ValueError(f"mode must be one of {WINDOW_MODES}, got {mode!r}")
+    periods = pd.Series(pd.to_datetime(pd.Series(dates), errors='coerce')).dt.to_period(freq)
+    codes, uniques = pd.factorize(periods, sort=True)
+    n_periods = len(uniques)
+    if n_periods < 2:
+        raise ValueError(f"Need at least two {freq} periods of Price Date, found {n_periods}")
+
+    windows = []
+    for test_period in range(max(1, n_periods - n_windows), n_periods):
+        first = 0 if mode == 'expanding' else max(0, test_period - train_periods)
+        windows.append({
+            'window': len(windows),
+            'train_start': str(uniques[first]),
+            'train_end': str(uniques[test_period - 1]),
+            'test_period': str(uniques[test_period]),
+            'train_idx': np.flatnonzero((codes >= first) & (codes < test_period)),
+            'test_idx': np.flatnonzero(codes == test_period),
+        })
+    return windows
+
+
+# ============================================================================
+# 2. INCREMENTAL UPDATES
+# ============================================================================
+def update_kind(model) -> str:
+    """How a model moves to the next window: 'warm_start' (forests), 'init_model' or 'refit'."""
+    name = type(model).__name__
+    params = model.get_params()
+    if name in ('LGBMClassifier', 'XGBClassifier', 'CatBoostClassifier'):
+        return 'init_model'
+    # GradientBoosting also has warm_start, but its stages stay tied to the first init_ prior
+    if 'warm_start' in params and 'bootstrap' in params:
+        return 'warm_start'
+    return 'refit'
+
+
+def _size_param(model) -> tuple[str, int]:
+    """(parameter, value) holding the number of trees / boosting rounds."""
+    if type(model).__name__ == 'CatBoostClassifier':
+        return 'iterations', int(model.get_params().get('iterations') or CATBOOST_DEFAULT_ITERATIONS)
+    return 'n_estimators', int(model.get_params()['n_estimators'])
+
+
+def _fresh_model(model_name, template, fit_y, fit_w):
+    # Same estimator train_experiment() would fit on these rows
+    model = adapt_for_weighted_rows(template, fit_y, fit_w) if fit_w is not None else clone_estimator(template)
+    if model_name == 'CatBoost':
+        model.set_params(verbose=False, allow_writing_files=False)
+    return model
+
+
+def _fit(model, X_fit, fit_y, fit_w, **fit_kwargs):
+    if fit_w is None:
+        return model.fit(X_fit, fit_y, **fit_kwargs)
+    return model.fit(X_fit, fit_y, sample_weight=fit_w, **fit_kwargs)
+
+
+def grow_model(model_name, template, previous, kind: str, n_new: int, X_fit, fit_y, fit_w,
+               max_estimators: int | None = None):
+    """
+    Fit the next window's model, continuing from previous when the kind allows it.
+
+    Args:
+        template       : Unfitted notebook estimator (never mutated).
+        previous       : Model fitted on the previous window, or None.
+        kind           : Output of update_kind(template).
+        n_new          : Trees / boosting rounds added to previous.
+        max_estimators : Forests drop their oldest trees beyond this.
+
+    Returns:
+        The fitted model (previous itself for warm_start, a new object otherwise).
+    """
+    fresh = _fresh_model(model_name, template, fit_y, fit_w)
+    if previous is None or kind == 'refit':
+        if kind == 'warm_start':
+            fresh.set_params(warm_start=True)
+        return _fit(fresh, X_fit, fit_y, fit_w)
+
+    if kind == 'warm_start':
+        # Class weights follow the current window's label balance
+        if 'class_weight' in fresh.get_params():
+            previous.set_params(class_weight=fresh.get_params()['class_weight'])
+        # Forests can retire their oldest trees
+        if max_estimators is not None and len(previous.estimators_) + n_new > max_estimators:
+            previous.estimators_ = previous.estimators_[len(previous.estimators_) + n_new - max_estimators:]
+        previous.set_params(n_estimators=len(previous.estimators_) + n_new)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            return _fit(previous, X_fit, fit_y, fit_w)
+
+    size_param, _ = _size_param(fresh)
+    fresh.set_params(**{size_param: n_new})
+    if type(fresh).__name__ == 'XGBClassifier':
+        return _fit(fresh, X_fit, fit_y, fit_w, xgb_model=previous.get_booster())
+    if type(fresh).__name__ == 'LGBMClassifier':
+        return _fit(fresh, X_fit, fit_y, fit_w, init_model=previous.booster_)
+    return _fit(fresh, X_fit, fit_y, fit_w, init_model=previous)
+
+
+# ============================================================================
+# 3. VALIDATION
+# ============================================================================
+def _window_matrix(model_name, feature_set, y, window, compressed):
+    # (X_fit, fit_y, fit_w, score) for one window; score(model) -> (y_pred, y_proba)
+    use_scaled = model_name in SCALED_MODELS
+    scaler = StandardScaler()
+    if compressed:
+        row_codes = feature_set['row_codes']
+        fit_idx, fit_y, fit_w = weighted_rows(row_codes, y, window['train_idx'])
+        X_table = feature_set['X']
+        if use_scaled:
+            scaler.fit(X_table[fit_idx], sample_weight=fit_w)
+            X_table = scaler.transform(X_table)
+        test_codes = row_codes[window['test_idx']]
+        return X_table[fit_idx], fit_y, fit_w, lambda model: predict_expanded(model, X_table, test_codes)
+
+    X_fit = feature_set['X'][window['train_idx']]
+    X_test = feature_set['X'][window['test_idx']]
+    if use_scaled:
+        X_fit = scaler.fit_transform(X_fit)
+        X_test = scaler.transform(X_test)
+    return X_fit, y[window['train_idx']], None, \
+        lambda model: (model.predict(X_test), model.predict_proba(X_test)[:, 1])
+
+
+def _window_scores(y_test, y_pred, y_proba) -> dict:
+    # PR-AUC / ROC-AUC are undefined on a single-class test period
+    two_classes = len(np.unique(y_test)) == 2
+    return {
+        'accuracy': accuracy_score(y_test, y_pred),
+        'f1': f1_score(y_test, y_pred, zero_division=0),
+        'pr_auc': average_precision_score(y_test, y_proba) if two_classes else np.nan,
+        'roc_auc': roc_auc_score(y_test, y_proba) if two_classes else np.nan,
+    }
+
+
+def validate_job(model_name, model, feature_set_name, data: dict, y, windows: list,
+                 mode: str = 'expanding', grow_fraction: float = GROW_FRACTION,
+                 compare_refit: bool = False, log=print) -> dict:
+    """
+    Walk one (model, feature set) through the windows, growing it incrementally.
+
+    Returns:
+        Dict with model, feature_set, results (one leaderboard row per window),
+        final_model, skipped (messages) and elapsed seconds.
+    """
+    start = time.perf_counter()
+    feature_set = data['feature_sets'][feature_set_name]
+    y = np.asarray(y)
+    kind = update_kind(model)
+    # Only forests can drop trees fitted on periods that left a rolling window
+    rolling_refit = mode == 'rolling' and kind == 'init_model'
+    if rolling_refit:
+        kind = 'refit'
+    update_label = 'refit (rolling)' if rolling_refit else kind
+    base_size = _size_param(model)[1] if kind != 'refit' else 0
+    n_new = max(1, int(round(base_size * grow_fraction)))
+    max_estimators = base_size if mode == 'rolling' else None
+    outcome = {'model': model_name, 'feature_set': feature_set_name,
+               'results': [], 'final_model': None, 'skipped': [], 'elapsed': 0.0}
+
+    current = None
+    for window in windows:
+        label = f"{window['train_start']}-{window['train_end']} -> {window['test_period']}"
+        y_fit_window = y[window['train_idx']]
+        if len(window['test_idx']) == 0 or len(np.unique(y_fit_window)) < 2:
+            message = f'{model_name} on {feature_set_name}, window {label}: single-class or empty window'
+            log(f'[{model_name}] Skipping - {message}')
+            outcome['skipped'].append(message)
+            continue
+
+        X_fit, fit_y, fit_w, score = _window_matrix(model_name, feature_set, y, window, data['use_compression'])
+        fit_start = time.perf_counter()
+        try:
+            current = grow_model(model_name, model, current, kind, n_new, X_fit, fit_y, fit_w, max_estimators)
+        except Exception as ex:
+            message = f'{model_name} on {feature_set_name}, window {label}: {str(ex)[:120]}'
+            log(f'[{model_name}] Failed - {message}')
+            outcome['skipped'].append(message)
+            current = None
+            continue
+        fit_seconds = time.perf_counter() - fit_start
+
+        y_test = y[window['test_idx']]
+        y_pred, y_proba = score(current)
+        row = {
+            'feature_set': feature_set_name,
+            'model': model_name,
+            **_window_scores(y_test, y_pred, y_proba),
+            'window': window['window'],
+            'train_period': f"{window['train_start']}-{window['train_end']}",
+            'test_period': window['test_period'],
+            'train_rows': int(len(window['train_idx'])),
+            'test_rows': int(len(y_test)),
+            'test_positive_rate': float(y_test.mean()),
+            'update': update_label if len(outcome['results']) else 'fit',
+            'n_estimators': _tree_count(current),
+            'fit_seconds': fit_seconds,
+        }
+        if compare_refit:
+            if kind == 'refit' or row['update'] == 'fit':
+                row['refit_pr_auc'], row['refit_seconds'] = row['pr_auc'], fit_seconds
+            else:
+                refit_start = time.perf_counter()
+                refit = _fresh_model(model_name, model, fit_y, fit_w)
+                refit.set_params(**{_size_param(refit)[0]: row['n_estimators']})
+                _fit(refit, X_fit, fit_y, fit_w)
+                row['refit_seconds'] = time.perf_counter() - refit_start
+                row['refit_pr_auc'] = _window_scores(y_test, *score(refit))['pr_auc']
+        outcome['results'].append(row)
+        log(f"[{model_name}] {feature_set_name} | {label} | {row['update']} -> {row['n_estimators']} trees "
+            f"in {fit_seconds:.2f}s | pr_auc={row['pr_auc']:.4f}")
+
+    outcome['final_model'] = current
+    outcome['elapsed'] = time.perf_counter() - start
+    return outcome
+
+
+def _tree_count(model) -> int:
+    for getter in (lambda m: len(m.estimators_), lambda m: m.booster_.num_trees(),
+                   lambda m: m.get_booster().num_boosted_rounds(), lambda m: m.tree_count_):
+        try:
+            return int(getter(model))
+        except Exception:
+            continue
+    return 0
+
+
+def _constant_features(feature_set: dict, compressed: bool) -> bool:
+    # Same test as train_experiment(), over every transaction's feature row
+    X = feature_set['X']
+    if compressed:
+        X = X[np.unique(feature_set['row_codes'])]
+    return bool(np.all(np.nanstd(X, axis=0) < 1e-12))
+
+
+def run_time_validation(jobs: list, data: dict, y, dates, n_windows: int = N_WINDOWS,
+                        mode: str = 'expanding', train_periods: int = TRAIN_PERIODS,
+                        freq: str = PERIOD_FREQ, grow_fraction: float = GROW_FRACTION,
+                        compare_refit: bool = False, verbose: bool = True) -> dict:
+    """
+    Time-window validation of queued (model_name, model, feature_set_name) jobs.
+
+    Args:
+        jobs          : Same jobs as run_experiment_grid().
+        data          : Output of prepare_training_data() (its row codes / matrices
+                        cover every transaction; its random split is not used).
+        y             : Per-transaction labels.
+        dates         : Per-transaction Price Date (see transaction_dates()).
+        grow_fraction : Trees / rounds added per window, as a fraction of the
+                        model's n_estimators.
+        compare_refit : Also refit each window from scratch at the same size
+                        (refit_pr_auc, refit_seconds) to measure the savings.
+
+    Returns:
+        Dict with results (per-window leaderboard rows), summary (DataFrame, one
+        row per job sorted by mean PR-AUC), windows, final_models
+        ({(feature_set, model): fitted model}), skipped and elapsed seconds.
+    """
+    start = time.perf_counter()
+    log = print if verbose else (lambda *args, **kwargs: None)
+    windows = time_windows(dates, n_windows=n_windows, mode=mode, train_periods=train_periods, freq=freq)
+    log(f"Time-window validation ({mode}): " + ', '.join(
+        f"{w['train_start']}-{w['train_end']} -> {w['test_period']}" for w in windows))
+
+    results, skipped, final_models = [], [], {}
+    constant = {name: _constant_features(feature_set, data['use_compression'])
+                for name, feature_set in data['feature_sets'].items()}
+    for model_name, model, feature_set_name in jobs:
+        if constant[feature_set_name]:
+            message = f'{model_name} on {feature_set_name}: constant features'
+            log(f'[{model_name}] Skipping - {message}')
+            skipped.append(message)
+            continue
+        outcome = validate_job(model_name, model, feature_set_name, data, y, windows, mode=mode,
+                               grow_fraction=grow_fraction, compare_refit=compare_refit, log=log)
+        results.extend(outcome['results'])
+        skipped.extend(outcome['skipped'])
+        if outcome['final_model'] is not None:
+            final_models[(feature_set_name, model_name)] = outcome['final_model']
+
+    return {
+        'results': results,
+        'summary': summarize_windows(results),
+        'windows': [{key: value for key, value in w.items() if not key.endswith('_idx')} for w in windows],
+        'final_models': final_models,
+        'skipped': skipped,
+        'elapsed': time.perf_counter() - start,
+    }
+
+
+def summarize_windows(results: list) -> pd.DataFrame:
+    """One row per (model, feature set): PR-AUC mean / std / last window and fit time."""
+    if not results:
+        return pd.DataFrame()
+    results_df = pd.DataFrame(results)
+    aggregations = {
+        'pr_auc_mean': ('pr_auc', 'mean'),
+        'pr_auc_std': ('pr_auc', 'std'),
+        'pr_auc_last': ('pr_auc', 'last'),
+        'f1_mean': ('f1', 'mean'),
+        'roc_auc_mean': ('roc_auc', 'mean'),
+        'windows': ('window', 'size'),
+        'fit_seconds': ('fit_seconds', 'sum'),
+    }
+    if 'refit_seconds' in results_df.columns:
+        aggregations['refit_pr_auc_mean'] = ('refit_pr_auc', 'mean')
+        aggregations['refit_seconds'] = ('refit_seconds', 'sum')
+    summary = (
+        results_df.sort_values('window')
+        .groupby(['model', 'feature_set'], as_index=False)
+        .agg(**aggregations)
+        .sort_values('pr_auc_mean', ascending=False)
+        .reset_index(drop=True)
+    )
+    if 'refit_seconds' in summary.columns:
+        summary['speedup'] = summary['refit_seconds'] / summary['fit_seconds']
+    return summary
+
+
+# ============================================================================
+# 4. CLI
+# ============================================================================
+def _default_jobs(feature_set_names: list) -> list:
+    # The notebook's RandomForest / GradientBoosting cells
+    from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+    models = [
+        ('RandomForest', RandomForestClassifier(n_estimators=200, max_depth=14, min_samples_leaf=2,
+                                                class_weight='balanced_subsample', random_state=42, n_jobs=-1)),
+        ('GradientBoosting', GradientBoostingClassifier(n_estimators=150, learning_rate=0.05, max_depth=4,
+                                                        random_state=42)),
+    ]
+    return [(name, model, fs) for name, model in models for fs in feature_set_names]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rolling / expanding-window validation over Price Date")
+    parser.add_argument("--data-path", default=str(DATA_PATH), help="Project Data folder")
+    parser.add_argument("--mode", choices=WINDOW_MODES, default='expanding')
+    parser.add_argument("--windows", type=int, default=N_WINDOWS, help="Number of test periods")
+    parser.add_argument("--train-periods", type=int, default=TRAIN_PERIODS, help="Periods per rolling window")
+    parser.add_argument("--freq", default=PERIOD_FREQ, help="Period alias: Y, Q or M")
+    parser.add_argument("--grow", type=float, default=GROW_FRACTION, help="Trees added per window (fraction)")
+    parser.add_argument("--compare-refit", action="store_true", help="Also refit every window from scratch")
+    parser.add_argument("--no-compression", action="store_true", help="Train on every transaction row")
+    args = parser.parse_args()
+
+    from feature_builder import load_inputs, build_transaction_features, REQUIREMENT_FEATURE_NAMES, \
+        AREA_YIELD_FEATURE_NAMES
+    from model_training import prepare_training_data
+
+    inputs = load_inputs(Path(args.data_path))
+    built = build_transaction_features(**inputs)
+    soil_cols = list(inputs['soil_summary'].columns)
+    weather_cols = list(inputs['weather_features'].index)
+    feature_sets = {
+        'soil_weather': soil_cols + weather_cols,
+        'soil_weather_requirements': soil_cols + weather_cols + REQUIREMENT_FEATURE_NAMES,
+        'soil_weather_req_area_yield': soil_cols + weather_cols + REQUIREMENT_FEATURE_NAMES + AREA_YIELD_FEATURE_NAMES,
+    }
+    all_idx = np.arange(built['total_records'])
+    data = prepare_training_data(built['X_df'], built['y'], all_idx, all_idx[:0], feature_sets,
+                                 use_compression=not args.no_compression)
+    dates = transaction_dates(inputs['crop_data_dict'])
+
+    print("=" * 80)
+    print("TIME-WINDOW VALIDATION")
+    print("=" * 80)
+    run = run_time_validation(_default_jobs(list(feature_sets)), data, built['y'], dates,
+                              n_windows=args.windows, mode=args.mode, train_periods=args.train_periods,
+                              freq=args.freq, grow_fraction=args.grow, compare_refit=args.compare_refit)
+
+    results_df = pd.DataFrame(run['results'])
+    print('\nPer-window leaderboard (sorted by window, then PR-AUC):')
+    print(results_df.sort_values(['window', 'pr_auc'], ascending=[True, False])[
+        ['test_period', 'model', 'feature_set', 'accuracy', 'f1', 'pr_auc', 'roc_auc', 'update', 'n_estimators']
+    ].to_string(index=False))
+    print('\nAcross windows (sorted by mean PR-AUC):')
+    print(run['summary'].to_string(index=False))
+    for message in run['skipped']:
+        print(f"⚠ {message}")
+    print(f"\n✓ {len(run['results'])} window fits in {run['elapsed']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Columnar Weather History Store
+==============================
+One append-only Parquet dataset of daily weather for every block, partitioned
+by district, in place of one Raw Daily CSV per block:
+
+    Data/Weather Data (District Wise)/Weather Store/
+        _manifest.json
+        district=Ariyalur/part-000000.parquet
+        district=Ariyalur/part-000007.parquet
+        ...
+
+district and block are dictionary-encoded, date is a real date column and
+every weather variable is float32. Each write adds a new part file tagged
+with an increasing batch number; when a (block, date) appears more than once
+the row from the latest batch wins, so re-fetched days replace older ones
+without rewriting anything. compact_store() folds each district back into a
+single part.
+
+read_weather() supports column projection and pushdown on district, block
+and date range, so a cross-block slice is one dataset scan.
+
+On first use the store is seeded from the existing Raw Daily CSVs.
+
+Usage:
+    python "Scripts/weather_store.py"              # import Raw Daily (if needed) and print a summary
+    python "Scripts/weather_store.py" --reimport   # rebuild the store from Raw Daily
+    python "Scripts/weather_store.py" --compact    # one part file per district
+"""
+
+import glob
+import json
+import shutil
+import argparse
+from datetime import date, datetime
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "Data"
+WEATHER_DIR = DATA_PATH / "Weather Data (District Wise)"
+RAW_DAILY_DIR = WEATHER_DIR / "Raw Daily"
+STORE_PATH = WEATHER_DIR / "Weather Store"
+MANIFEST_NAME = "_manifest.json"
+STORE_FORMAT_VERSION = 1
+
+KEY_COLUMNS = ["district", "block"]
+DATE_COLUMN = "date"
+BATCH_COLUMN = "batch"
+ROW_GROUP_SIZE = 64_000
+
+
+# ============================================================================
+# 1. MANIFEST HELPERS
+# ============================================================================
+def load_manifest(store_dir: Path = STORE_PATH) -> dict:
+    """Return the store manifest, or an empty one if the store has not been built."""
+    manifest_path = Path(store_dir) / MANIFEST_NAME
+    if not manifest_path.exists():
+        return {'format_version': STORE_FORMAT_VERSION, 'next_batch': 0, 'districts': {}}
+    manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+    if manifest.get('format_version') != STORE_FORMAT_VERSION:
+        return {'format_version': STORE_FORMAT_VERSION, 'next_batch': 0, 'districts': {}}
+    return manifest
+
+
+def _save_manifest(manifest: dict, store_dir: Path) -> None:
+    manifest_path = Path(store_dir) / MANIFEST_NAME
+    tmp_path = manifest_path.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding='utf-8')
+    tmp_path.replace(manifest_path)
+
+
+# ============================================================================
+# 2. WRITE
+# ============================================================================
+def daily_to_table(df: pd.DataFrame, batch: int) -> pa.Table:
+    """
+    Typed Arrow table from a daily frame (district, block, date, variables...):
+    dictionary keys, date32 dates, float32 variables, sorted by block and date.
+    """
+    df = df.sort_values(["block", DATE_COLUMN], kind="stable")
+    arrays = {
+        "district": pc.dictionary_encode(pa.array(df["district"].astype(str).to_numpy(), pa.string())),
+        "block": pc.dictionary_encode(pa.array(df["block"].astype(str).to_numpy(), pa.string())),
+        DATE_COLUMN: pa.array(pd.to_datetime(df[DATE_COLUMN]).dt.date.to_numpy(), pa.date32()),
+    }
+    for col in df.columns:
+        if col not in arrays:
+            arrays[col] = pa.array(pd.to_numeric(df[col], errors="coerce").to_numpy("float32", na_value=float("nan")),
+                                   pa.float32(), from_pandas=True)
+    arrays[BATCH_COLUMN] = pa.array([batch] * len(df), pa.int32())
+    return pa.table(arrays)
+
+
+def _write_part(table: pa.Table, district_dir: Path, batch: int) -> Path:
+    district_dir.mkdir(parents=True, exist_ok=True)
+    part_file = district_dir / f"part-{batch:06d}.parquet"
+    tmp_file = part_file.with_name(part_file.name + ".tmp")
+    pq.write_table(table.drop_columns(["district"]), tmp_file, row_group_size=ROW_GROUP_SIZE)
+    tmp_file.replace(part_file)
+    return part_file
+
+
+def append_daily(df: pd.DataFrame, store_dir: Path = STORE_PATH) -> int:
+    """
+    Append daily rows (district, block, date, variables...) as one new batch,
+    one part file per district. Returns the number of rows written.
+    """
+    if df is None or len(df) == 0:
+        return 0
+    store_dir = Path(store_dir)
+    manifest = load_manifest(store_dir)
+    batch = manifest['next_batch']
+    for district, district_df in df.groupby("district", sort=True):
+        _write_part(daily_to_table(district_df, batch), store_dir / f"district={district}", batch)
+        entry = manifest['districts'].setdefault(str(district), {'parts': 0, 'rows': 0})
+        entry['parts'] += 1
+        entry['rows'] += len(district_df)
+    manifest['next_batch'] = batch + 1
+    manifest['updated_at'] = datetime.now().isoformat(timespec='seconds')
+    _save_manifest(manifest, store_dir)
+    return len(df)
+
+
+def import_raw_daily(raw_dir: Path = RAW_DAILY_DIR, store_dir: Path = STORE_PATH, verbose: bool = True) -> int:
+    """Rebuild the store from per-block Raw Daily CSVs (one batch); returns rows imported."""
+    store_dir = Path(store_dir)
+    if store_dir.exists():
+        shutil.rmtree(store_dir)
+    files = sorted(glob.glob(str(Path(raw_dir) / "*_daily.csv")))
+    if not files:
+        return 0
+    daily = pd.concat((pd.read_csv(f, encoding="utf-8") for f in files), ignore_index=True)
+    rows = append_daily(daily, store_dir)
+    if verbose:
+        print(f"   ✓ Imported {len(files)} Raw Daily CSVs: {rows:,} rows → {store_dir}")
+    return rows
+
+
+def ensure_store(raw_dir: Path = RAW_DAILY_DIR, store_dir: Path = STORE_PATH, verbose: bool = True) -> None:
+    """Seed the store from Raw Daily the first time it is needed."""
+    if not (Path(store_dir) / MANIFEST_NAME).exists():
+        import_raw_daily(raw_dir, store_dir, verbose=verbose)
+
+
+def compact_store(store_dir: Path = STORE_PATH, verbose: bool = True) -> int:
+    """Rewrite each district with more than one part as a single deduplicated part; returns districts compacted."""
+    store_dir = Path(store_dir)
+    manifest = load_manifest(store_dir)
+    compacted = 0
+    for district, entry in sorted(manifest['districts'].items()):
+        if entry['parts'] <= 1:
+            continue
+        district_dir = store_dir / f"district={district}"
+        old_parts = sorted(district_dir.glob("part-*.parquet"))
+        df = read_weather(districts=[district], store_dir=store_dir)
+        batch = manifest['next_batch']
+        new_part = _write_part(daily_to_table(df, batch), district_dir, batch)
+        for part in old_parts:
+            if part != new_part:
+                part.unlink()
+        manifest['next_batch'] = batch + 1
+        manifest['districts'][district] = {'parts': 1, 'rows': len(df)}
+        _save_manifest(manifest, store_dir)
+        compacted += 1
+        if verbose:
+            print(f"   ✓ {district}: {len(old_parts)} parts → 1 ({len(df):,} rows)")
+    return compacted
+
+
+# ============================================================================
+# 3. READER
+# ============================================================================
+def weather_dataset(store_dir: Path = STORE_PATH) -> ds.Dataset:
+    """Open the store as a hive-partitioned Arrow dataset (district column included)."""
+    return ds.dataset(
+        Path(store_dir),
+        format='parquet',
+        partitioning=ds.partitioning(pa.schema([('district', pa.string())]), flavor='hive'),
+        exclude_invalid_files=True,
+        ignore_prefixes=['_', '.'],
+    )
+
+
+def _as_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(value).date()
+
+
+def weather_filter(districts=None, blocks=None, start_date=None, end_date=None) -> ds.Expression | None:
+    """Build the pushdown expression for read_weather(); None means no filter."""
+    expressions = []
+    if districts is not None:
+        expressions.append(ds.field('district').isin(list(districts)))
+    if blocks is not None:
+        expressions.append(ds.field('block').isin(list(blocks)))
+    if start_date is not None:
+        expressions.append(ds.field(DATE_COLUMN) >= pa.scalar(_as_date(start_date), pa.date32()))
+    if end_date is not None:
+        expressions.append(ds.field(DATE_COLUMN) <= pa.scalar(_as_date(end_date), pa.date32()))
+
+    if not expressions:
+        return None
+    combined = expressions[0]
+    for expression in expressions[1:]:
+        combined = combined & expression
+    return combined
+
+
+def read_weather(columns: list[str] | None = None, districts=None, blocks=None,
+                 start_date=None, end_date=None, store_dir: Path = STORE_PATH) -> pd.DataFrame:
+    """
+    Read a (block x date x variable) slice of the store.
+
+    Args:
+        columns    : Weather variables to load (all when None); district, block
+                     and date are always included.
+        districts  : District names to keep; prunes whole partitions.
+        blocks     : Block names to keep.
+        start_date : Inclusive lower bound on date.
+        end_date   : Inclusive upper bound on date.
+        store_dir  : Store folder.
+
+    Returns:
+        DataFrame sorted by district, block and date with one row per
+        (block, date) (latest batch wins), categorical district / block,
+        datetime64 date and float32 variables.
+    """
+    dataset = weather_dataset(store_dir)
+    load_columns = None
+    if columns is not None:
+        load_columns = list(dict.fromkeys([*KEY_COLUMNS, DATE_COLUMN, BATCH_COLUMN, *columns]))
+    table = dataset.to_table(
+        columns=load_columns,
+        filter=weather_filter(districts=districts, blocks=blocks, start_date=start_date, end_date=end_date),
+    )
+    df = table.to_pandas(date_as_object=False)
+    df["district"] = df["district"].astype("category")
+    df = df.sort_values([*KEY_COLUMNS, DATE_COLUMN, BATCH_COLUMN], kind="stable")
+    df = df.drop_duplicates([*KEY_COLUMNS, DATE_COLUMN], keep="last")
+    front = [*KEY_COLUMNS, DATE_COLUMN]
+    return df[front + [col for col in df.columns if col not in front and col != BATCH_COLUMN]].reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build / inspect the columnar weather history store")
+    parser.add_argument("--raw-dir", default=str(RAW_DAILY_DIR), help="Folder with per-block Raw Daily CSVs")
+    parser.add_argument("--store", default=str(STORE_PATH), help="Parquet dataset folder")
+    parser.add_argument("--reimport", action="store_true", help="Rebuild the store from Raw Daily")
+    parser.add_argument("--compact", action="store_true", help="Fold each district into one part file")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("COLUMNAR WEATHER STORE")
+    print("=" * 80)
+    print(f"\nStore directory: {args.store}\n")
+    if args.reimport:
+        import_raw_daily(Path(args.raw_dir), Path(args.store))
+    else:
+        ensure_store(Path(args.raw_dir), Path(args.store))
+    if args.compact:
+        compact_store(Path(args.store))
+
+    manifest = load_manifest(Path(args.store))
+    parts = sum(entry['parts'] for entry in manifest['districts'].values())
+    print(f"\n   Districts: {len(manifest['districts'])} | Part files: {parts} "
+          f"| Batches written: {manifest['next_batch']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+Weather API Stub Server
+=======================
+Local stand-in for the two APIs the weather collector calls, so the async
+collector's retry and rate-limit paths can be exercised without touching
+Nominatim or Open-Meteo:
+
+    GET /search?q=..           Nominatim-style [{"lat": .., "lon": ..}]
+    GET /v1/archive?..         Open-Meteo archive payload (daily and/or hourly
+                               variables; comma-separated coordinates return
+                               one object per location)
+    GET /stats                 request counters and the peak request rate seen
+
+Answers are synthetic but deterministic (seeded by query / coordinates).
+Faults can be injected:
+
+    --rate R --burst B     server-side token bucket: requests beyond R/s get
+                           429 with Retry-After (a client that honours its own
+                           token bucket never sees these)
+    --every-429 N          every Nth request gets 429 with Retry-After
+    --every-503 N          every Nth request gets 503 (no Retry-After, so the
+                           client falls back to jittered backoff)
+
+start_stub() runs the server on a background thread for scripts and
+notebooks; --check uses it to drive the collector's RateLimitedClient and
+verify that injected 429s are retried and the token bucket holds the rate.
+
+Usage:
+    python "Scripts/weather_stub_server.py" --port 8080 --every-429 7 --rate 5
+    python "Scripts/Weather Data Collection.py" --geocode-url http://127.0.0.1:8080/search \\
+                                                --weather-url http://127.0.0.1:8080/v1/archive
+    python "Scripts/weather_stub_server.py" --check     # self-contained retry / token-bucket check
+"""
+
+import json
+import time
+import random
+import asyncio
+import argparse
+import threading
+import importlib.util
+from collections import deque
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+COLLECTOR_PATH = Path(__file__).resolve().parent / "Weather Data Collection.py"
+RETRY_AFTER = 0.2   # seconds sent with every 429
+
+
+# ============================================================================
+# 1. SYNTHETIC PAYLOADS
+# ============================================================================
+def geocode_payload(query: str) -> list[dict]:
+    """One Tamil Nadu-ish coordinate per query string."""
+    rng = random.Random(query)
+    return [{"lat": f"{rng.uniform(8.0, 13.5):.6f}", "lon": f"{rng.uniform(76.5, 80.3):.6f}",
+             "display_name": query}]
+
+
+def location_payload(lat: float, lon: float, start: str, end: str,
+                     daily: list[str], hourly: list[str]) -> dict:
+    """Open-Meteo archive answer for one location over start..end (inclusive)."""
+    rng = random.Random(f"{lat:.4f},{lon:.4f}")
+    first, last = date.fromisoformat(start), date.fromisoformat(end)
+    days = [(first + timedelta(days=offset)).isoformat() for offset in range((last - first).days + 1)]
+    payload = {"latitude": lat, "longitude": lon, "timezone": "Asia/Kolkata"}
+    if daily:
+        payload["daily"] = {"time": days, **{name: [round(rng.uniform(0, 40), 2) for _ in days]
+                                             for name in daily}}
+    if hourly:
+        hours = [f"{day}T{hour:02d}:00" for day in days for hour in range(24)]
+        payload["hourly"] = {"time": hours, **{name: [round(rng.uniform(0, 40), 3) for _ in hours]
+                                               for name in hourly}}
+    return payload
+
+
+def archive_payload(query: dict):
+    """Single-location object, or a list when several coordinates are requested."""
+    lats = [float(value) for value in query["latitude"].split(",")]
+    lons = [float(value) for value in query["longitude"].split(",")]
+    if len(lats) != len(lons):
+        raise ValueError("latitude and longitude lists differ in length")
+    daily = [name for name in query.get("daily", "").split(",") if name]
+    hourly = [name for name in query.get("hourly", "").split(",") if name]
+    locations = [location_payload(lat, lon, query["start_date"], query["end_date"], daily, hourly)
+                 for lat, lon in zip(lats, lons)]
+    return locations[0] if len(locations) == 1 else locations
+
+
+# ============================================================================
+# 2. SERVER
+# ============================================================================
+class StubState:
+    """Fault settings and counters shared by every handler thread."""
+
+    def __init__(self, rate: float | None = None, burst: int = 1,
+                 every_429: int = 0, every_503: int = 0):
+        self.rate      = rate
+        self.burst     = burst
+        self.every_429 = every_429
+        self.every_503 = every_503
+        self.tokens    = float(burst)
+        self.updated   = time.monotonic()
+        self.lock      = threading.Lock()
+        self.recent    = deque()
+        self.stats     = {"requests": 0, "ok": 0, "throttled": 0, "injected_429": 0,
+                          "injected_503": 0, "peak_rate": 0}
+
+    def admit(self) -> int:
+        """HTTP status for the next request: 200, or the fault it should get."""
+        with self.lock:
+            now = time.monotonic()
+            self.stats["requests"] += 1
+            count = self.stats["requests"]
+            # Peak rate: most requests seen inside any one-second window
+            self.recent.append(now)
+            while now - self.recent[0] > 1.0:
+                self.recent.popleft()
+            self.stats["peak_rate"] = max(self.stats["peak_rate"], len(self.recent))
+
+            if self.rate:
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens < 1:
+                    self.stats["throttled"] += 1
+                    return 429
+                self.tokens -= 1
+            if self.every_429 and count % self.every_429 == 0:
+                self.stats["injected_429"] += 1
+                return 429
+            if self.every_503 and count % self.every_503 == 0:
+                self.stats["injected_503"] += 1
+                return 503
+            self.stats["ok"] += 1
+            return 200
+
+
+def make_handler(state: StubState):
+    """Request handler class bound to one StubState."""
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload, headers: dict | None = None) -> None:
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            if url.path == '/stats':
+                with state.lock:
+                    self._send(200, dict(state.stats))
+                return
+            if url.path not in ('/search', '/v1/archive'):
+                self._send(404, {'error': f'unknown path {url.path}'})
+                return
+
+            status = state.admit()
+            if status == 429:
+                self._send(429, {'error': 'Too Many Requests'}, {'Retry-After': str(RETRY_AFTER)})
+            elif status == 503:
+                self._send(503, {'error': 'Service Unavailable'})
+            elif url.path == '/search':
+                self._send(200, geocode_payload(query.get('q', '')))
+            else:
+                try:
+                    self._send(200, archive_payload(query))
+                except (KeyError, ValueError) as ex:
+                    self._send(400, {'error': True, 'reason': str(ex)})
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def start_stub(host: str = '127.0.0.1', port: int = 0, **faults) -> tuple[ThreadingHTTPServer, StubState]:
+    """
+    Start the stub on a daemon thread (port 0 picks a free port) and return
+    (server, state); the base URL is http://host:server.server_port.
+    Call server.shutdown() when done.
+    """
+    state = StubState(**faults)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+# ============================================================================
+# 3. SELF-CHECK AGAINST THE COLLECTOR'S CLIENT
+# ============================================================================
+def load_collector():
+    """Import "Weather Data Collection.py" (its file name is not a module name)."""
+    spec = importlib.util.spec_from_file_location("weather_data_collection", COLLECTOR_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def _burst(collector, base_url: str, n_requests: int, rate: float, capacity: int) -> tuple[int, float]:
+    host = urlparse(base_url).netloc
+    params = collector.weather_params(10.79, 79.14, "2024-01-01", "2024-01-07",
+                                      daily=collector.DAILY_VARIABLES[:3])
+    start = time.perf_counter()
+    async with collector.RateLimitedClient({host: (rate, capacity)}, backoff_base=0.05, backoff_cap=1.0) as client:
+        answers = await asyncio.gather(*[client.get_json(f"{base_url}/v1/archive", params)
+                                         for _ in range(n_requests)])
+        issued = client.request_count
+    if not all(len(answer["daily"]["time"]) == 7 for answer in answers):
+        raise AssertionError("stub returned an unexpected payload")
+    return issued, time.perf_counter() - start
+
+
+def run_check(n_requests: int = 30) -> bool:
+    """
+    Two scenarios against a fresh stub each:
+      1. every 5th request gets 429 + Retry-After, every 7th a 503: every
+         request must still succeed, with one extra attempt per fault;
+      2. server limit 5/s, client bucket 4/s: the client must never be
+         throttled and its peak rate must stay within rate + burst.
+    """
+    collector = load_collector()
+    passed = True
+
+    server, state = start_stub(every_429=5, every_503=7)
+    try:
+        issued, elapsed = asyncio.run(_burst(collector, f"http://127.0.0.1:{server.server_port}",
+                                             n_requests, rate=50.0, capacity=10))
+    finally:
+        server.shutdown()
+    faults = state.stats["injected_429"] + state.stats["injected_503"]
+    ok = state.stats["ok"] == n_requests and issued == n_requests + faults
+    passed &= ok
+    print(f"{'✔' if ok else '✘'}  Retry: {n_requests} requests, {state.stats['injected_429']} x 429 and "
+          f"{state.stats['injected_503']} x 503 injected, {issued} attempts, all answered ({elapsed:.1f}s)")
+
+    rate, capacity = 4.0, 2
+    server, state = start_stub(rate=5.0, burst=capacity + 1)
+    try:
+        issued, elapsed = asyncio.run(_burst(collector, f"http://127.0.0.1:{server.server_port}",
+                                             n_requests, rate=rate, capacity=capacity))
+    finally:
+        server.shutdown()
+    ok = state.stats["throttled"] == 0 and state.stats["peak_rate"] <= rate + capacity
+    passed &= ok
+    print(f"{'✔' if ok else '✘'}  Token bucket: {n_requests} requests at {rate:g}/s (burst {capacity}) → "
+          f"peak {state.stats['peak_rate']} req/s, {state.stats['throttled']} throttled by the server "
+          f"({elapsed:.1f}s)")
+    return passed
+
+
+# ============================================================================
+# 4. CLI
+# ============================================================================
+def main():
+    parser = argparse.ArgumentParser(description="Local stub of the Nominatim and Open-Meteo archive APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--rate", type=float, default=None, help="Server-side requests/second before 429")
+    parser.add_argument("--burst", type=int, default=1, help="Server-side bucket size")
+    parser.add_argument("--every-429", type=int, default=0, help="Answer every Nth request with 429")
+    parser.add_argument("--every-503", type=int, default=0, help="Answer every Nth request with 503")
+    parser.add_argument("--check", action="store_true",
+                        help="Run the retry / token-bucket check against the collector's client and exit")
+    args = parser.parse_args()
+
+    if args.check:
+        raise SystemExit(0 if run_check() else 1)
+
+    state = StubState(rate=args.rate, burst=args.burst, every_429=args.every_429, every_503=args.every_503)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    print(f"✓ Weather stub on http://{args.host}:{args.port}  (/search, /v1/archive, /stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"✓ {state.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Batch Weather Summaries
+=======================
+Builds the per-block weather summary table (weather_data_all_blocks.csv) from
+the daily history of every block at once (one read of the weather store, or
+the legacy Raw Daily CSVs), instead of summarising one block at a time.
+
+All blocks are loaded into one long daily frame and every statistic is
+computed in grouped passes keyed by (district, block):
+    - the whole-window columns produced by summarise_weather() in
+      Weather Data Collection.py (same names, same 4-decimal rounding),
+    - the same kind of statistics per crop season (kharif, rabi and the
+      Cauvery-delta kuruvai / samba / thaladi seasons), as wide
+      <season>_<stat> columns.
+
+Seasons are month sets, so a season that wraps the new year (rabi, samba,
+thaladi) takes its months from whichever year the window covers.
+
+    daily = load_store_daily()
+    table = summarise_blocks(daily, start="2025-02-24", end="2026-02-24")
+
+Usage:
+    python "Scripts/weather_summary.py"                  # regenerate weather_data_all_blocks.csv
+    python "Scripts/weather_summary.py" --start 2025-06-01 --end 2026-05-31
+    python "Scripts/weather_summary.py" --no-seasons     # whole-window columns only
+    python "Scripts/weather_summary.py" --raw-dir "Data/Weather Data (District Wise)/Raw Daily"
+"""
+
+import glob
+import time
+import argparse
+from pathlib import Path
+
+import pandas as pd
+
+from weather_store import STORE_PATH, ensure_store, read_weather
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "Data"
+WEATHER_DIR = DATA_PATH / "Weather Data (District Wise)"
+RAW_DAILY_DIR = WEATHER_DIR / "Raw Daily"
+OUTPUT_CSV = WEATHER_DIR / "weather_data_all_blocks.csv"
+
+KEYS = ["district", "block"]
+META_COLUMNS = ["district", "block", "latitude", "longitude", "data_start", "data_end", "status"]
+
+# (output column, Raw Daily column, statistic) — mirrors summarise_weather()
+ANNUAL_STATS = [
+    ("temp_max_mean",             "temperature_2m_max",             "mean"),
+    ("temp_min_mean",             "temperature_2m_min",             "mean"),
+    ("temp_mean_annual",          "temperature_2m_mean",            "mean"),
+    ("temp_max_absolute",         "temperature_2m_max",             "max"),
+    ("temp_min_absolute",         "temperature_2m_min",             "min"),
+    ("total_rainfall_mm",         "precipitation_sum",              "sum"),
+    ("avg_daily_rainfall_mm",     "precipitation_sum",              "mean"),
+    ("max_daily_rainfall_mm",     "precipitation_sum",              "max"),
+    ("total_rain_mm",             "rain_sum",                       "sum"),
+    ("total_precip_hours",        "precipitation_hours",            "sum"),
+    ("rainy_days",                "precipitation_sum",              "rainy_days"),
+    ("humidity_max_mean",         "relative_humidity_2m_max",       "mean"),
+    ("humidity_min_mean",         "relative_humidity_2m_min",       "mean"),
+    ("dewpoint_max_mean",         "dewpoint_2m_max",                "mean"),
+    ("dewpoint_min_mean",         "dewpoint_2m_min",                "mean"),
+    ("wind_speed_max_mean",       "wind_speed_10m_max",             "mean"),
+    ("wind_gusts_max_mean",       "wind_gusts_10m_max",             "mean"),
+    ("wind_direction_dominant",   "wind_direction_10m_dominant",    "mode"),
+    ("solar_radiation_mean",      "shortwave_radiation_sum",        "mean"),
+    ("et0_annual_mm",             "et0_fao_evapotranspiration",     "sum"),
+    ("et0_daily_mean_mm",         "et0_fao_evapotranspiration",     "mean"),
+    ("sunshine_hours_daily_mean", "sunshine_duration",              "hours_mean"),
+    ("daylight_hours_daily_mean", "daylight_duration",              "hours_mean"),
+    ("soil_temp_0_7cm_mean",      "soil_temperature_0_to_7cm_mean", "mean"),
+    ("soil_temp_0_7cm_max_mean",  "soil_temperature_0_to_7cm_max",  "mean"),
+    ("soil_temp_0_7cm_min_mean",  "soil_temperature_0_to_7cm_min",  "mean"),
+    ("soil_moisture_0_7cm_mean",  "soil_moisture_0_to_7cm_mean",    "mean"),
+    ("soil_moisture_0_7cm_max",   "soil_moisture_0_to_7cm_max",     "mean"),
+    ("soil_moisture_0_7cm_min",   "soil_moisture_0_to_7cm_min",     "mean"),
+    ("vapor_pressure_deficit_max_mean", "vapor_pressure_deficit_max", "mean"),
+]
+
+# Crop seasons as calendar months (Tamil Nadu / Cauvery delta)
+SEASONS = {
+    "kharif":  (6, 7, 8, 9, 10),
+    "rabi":    (11, 12, 1, 2, 3),
+    "kuruvai": (6, 7, 8, 9),
+    "samba":   (8, 9, 10, 11, 12, 1),
+    "thaladi": (10, 11, 12, 1, 2),
+}
+
+SEASON_STATS = [
+    ("days",                     "date",                         "count"),
+    ("rainfall_mm",              "precipitation_sum",            "sum"),
+    ("rainy_days",               "precipitation_sum",            "rainy_days"),
+    ("temp_max_mean",            "temperature_2m_max",           "mean"),
+    ("temp_min_mean",            "temperature_2m_min",           "mean"),
+    ("humidity_min_mean",        "relative_humidity_2m_min",     "mean"),
+    ("et0_mm",                   "et0_fao_evapotranspiration",   "sum"),
+    ("solar_radiation_mean",     "shortwave_radiation_sum",      "mean"),
+    ("soil_moisture_0_7cm_mean", "soil_moisture_0_to_7cm_mean",  "mean"),
+]
+
+RAINY_DAY_MM = 0.1
+
+
+# ============================================================================
+# 1. LOADING
+# ============================================================================
+def load_raw_daily(raw_dir: Path = RAW_DAILY_DIR) -> pd.DataFrame:
+    """Every block's Raw Daily CSV in one frame (district, block, date, variables...)."""
+    files = sorted(glob.glob(str(Path(raw_dir) / "*_daily.csv")))
+    if not files:
+        return pd.DataFrame(columns=KEYS + ["date"])
+    return pd.concat((pd.read_csv(f, encoding="utf-8") for f in files), ignore_index=True)
+
+
+def load_store_daily(store_dir: Path = STORE_PATH, start: str | None = None,
+                     end: str | None = None) -> pd.DataFrame:
+    """Daily history of every block from the weather store, in the Raw Daily layout (ISO date strings)."""
+    daily = read_weather(start_date=start, end_date=end, store_dir=store_dir)
+    # Variables stay float32: the rainy-day threshold then compares 0.1 with float32(0.1)
+    return daily.astype({"district": str, "block": str}).assign(date=daily["date"].dt.strftime("%Y-%m-%d"))
+
+
+def window_daily(daily: pd.DataFrame, start: str | None = None, end: str | None = None,
+                 windows: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    Days inside start → end (ISO strings, inclusive). windows, a frame with
+    district, block, data_start and data_end, gives each block its own window
+    and overrides start / end for the blocks it lists.
+    """
+    dates = daily["date"].astype(str)
+    lo = pd.Series(start or "", index=daily.index)
+    hi = pd.Series(end or "9999-12-31", index=daily.index)
+    if windows is not None and len(windows):
+        per_block = daily[KEYS].merge(windows[KEYS + ["data_start", "data_end"]].drop_duplicates(KEYS),
+                                      on=KEYS, how="left")
+        per_block.index = daily.index
+        lo = per_block["data_start"].astype("object").where(per_block["data_start"].notna(), lo)
+        hi = per_block["data_end"].astype("object").where(per_block["data_end"].notna(), hi)
+    return daily[(dates >= lo.astype(str)) & (dates <= hi.astype(str))]
+
+
+# ============================================================================
+# 2. GROUPED STATISTICS
+# ============================================================================
+def grouped_stats(daily: pd.DataFrame, keys: list[str], stats: list[tuple[str, str, str]]) -> pd.DataFrame:
+    """
+    One row per keys group with a column per (output, source, statistic).
+    mean / max / min / sum skip missing days; rainy_days counts days above
+    RAINY_DAY_MM; hours_mean is the mean of seconds / 3600; mode is the most
+    frequent value (smallest on ties); count is the number of days. Columns
+    whose source is missing from daily are left empty.
+    """
+    columns = {}
+    by_stat = {}
+    modes = []
+    for out, col, stat in stats:
+        if col not in daily.columns:
+            continue
+        if stat == "mode":
+            modes.append((out, col))
+            continue
+        source = daily[col]
+        if stat == "hours_mean":
+            source, stat = source / 3600, "mean"
+        elif stat == "rainy_days":
+            source, stat = (source > RAINY_DAY_MM).astype("int64"), "sum"
+        elif stat == "count":
+            source, stat = pd.Series(1, index=daily.index), "sum"
+        columns[out] = source
+        by_stat.setdefault(stat, []).append(out)
+
+    # One grouped reduction per statistic over all of its columns
+    grouped = pd.DataFrame(columns, index=daily.index).groupby([daily[k] for k in keys], sort=False)
+    parts = [grouped[outs].agg(stat) for stat, outs in by_stat.items()]
+    result = pd.concat(parts, axis=1) if parts else pd.DataFrame(index=grouped.size().index)
+
+    for out, col in modes:
+        counts = daily.groupby(keys + [col], sort=False).size().reset_index(name="_n")
+        counts = counts.sort_values(keys + ["_n", col], ascending=[True] * len(keys) + [False, True])
+        result[out] = counts.drop_duplicates(keys).set_index(keys)[col]
+
+    float_cols = result.select_dtypes("float").columns
+    result[float_cols] = result[float_cols].astype("float64").round(4)
+    return result.reindex(columns=[out for out, _, _ in stats])
+
+
+def season_stats(daily: pd.DataFrame, seasons: dict = SEASONS,
+                 stats: list[tuple[str, str, str]] = SEASON_STATS) -> pd.DataFrame:
+    """Wide <season>_<stat> columns per block; overlapping seasons share their days."""
+    months = pd.to_datetime(daily["date"]).dt.month
+    long = pd.concat(
+        [daily[months.isin(season_months)].assign(season=name) for name, season_months in seasons.items()],
+        ignore_index=True,
+    )
+    table = grouped_stats(long, KEYS + ["season"], stats).unstack("season")
+    table = table.reindex(columns=pd.MultiIndex.from_product([[out for out, _, _ in stats], list(seasons)]))
+    table.columns = [f"{season}_{out}" for out, season in table.columns]
+    ordered = [f"{season}_{out}" for season in seasons for out, _, _ in stats]
+    return table[ordered]
+
+
+def summarise_blocks(daily: pd.DataFrame, start: str | None = None, end: str | None = None,
+                     windows: pd.DataFrame | None = None, seasons: dict | None = SEASONS) -> pd.DataFrame:
+    """
+    Summary table keyed by (district, block): the summarise_weather() columns
+    over the window, then the seasonal columns (seasons=None skips them).
+    """
+    daily = window_daily(daily, start, end, windows)
+    table = grouped_stats(daily, KEYS, ANNUAL_STATS)
+    if seasons:
+        table = table.join(season_stats(daily, seasons))
+    return table.reset_index()
+
+
+# ============================================================================
+# 3. REGENERATE weather_data_all_blocks.csv
+# ============================================================================
+def regenerate_summary(output_csv: Path = OUTPUT_CSV, start: str | None = None, end: str | None = None,
+                       seasons: dict | None = SEASONS, store_dir: Path = STORE_PATH,
+                       raw_dir: Path | None = None) -> pd.DataFrame:
+    """
+    Rebuild the summary CSV from the weather store (or the Raw Daily CSVs in
+    raw_dir). Coordinates, status and each block's window come from the
+    existing CSV (start / end override the window); blocks with daily data
+    but no existing row are appended.
+    """
+    output_csv = Path(output_csv)
+    meta = pd.DataFrame(columns=META_COLUMNS)
+    if output_csv.exists():
+        meta = pd.read_csv(output_csv, encoding="utf-8")
+        meta = meta[[c for c in META_COLUMNS if c in meta.columns]].reindex(columns=META_COLUMNS)
+    windows = None if (start or end) else meta.dropna(subset=["data_start", "data_end"])
+
+    if raw_dir is not None:
+        daily = load_raw_daily(raw_dir)
+    else:
+        ensure_store(RAW_DAILY_DIR, store_dir, verbose=False)
+        daily = load_store_daily(store_dir)
+    summary = summarise_blocks(daily, start, end, windows, seasons)
+    if start or end:
+        meta["data_start"], meta["data_end"] = start, end
+
+    new_blocks = summary[KEYS].merge(meta[KEYS], on=KEYS, how="left", indicator=True)
+    new_blocks = new_blocks[new_blocks["_merge"] == "left_only"].drop(columns="_merge")
+    new_blocks = new_blocks.assign(data_start=start, data_end=end, status="success")
+    meta = pd.concat([meta, new_blocks], ignore_index=True) if len(new_blocks) else meta
+
+    out_df = meta.merge(summary, on=KEYS, how="left")
+    tmp_csv = output_csv.with_name(output_csv.name + ".tmp")
+    out_df.to_csv(tmp_csv, index=False, encoding="utf-8")
+    tmp_csv.replace(output_csv)
+    return out_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild weather_data_all_blocks.csv from the daily weather history")
+    parser.add_argument("--store", type=Path, default=STORE_PATH, help="Weather store folder")
+    parser.add_argument("--raw-dir", type=Path, default=None, help="Read legacy *_daily.csv files instead of the store")
+    parser.add_argument("--output", type=Path, default=OUTPUT_CSV, help="Summary CSV to (re)write")
+    parser.add_argument("--start", default=None, help="Window start (default: each block's data_start)")
+    parser.add_argument("--end", default=None, help="Window end (default: each block's data_end)")
+    parser.add_argument("--no-seasons", action="store_true", help="Skip the per-season columns")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    out_df = regenerate_summary(args.output, args.start, args.end, seasons=None if args.no_seasons else SEASONS,
+                                store_dir=args.store, raw_dir=args.raw_dir)
+    elapsed = time.perf_counter() - t0
+    print(f"✔  Summarised {len(out_df)} blocks in {elapsed:.2f}s → {args.output}")
+    print(f"   Columns: {len(out_df.columns)}"
+          + ("" if args.no_seasons else f"   |   Seasons: {', '.join(SEASONS)}"))
+
+
+if __name__ == "__main__":
+    main()